@@ -1,4 +1,4 @@
-from flask import Flask, request, jsonify
+from flask import Flask, jsonify
 
 ### MODELS ###
 
@@ -41,7 +41,7 @@ db = {"comments": [comment1, comment2], "authors": [author1], "posts": [post1]}
 
 ### SCHEMAS ###
 
-from marshmallow import validate, ValidationError  # noqa: E402
+from marshmallow import validate  # noqa: E402
 from marshmallow_jsonapi import fields  # noqa: E402
 from marshmallow_jsonapi.flask import Relationship, Schema  # noqa: E402
 
@@ -115,8 +115,9 @@ def J(*args, **kwargs):
 @app.route("/posts/", methods=["GET"])
 def posts_list():
     posts = db["posts"]
-    data = PostSchema(many=True).dump(posts)
-    return J(data)
+    # Stream the document one resource at a time, compressed if the client
+    # accepts gzip
+    return PostSchema(many=True).stream_response(posts, gzip=True)
 
 
 @app.route("/posts/<int:post_id>")
@@ -151,11 +152,8 @@ def author_detail(author_id):
 @app.route("/authors/", methods=["POST"])
 def author_create():
     schema = AuthorSchema()
-    input_data = request.get_json() or {}
-    try:
-        data = schema.load(input_data)
-    except ValidationError as err:
-        return J(err.messages), 422
+    # Aborts with a JSON API error response if the body is invalid
+    data = schema.load_request()
     id_ = len(db["authors"])
     author = Author(id=id_, **data)
     db["authors"].append(author)
@@ -165,9 +163,8 @@ def author_create():
 
 @app.route("/comments/")
 def comments_list():
-    comment = db["comments"]
-    data = CommentSchema(many=True).dump(comment)
-    return J(data)
+    comments = db["comments"]
+    return CommentSchema(many=True).stream_response(comments, gzip=True)
 
 
 @app.route("/comments/<int:comment_id>")
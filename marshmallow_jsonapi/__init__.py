@@ -1,4 +1,5 @@
 from .schema import Schema, SchemaOpts
+from .warmup import warm_up
 
 __version__ = "0.24.0"
-__all__ = ("Schema", "SchemaOpts")
+__all__ = ("Schema", "SchemaOpts", "warm_up")
@@ -0,0 +1,147 @@
+"""Caches for serialized resource objects.
+
+Caches are enabled per schema with the ``resource_cache`` (formatted resource
+objects) and ``fragment_cache`` (encoded resource objects) `class Meta`
+options. Use separate cache instances for the two. Entries are keyed by
+``(type_, id, version, shape)``, where ``version`` is read from the attribute
+named by the ``version_attribute`` option (`None` if unset) and ``shape``
+captures the fields, included relationships and sparse fieldsets of the dump.
+The version must change whenever the resource or any resource it includes
+changes; otherwise rely on ``ttl`` for expiry or call `ResourceCache.invalidate`
+from write paths.
+"""
+import collections
+import threading
+import time
+
+#: A cached resource object, the resources it included and its document meta
+CacheEntry = collections.namedtuple("CacheEntry", ("resource", "included", "meta"))
+
+
+class ResourceCache:
+    """Interface of resource object caches. Subclass it to plug in other
+    storage backends.
+
+    Keys are tuples starting with ``(type_, id)``. Values are
+    `CacheEntry` instances.
+    """
+
+    def get(self, key, default=None):
+        """Return the value for ``key`` or ``default`` if it is missing."""
+        raise NotImplementedError
+
+    def set(self, key, value):
+        """Store ``value`` under ``key``."""
+        raise NotImplementedError
+
+    def invalidate(self, type_, id=None):
+        """Remove the entries of the resource identified by ``type_`` and ``id``,
+        as well as the entries that included it. If ``id`` is `None`, remove the
+        entries of all resources of ``type_``.
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        """Remove all entries."""
+        raise NotImplementedError
+
+
+class LRUCache(ResourceCache):
+    """Thread-safe in-process cache with least-recently-used eviction and an
+    optional time-to-live. Counts hits and misses in the ``hits`` and ``misses``
+    attributes.
+
+    Use it as the ``resource_cache`` or ``fragment_cache`` class Meta option: ::
+
+        from marshmallow_jsonapi import Schema
+        from marshmallow_jsonapi.cache import LRUCache
+
+
+        class PostSchema(Schema):
+            class Meta:
+                type_ = "posts"
+                version_attribute = "updated_at"
+                resource_cache = LRUCache(maxsize=10000, ttl=300)
+
+    :param int maxsize: Maximum number of entries.
+    :param float ttl: Seconds after which an entry expires. `None` disables expiry.
+    :param callable timer: Monotonic clock used for expiry.
+    """
+
+    def __init__(self, maxsize=1024, ttl=None, timer=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self.hits = 0
+        self.misses = 0
+        self._data = collections.OrderedDict()
+        # Maps ``(type_, str(id))`` to the keys of the entries that contain it
+        self._index = collections.defaultdict(set)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        """Return the value for ``key`` or ``default`` if it is missing or expired."""
+        with self._lock:
+            try:
+                expires, value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            if expires is not None and expires <= self.timer():
+                self._remove(key)
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """Store ``value`` under ``key``, evicting the least recently used entries
+        if the cache is full.
+        """
+        expires = None if self.ttl is None else self.timer() + self.ttl
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (expires, value)
+            for resource_key in _get_resource_keys(key, value):
+                self._index[resource_key].add(key)
+            while len(self._data) > self.maxsize:
+                self._remove(next(iter(self._data)))
+
+    def invalidate(self, type_, id=None):
+        with self._lock:
+            if id is None:
+                resource_keys = [each for each in self._index if each[0] == type_]
+            else:
+                resource_keys = [(type_, str(id))]
+            for resource_key in resource_keys:
+                for key in list(self._index.get(resource_key, ())):
+                    self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._index.clear()
+
+    def _remove(self, key):
+        _, value = self._data.pop(key)
+        for resource_key in _get_resource_keys(key, value):
+            keys = self._index.get(resource_key)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._index[resource_key]
+
+
+def _get_resource_keys(key, value):
+    """Return the ``(type_, str(id))`` pairs of the resources an entry holds."""
+    ret = set()
+    if isinstance(key, tuple) and len(key) >= 2:
+        ret.add((key[0], str(key[1])))
+    if isinstance(value, CacheEntry):
+        ret.update((type_, str(id_)) for (type_, id_), _ in value.included)
+    return ret
@@ -0,0 +1,59 @@
+"""JSON codecs used by `Schema.dumps_bytes <marshmallow_jsonapi.Schema.dumps_bytes>`
+and `Schema.loads_bytes <marshmallow_jsonapi.Schema.loads_bytes>`.
+
+A codec is any object with an ``encode(obj) -> bytes`` and a
+``decode(data) -> obj`` method. Set it with the ``codec`` `class Meta` option
+or pass it to the methods above. ::
+
+    from marshmallow_jsonapi import Schema
+    from marshmallow_jsonapi.codecs import fastest_codec
+
+
+    class PostSchema(Schema):
+        class Meta:
+            type_ = "posts"
+            codec = fastest_codec()
+"""
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class JSONCodec:
+    """Codec backed by the standard library `json` module. Encodes to compact
+    UTF-8 JSON.
+    """
+
+    def encode(self, obj):
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode(
+            "utf-8"
+        )
+
+    def decode(self, data):
+        return json.loads(data)
+
+
+class OrjsonCodec:
+    """Codec backed by `orjson <https://github.com/ijl/orjson>`_. Requires
+    ``orjson`` to be installed.
+    """
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("OrjsonCodec requires orjson to be installed.")
+
+    def encode(self, obj):
+        return orjson.dumps(obj)
+
+    def decode(self, data):
+        return orjson.loads(data)
+
+
+def fastest_codec():
+    """Return the fastest codec available in the current environment."""
+    if orjson is not None:
+        return OrjsonCodec()
+    return JSONCodec()
@@ -29,3 +29,19 @@ class IncorrectTypeError(JSONAPIError, ValueError):
         return {
             "errors": [{"detail": self.detail, "source": {"pointer": self.pointer}}]
         }
+
+
+class InvalidQueryParameterError(JSONAPIError, ValueError):
+    """Raised when client provides an invalid query parameter in a request."""
+
+    def __init__(self, message, parameter):
+        self.detail = message
+        self.parameter = parameter
+        super().__init__(self.detail)
+
+    @property
+    def messages(self):
+        """JSON API-formatted error representation."""
+        return {
+            "errors": [{"detail": self.detail, "source": {"parameter": self.parameter}}]
+        }
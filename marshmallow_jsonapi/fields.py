@@ -1,8 +1,10 @@
 """Includes all the fields classes from `marshmallow.fields` as well as
 fields for serializing JSON API-formatted hyperlinks.
 """
+import collections
 import collections.abc
 
+import marshmallow as ma
 from marshmallow import ValidationError, class_registry
 from marshmallow.fields import Field
 
@@ -11,10 +13,12 @@ from marshmallow.fields import *  # noqa
 from marshmallow.base import SchemaABC
 from marshmallow.utils import is_collection, missing as missing_, get_value
 
-from .utils import resolve_params
+from .utils import resolve_params, tpl
 
 
 _RECURSIVE_NESTED = "self"
+# Nested schema of a derived relationship, derived on first use
+_SchemaPrototype = collections.namedtuple("_SchemaPrototype", ("schema", "context"))
 # JSON API disallows U+005F LOW LINE at the start of a member name, so we can
 #  use it to load the Meta type from since it can't clash with an attribute
 # named meta (which isn't disallowed by the spec).
@@ -90,7 +94,7 @@ class Relationship(BaseRelationship):
         many=False,
         type_=None,
         id_field=None,
-        **kwargs
+        **kwargs,
     ):
         self.related_url = related_url
         self.related_url_kwargs = related_url_kwargs or {}
@@ -106,25 +110,60 @@ class Relationship(BaseRelationship):
         self.type_ = type_
         self.__id_field = id_field
         self.__schema = schema
+        self.__recursive = schema == _RECURSIVE_NESTED
+        self.__reset_accessors()
         super().__init__(**kwargs)
 
+    def __reset_accessors(self):
+        # Resolved on first use by `id_field`, `_get_id` and `extract_value`
+        self.__resolved_id_field = None
+        self.__get_id = None
+        self.__deserialize_id = None
+
+    def __getstate__(self):
+        # Drop resolved accessors; a nested schema pickles as its class and
+        # constructor arguments
+        state = self.__dict__.copy()
+        schema = self.__schema
+        if self.__recursive:
+            schema = _RECURSIVE_NESTED
+        elif isinstance(schema, _SchemaPrototype):
+            schema = schema.schema
+        state["_Relationship__schema"] = schema
+        state["_Relationship__resolved_id_field"] = None
+        state["_Relationship__get_id"] = None
+        state["_Relationship__deserialize_id"] = None
+        return state
+
+    def _bind_to_schema(self, field_name, schema):
+        # Copies of bound fields are bound again and must not reuse the accessors
+        self.__reset_accessors()
+        super()._bind_to_schema(field_name, schema)
+
     @property
     def id_field(self):
         if self.__id_field:
             return self.__id_field
-        if self.__schema:
-            field = self.schema.fields["id"]
-            return field.attribute or self.default_id_field
-        else:
-            return self.default_id_field
+        if self.__resolved_id_field is None:
+            if self.__schema:
+                field = self.schema.fields["id"]
+                self.__resolved_id_field = field.attribute or self.default_id_field
+            else:
+                self.__resolved_id_field = self.default_id_field
+        return self.__resolved_id_field
 
     @property
     def schema(self):
+        if isinstance(self.__schema, SchemaABC):
+            return self.__schema
+
         only = getattr(self, "only", None)
         exclude = getattr(self, "exclude", ())
         context = getattr(self, "context", {})
 
-        if isinstance(self.__schema, SchemaABC):
+        if isinstance(self.__schema, _SchemaPrototype):
+            prototype, context = self.__schema
+            self.__schema = prototype.derive(include_data=(), context=context)
             return self.__schema
         if isinstance(self.__schema, type) and issubclass(self.__schema, SchemaABC):
             self.__schema = self.__schema(only=only, exclude=exclude, context=context)
@@ -150,39 +189,136 @@ class Relationship(BaseRelationship):
                 "relationship with include_data"
             )
 
+    def _derive_schema(self, context=None):
+        """Give a copy of this field its own nested schema, derived on first use from
+        the resolved one, so that including data through the copy does not affect
+        the original.
+        """
+        if self.__recursive:
+            self.__schema = _RECURSIVE_NESTED
+        elif isinstance(self.__schema, _SchemaPrototype):
+            if context is not None:
+                self.__schema = self.__schema._replace(context=context)
+        elif isinstance(self.__schema, SchemaABC) and hasattr(self.__schema, "derive"):
+            self.__schema = _SchemaPrototype(self.__schema, context)
+
+    def _resolve_schema_class(self):
+        """Replace a class registry name passed as ``schema`` with the class it
+        refers to, so that copies of this field skip the lookup. Return the schema
+        class, or `None` if the relationship has no schema.
+        """
+        if isinstance(self.__schema, SchemaABC):
+            return self.__schema.__class__
+        if isinstance(self.__schema, _SchemaPrototype):
+            return self.__schema.schema.__class__
+        if isinstance(self.__schema, (str, bytes)):
+            if self.__schema == _RECURSIVE_NESTED:
+                return self.parent.__class__ if self.parent else None
+            self.__schema = class_registry.get_class(self.__schema)
+        return self.__schema or None
+
+    def _get_link_params(self):
+        """Return the parameters of the links of this field, such as
+        ``{"author_id": "<author.id>"}``, keyed by link name (``"self"`` or
+        ``"related"``). Links that are not set are left out.
+        """
+        ret = {}
+        if self.self_url:
+            ret["self"] = self.self_url_kwargs
+        if self.related_url:
+            ret["related"] = self.related_url_kwargs
+        return ret
+
+    def _build_link(self, link, params):
+        """Return the URL of the ``link`` link (``"self"`` or ``"related"``) given
+        its resolved parameters, or `None` if all of them are `None`.
+        """
+        url = self.self_url if link == "self" else self.related_url
+        non_null_params = {
+            key: value for key, value in params.items() if value is not None
+        }
+        if non_null_params:
+            return url.format(**non_null_params)
+        return None
+
     def get_related_url(self, obj):
         if self.related_url:
             params = resolve_params(obj, self.related_url_kwargs, default=self.default)
-            non_null_params = {
-                key: value for key, value in params.items() if value is not None
-            }
-            if non_null_params:
-                return self.related_url.format(**non_null_params)
+            return self._build_link("related", params)
         return None
 
     def get_self_url(self, obj):
         if self.self_url:
             params = resolve_params(obj, self.self_url_kwargs, default=self.default)
-            non_null_params = {
-                key: value for key, value in params.items() if value is not None
-            }
-            if non_null_params:
-                return self.self_url.format(**non_null_params)
+            return self._build_link("self", params)
         return None
 
+    def _serialize_column(self, columns, ids, length):
+        """Serialize this relationship for ``length`` resources given as columns,
+        with the ids of the related resources of each resource in ``ids``, if not
+        `None`.
+        """
+        dict_class = self.parent.dict_class if self.parent else dict
+        links = {
+            link: self.__build_column_links(link, params, columns, length)
+            for link, params in self._get_link_params().items()
+        }
+        self_urls = links.get("self", [None] * length)
+        related_urls = links.get("related", [None] * length)
+        ret = []
+        for index in range(length):
+            value = dict_class()
+            self_url = self_urls[index]
+            related_url = related_urls[index]
+            if self_url or related_url:
+                value["links"] = dict_class()
+                if self_url:
+                    value["links"]["self"] = self_url
+                if related_url:
+                    value["links"]["related"] = related_url
+            if ids is not None:
+                related = ids[index]
+                if related is None:
+                    value["data"] = [] if self.many else None
+                elif self.many:
+                    value["data"] = [
+                        {"type": self.type_, "id": _stringify(each)} for each in related
+                    ]
+                else:
+                    value["data"] = {"type": self.type_, "id": _stringify(related)}
+            ret.append(value)
+        return ret
+
+    def __build_column_links(self, link, url_kwargs, columns, length):
+        """Return the URLs of the ``link`` link of each of ``length`` resources
+        given as columns, built with `_build_link` like `get_related_url` and
+        `get_self_url` do for one object.
+        """
+        param_columns = {}
+        for name, attr_tpl in url_kwargs.items():
+            attr_name = tpl(str(attr_tpl))
+            if not attr_name:
+                param_columns[name] = [attr_tpl] * length
+            elif attr_name in columns:
+                param_columns[name] = columns[attr_name]
+            elif self.default is not missing_:
+                param_columns[name] = [self.default] * length
+            else:
+                raise AttributeError(f"{attr_name!r} is not a valid column")
+        names = list(param_columns)
+        rows = zip(*param_columns.values()) if names else [()] * length
+        return [self._build_link(link, dict(zip(names, row))) for row in rows]
+
     def get_resource_linkage(self, value):
         if self.many:
-            resource_object = [
-                {"type": self.type_, "id": _stringify(self._get_id(each))}
-                for each in value
-            ]
+            resource_object = [self._get_resource_identifier(each) for each in value]
         else:
-            resource_object = {
-                "type": self.type_,
-                "id": _stringify(self._get_id(value)),
-            }
+            resource_object = self._get_resource_identifier(value)
         return resource_object
 
+    def _get_resource_identifier(self, value):
+        return {"type": self.type_, "id": _stringify(self._get_id(value))}
+
     def extract_value(self, data):
         """Extract the id key and validate the request structure."""
         errors = []
@@ -200,18 +336,92 @@ class Relationship(BaseRelationship):
         # relationship. Unserialize it if we have a schema set; otherwise we
         # fall back below to old behaviour of only IDs.
         if "attributes" in data and self.__schema:
-            result = self.schema.load(
-                {"data": data, "included": self.root.included_data}
+            # Load through ``_do_load``: the included resource is part of the
+            # document of the root schema, which records its metrics
+            result = self.schema._do_load(
+                {"data": data, "included": self.root.included_data}, postprocess=True
             )
             return result
 
         id_value = data.get("id")
 
         if self.__schema:
-            id_value = self.schema.fields["id"].deserialize(id_value)
+            if self.__deserialize_id is None:
+                self.__deserialize_id = self.__make_id_deserializer()
+            id_value = self.__deserialize_id(id_value)
 
         return id_value
 
+    def _load_linkage(self, linkage):
+        """Validate and deserialize the resource linkage of a relationship
+        document in one pass. Return the ids, or the id for to-one relationships,
+        and a list of ``(pointer, message)`` errors. Invalid and duplicate
+        resource identifiers are left out of the ids.
+        """
+        if self.many:
+            if not is_collection(linkage):
+                return [], [("/data", "Relationship is list-like")]
+            pointer = "/data/{}"
+        else:
+            if linkage is None:
+                return None, []
+            if is_collection(linkage):
+                return None, [("/data", "Relationship is not list-like")]
+            linkage = [linkage]
+            pointer = "/data"
+
+        deserialize_id = None
+        if self.__schema:
+            if self.__deserialize_id is None:
+                self.__deserialize_id = self.__make_id_deserializer()
+            deserialize_id = self.__deserialize_id
+        type_ = self.type_
+        ids = []
+        errors = []
+        # Index of the first occurrence of each id, to detect duplicates
+        seen = {}
+        for index, item in enumerate(linkage):
+            if not (
+                isinstance(item, dict) and item.get("type") == type_ and "id" in item
+            ):
+                item_errors = self.__check_identifier(item, pointer.format(index))
+                if item_errors:
+                    errors.extend(item_errors)
+                    continue
+            id_value = item["id"]
+            if deserialize_id is not None:
+                try:
+                    id_value = deserialize_id(id_value)
+                except ValidationError as error:
+                    item_pointer = pointer.format(index) + "/id"
+                    errors.extend((item_pointer, message) for message in error.messages)
+                    continue
+            try:
+                first = seen.setdefault(id_value, index)
+            except TypeError:
+                first = seen.setdefault(str(id_value), index)
+            if first != index:
+                message = f"Duplicate of the resource identifier at index {first}"
+                errors.append((pointer.format(index), message))
+                continue
+            ids.append(id_value)
+        if not self.many:
+            return (ids[0] if ids else None), errors
+        return ids, errors
+
+    def __check_identifier(self, item, pointer):
+        """Return the ``(pointer, message)`` errors of a resource identifier."""
+        if not isinstance(item, dict):
+            return [(pointer, "Resource identifier must be an object")]
+        errors = []
+        if "id" not in item:
+            errors.append((pointer, "Must have an `id` field"))
+        if "type" not in item:
+            errors.append((pointer, "Must have a `type` field"))
+        elif item["type"] != self.type_:
+            errors.append((pointer + "/type", "Invalid `type` specified"))
+        return errors
+
     def deserialize(self, value, attr=None, data=None, **kwargs):
         """Deserialize ``value``.
 
@@ -265,29 +475,75 @@ class Relationship(BaseRelationship):
         if self.include_resource_linkage or self.include_data:
             if value is None:
                 ret["data"] = [] if self.many else None
+            elif self.include_data:
+                ret["data"] = self._serialize_linkage_and_included(value)
             else:
                 ret["data"] = self.get_resource_linkage(value)
-
-        if self.include_data and value is not None:
-            if self.many:
-                for item in value:
-                    self._serialize_included(item)
-            else:
-                self._serialize_included(value)
         return ret
 
+    def _serialize_linkage_and_included(self, value):
+        """Return the resource linkage of ``value`` and add the related resources to
+        the included data of the root schema. To-many values are iterated once, so
+        they can be generators or other one-shot iterables.
+        """
+        if not self.many:
+            self._serialize_included(value)
+            return self._get_resource_identifier(value)
+        linkage = []
+        for item in value:
+            self._serialize_included(item)
+            linkage.append(self._get_resource_identifier(item))
+        return linkage
+
     def _serialize_included(self, value):
-        result = self.schema.dump(value)
+        result = self.schema._dump_document(
+            value, sparse_fields=self.root.sparse_fields
+        )
         item = result["data"]
         self.root.included_data[(item["type"], item["id"])] = item
         for key, value in self.schema.included_data.items():
             self.root.included_data[key] = value
 
     def _get_id(self, value):
+        if self.__get_id is None:
+            self.__get_id = self.__make_id_getter()
+        return self.__get_id(value)
+
+    def __make_id_deserializer(self):
+        """Return a function that deserializes the id of a resource identifier."""
+        field = self.schema.fields["id"]
+        if type(field).deserialize is not Field.deserialize or field.validators:
+            return field.deserialize
+        # Skip the checks of `Field.deserialize` for present, non-null ids
+        deserialize = field._deserialize
+
+        def deserialize_id(value):
+            if value is None:
+                return field.deserialize(value)
+            return deserialize(value, None, None)
+
+        return deserialize_id
+
+    def __make_id_getter(self):
+        """Return a function that gets the id of a related object."""
+        id_field = self.id_field
         if self.__schema:
-            return self.schema.get_attribute(value, self.id_field, value)
-        else:
-            return get_value(value, self.id_field, value)
+            get_attribute = self.schema.get_attribute
+            if getattr(get_attribute, "__func__", None) is not ma.Schema.get_attribute:
+                return lambda value: get_attribute(value, id_field, value)
+        if "." in id_field:
+            return lambda value: get_value(value, id_field, value)
+
+        def get_id(value):
+            if isinstance(value, collections.abc.Mapping):
+                return value.get(id_field, value)
+            ret = getattr(value, id_field, missing_)
+            if ret is missing_:
+                # Objects such as `sqlite3.Row` only support item access
+                return get_value(value, id_field, value)
+            return ret
+
+        return get_id
 
 
 class DocumentMeta(Field):
@@ -3,12 +3,22 @@
 This includes a Flask-specific schema with custom Meta options and a
 relationship field for linking to related resources.
 """
+import time
+import zlib
+
 import flask
+from marshmallow import ValidationError
 from werkzeug.routing import BuildError
 
+from .codecs import JSONCodec
+from .exceptions import IncorrectTypeError
 from .fields import Relationship as GenericRelationship
 from .schema import Schema as DefaultSchema, SchemaOpts as DefaultOpts
 from .utils import resolve_params
+from .warmup import warm_up as _warm_up
+
+#: Media type of JSON API documents
+JSONAPI_MEDIA_TYPE = "application/vnd.api+json"
 
 
 class SchemaOpts(DefaultOpts):
@@ -38,12 +48,11 @@ class SchemaOpts(DefaultOpts):
                 "`self_view_kwargs` is specified."
             )
 
-        # Transfer Flask options to URL options, to piggy-back on its handling
-        meta.self_url = getattr(meta, "self_view", None)
-        meta.self_url_kwargs = getattr(meta, "self_view_kwargs", None)
-        meta.self_url_many = getattr(meta, "self_view_many", None)
-
         super().__init__(meta, *args, **kwargs)
+        # Transfer Flask options to URL options, to piggy-back on its handling
+        self.self_url = getattr(meta, "self_view", None)
+        self.self_url_kwargs = getattr(meta, "self_view_kwargs", None)
+        self.self_url_many = getattr(meta, "self_view_many", None)
 
 
 class Schema(DefaultSchema):
@@ -70,6 +79,91 @@ class Schema(DefaultSchema):
         """Generate URL with any kwargs interpolated."""
         return flask.url_for(view_name, **kwargs) if view_name else None
 
+    def make_response(self, obj, *, many=None, sparse_fields=None, status=200):
+        """Return a `flask.Response` holding the JSON API document for ``obj``,
+        with an ``ETag`` header and support for conditional requests.
+
+        If the ``version_attribute`` class Meta option is set, a weak ETag is
+        computed from resource ids and versions with `compute_etag`, and
+        serialization is skipped entirely when it matches the request's
+        ``If-None-Match`` header. Otherwise, the ETag is a hash of the full
+        document.
+        """
+        request = flask.request
+        etag = self.compute_etag(obj, many=many, sparse_fields=sparse_fields)
+        if (
+            etag is not None
+            and request.method in ("GET", "HEAD")
+            and request.if_none_match.contains_weak(etag)
+        ):
+            response = flask.Response(status=304)
+            response.set_etag(etag, weak=True)
+            return response
+
+        response = flask.Response(
+            self.dumps_bytes(obj, many=many, sparse_fields=sparse_fields),
+            status=status,
+            mimetype=JSONAPI_MEDIA_TYPE,
+        )
+        if etag is None:
+            response.add_etag()
+        else:
+            response.set_etag(etag, weak=True)
+        return response.make_conditional(request)
+
+    def load_request(self, *, many=None, partial=None, unknown=None):
+        """Load the JSON API document in the body of the current request.
+
+        The body is decoded with the ``codec`` class Meta option by
+        `get_request_document`. Validation errors abort the request with a
+        ``422 Unprocessable Entity`` response holding the JSON API error
+        objects, and resource type mismatches with ``409 Conflict``.
+        """
+        document = get_request_document(self.opts.codec)
+        try:
+            return self.load(document, many=many, partial=partial, unknown=unknown)
+        except IncorrectTypeError as err:
+            _abort(err.messages, 409, self.opts.codec)
+        except ValidationError as err:
+            _abort(err.messages, 422, self.opts.codec)
+
+    def stream_response(
+        self,
+        obj,
+        *,
+        many=None,
+        sparse_fields=None,
+        status=200,
+        gzip=False,
+        compress_level=6,
+        chunk_size=16384,
+    ):
+        """Return a streamed `flask.Response` that writes the JSON API document
+        for ``obj`` one resource object at a time, using `iter_dumps_bytes`.
+
+        :param bool gzip: Compress the response incrementally if the client
+            accepts the ``gzip`` content coding.
+        :param int compress_level: zlib compression level.
+        :param int chunk_size: Minimum size in bytes of the chunks sent to the
+            client before compression.
+        """
+        chunks = _coalesce(
+            self.iter_dumps_bytes(obj, many=many, sparse_fields=sparse_fields),
+            chunk_size,
+        )
+        headers = {}
+        if gzip:
+            headers["Vary"] = "Accept-Encoding"
+            if flask.request.accept_encodings.quality("gzip"):
+                chunks = _compress(chunks, compress_level)
+                headers["Content-Encoding"] = "gzip"
+        return flask.Response(
+            flask.stream_with_context(chunks),
+            status=status,
+            headers=headers,
+            mimetype=JSONAPI_MEDIA_TYPE,
+        )
+
 
 class Relationship(GenericRelationship):
     r"""Field which serializes to a "relationship object"
@@ -109,7 +203,7 @@ class Relationship(GenericRelationship):
         *,
         self_view=None,
         self_view_kwargs=None,
-        **kwargs
+        **kwargs,
     ):
         self.related_view = related_view
         self.related_view_kwargs = related_view_kwargs or {}
@@ -120,19 +214,128 @@ class Relationship(GenericRelationship):
     def get_url(self, obj, view_name, view_kwargs):
         if view_name:
             kwargs = resolve_params(obj, view_kwargs, default=self.default)
-            kwargs["endpoint"] = view_name
-            try:
-                return flask.url_for(**kwargs)
-            except BuildError:
-                if (
-                    None in kwargs.values()
-                ):  # most likely to be caused by empty relationship
-                    return None
-                raise
+            return self._url_for(view_name, kwargs)
         return None
 
+    def _url_for(self, view_name, kwargs):
+        kwargs = dict(kwargs, endpoint=view_name)
+        try:
+            return flask.url_for(**kwargs)
+        except BuildError:
+            if (
+                None in kwargs.values()
+            ):  # most likely to be caused by empty relationship
+                return None
+            raise
+
+    def _build_link(self, link, params):
+        view_name = self.self_view if link == "self" else self.related_view
+        return self._url_for(view_name, params)
+
+    def _get_link_params(self):
+        ret = {}
+        if self.self_view:
+            ret["self"] = self.self_view_kwargs
+        if self.related_view:
+            ret["related"] = self.related_view_kwargs
+        return ret
+
     def get_related_url(self, obj):
         return self.get_url(obj, self.related_view, self.related_view_kwargs)
 
     def get_self_url(self, obj):
         return self.get_url(obj, self.self_view, self.self_view_kwargs)
+
+
+def warm_up(app, schemas=None):
+    """Resolve and validate schema classes like `marshmallow_jsonapi.warm_up` and
+    prepare the URL map of ``app``. View names used by the ``self_view`` and ``self_view_many``
+    options and by `Relationship` fields that are not registered with ``app`` are
+    reported in ``errors``.
+
+    :param Flask app: The application the schemas generate URLs for.
+    :param schemas: Schema classes to warm up. Defaults to all the subclasses of
+        `marshmallow_jsonapi.Schema` defined so far.
+    :return: A `WarmUpReport <marshmallow_jsonapi.warmup.WarmUpReport>`.
+    """
+    start = time.perf_counter()
+    report = _warm_up(schemas)
+    app.url_map.update()
+    errors = list(report.errors)
+    for schema_class in report.schemas:
+        if not issubclass(schema_class, Schema):
+            continue
+        views = [schema_class.opts.self_url, schema_class.opts.self_url_many]
+        for field_obj in schema_class._declared_fields.values():
+            if isinstance(field_obj, Relationship):
+                views.extend((field_obj.related_view, field_obj.self_view))
+        for view in views:
+            if view and view not in app.view_functions:
+                errors.append((schema_class, ValueError(f'Unknown view "{view}"')))
+    return report._replace(errors=tuple(errors), duration=time.perf_counter() - start)
+
+
+def get_request_document(codec=None):
+    """Return the JSON API document in the body of the current request.
+
+    The raw body is decoded once per request and the result is cached on the
+    request, so later calls (from middleware, decorators or views) return the
+    same document. Requests that do not use the JSON API media type abort with
+    ``415 Unsupported Media Type``, and bodies that are not a JSON object abort
+    with ``400 Bad Request``.
+
+    :param codec: The codec to decode the body with. Defaults to
+        `JSONCodec <marshmallow_jsonapi.codecs.JSONCodec>`.
+    """
+    request = flask.request
+    try:
+        return request.jsonapi_document
+    except AttributeError:
+        pass
+    codec = codec or JSONCodec()
+    if request.mimetype != JSONAPI_MEDIA_TYPE or request.mimetype_params:
+        _abort(_error(f"Content-Type must be {JSONAPI_MEDIA_TYPE}.", "/"), 415, codec)
+    try:
+        document = codec.decode(request.get_data(cache=True))
+    except ValueError:
+        document = None
+    if not isinstance(document, dict):
+        _abort(_error("Request body must be a JSON object.", "/"), 400, codec)
+    request.jsonapi_document = document
+    return document
+
+
+def _error(detail, pointer):
+    return {"errors": [{"detail": detail, "source": {"pointer": pointer}}]}
+
+
+def _abort(messages, status, codec):
+    """Abort the current request with JSON API error objects."""
+    flask.abort(
+        flask.Response(codec.encode(messages), status, mimetype=JSONAPI_MEDIA_TYPE)
+    )
+
+
+def _coalesce(chunks, size):
+    """Join consecutive chunks into chunks of at least ``size`` bytes."""
+    buffer = []
+    length = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield b"".join(buffer)
+            buffer = []
+            length = 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def _compress(chunks, level):
+    """Gzip chunks incrementally, flushing after each chunk so the client can
+    decode the response as it arrives.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
@@ -0,0 +1,318 @@
+"""Timing of the phases and fields of dumping and loading JSON API documents.
+
+Use `Schema.instrument <marshmallow_jsonapi.Schema.instrument>` to time a
+schema, e.g. on a sample of requests: ::
+
+    schema = PostSchema(include_data=("author",))
+    if random.random() < 0.01:
+        with schema.instrument() as timings:
+            document = schema.dump(posts, many=True)
+        log.info("dump phases: %r", timings.totals)
+    else:
+        document = schema.dump(posts, many=True)
+
+Instrumentation hooks into methods of the schema instance, of the schemas of
+its included relationships and of its relationship fields for the duration of
+the ``with`` block. Only the dumps and loads run in the context that entered the
+block (the thread or `asyncio` task, see `contextvars`) are timed, so a schema
+shared between threads can be instrumented in one of them. Methods are restored
+when the last block using them exits, in any order, and schemas that are not
+instrumented run unchanged. Copies of an instrumented schema, such as the
+schemas returned by `derive <marshmallow_jsonapi.Schema.derive>` or used by
+`marshmallow_jsonapi.parallel`, are not instrumented.
+
+Phases nest, e.g. ``"include"`` runs within ``"serialize"``, and their times
+include the phases they contain. The phases are:
+
+* ``"serialize"`` - serializing fields to a dictionary (`marshmallow.Schema._serialize`).
+* ``"format_response"`` - formatting the top-level document (``format_json_api_response``).
+* ``"format_items"`` - formatting resource objects (``format_items``).
+* ``"resource_links"`` - generating resource links (``get_resource_links``).
+* ``"relationship_links"`` - generating relationship links (``get_related_url``
+  and ``get_self_url`` of relationship fields).
+* ``"include"`` - serializing an included resource (``_serialize_included`` of
+  relationship fields).
+* ``"load"`` - the whole load, including error formatting (``_do_load``).
+* ``"unwrap"`` - unwrapping resource objects (``unwrap_request``).
+* ``"deserialize"`` - deserializing fields (`marshmallow.Schema._deserialize`).
+* ``"format_errors"`` - formatting error objects (``format_errors``).
+
+To find the fields that dominate a dump, use `Schema.profile_fields
+<marshmallow_jsonapi.Schema.profile_fields>`: ::
+
+    with schema.profile_fields() as profiler:
+        schema.dump(posts, many=True)
+    profiler.print_report(limit=10)
+"""
+import collections
+import contextlib
+import contextvars
+import functools
+import sys
+import threading
+import time
+import types
+
+from .fields import Relationship
+
+_SCHEMA_PHASES = (
+    ("_serialize", "serialize"),
+    ("format_json_api_response", "format_response"),
+    ("format_items", "format_items"),
+    ("get_resource_links", "resource_links"),
+    ("_do_load", "load"),
+    ("unwrap_request", "unwrap"),
+    ("_deserialize", "deserialize"),
+    ("format_errors", "format_errors"),
+)
+_RELATIONSHIP_PHASES = (
+    ("get_related_url", "relationship_links"),
+    ("get_self_url", "relationship_links"),
+    ("_serialize_included", "include"),
+)
+_FIELD_STEPS = (("serialize", "serialize"), ("deserialize", "deserialize"))
+_RELATIONSHIP_STEPS = (
+    ("get_related_url", "links"),
+    ("get_self_url", "links"),
+    ("_get_resource_identifier", "linkage"),
+    ("_serialize_included", "include"),
+)
+
+
+class PhaseTimings:
+    """Callback that accumulates the durations and counts of phases.
+
+    :ivar dict totals: Total seconds spent per phase.
+    :ivar dict counts: Number of times each phase ran.
+    """
+
+    def __init__(self):
+        self.totals = collections.defaultdict(float)
+        self.counts = collections.defaultdict(int)
+
+    def __call__(self, phase, duration):
+        self.totals[phase] += duration
+        self.counts[phase] += 1
+
+    def __repr__(self):
+        phases = ", ".join(
+            f"{phase}={self.totals[phase] * 1000:.3f}ms/{self.counts[phase]}"
+            for phase in self.totals
+        )
+        return f"<PhaseTimings({phases})>"
+
+
+class FieldProfiler:
+    """Accumulates the number of calls and the cumulative time of the steps of
+    each field.
+
+    Steps are ``"serialize"`` and ``"deserialize"`` for all fields, and
+    ``"links"`` (relationship links), ``"linkage"`` (resource identifier of a
+    related object) and ``"include"`` (serializing an included resource) for
+    relationships. The ``"serialize"`` time of a relationship includes the times
+    of its other steps, which includes the times of the fields of the included
+    resource.
+
+    :ivar dict stats: ``[calls, seconds]`` lists keyed by
+        ``(schema_class, field_name, step)``.
+    """
+
+    def __init__(self):
+        self.stats = collections.defaultdict(lambda: [0, 0.0])
+
+    def __call__(self, key, duration):
+        stat = self.stats[key]
+        stat[0] += 1
+        stat[1] += duration
+
+    def report(self, limit=None):
+        """Return ``(schema_class, field_name, step, calls, seconds)`` tuples,
+        most time-consuming first.
+        """
+        ret = sorted(
+            (key + tuple(stat) for key, stat in self.stats.items()),
+            key=lambda row: row[4],
+            reverse=True,
+        )
+        return ret[:limit]
+
+    def print_report(self, limit=None, file=None):
+        """Print the `report` as a table to ``file`` (`sys.stdout` by default)."""
+        file = file or sys.stdout
+        print(
+            f"{'field':<40} {'step':<12} {'calls':>8} {'cumtime':>10} {'percall':>10}",
+            file=file,
+        )
+        for schema_class, field_name, step, calls, seconds in self.report(limit):
+            name = f"{schema_class.__name__}.{field_name}"
+            print(
+                f"{name:<40} {step:<12} {calls:>8} {seconds:>10.6f} "
+                f"{seconds / calls:>10.6f}",
+                file=file,
+            )
+
+
+@contextlib.contextmanager
+def profile_fields(schema, profiler=None):
+    """Context manager that records the steps of the fields of ``schema`` and of
+    the schemas of its included relationships in ``profiler``. Yields the
+    profiler, a new `FieldProfiler` by default.
+    """
+    profiler = profiler or FieldProfiler()
+    patcher = _Patcher()
+    try:
+        for current in _iter_schemas(schema):
+            for field_name, field_obj in current.fields.items():
+                steps = _FIELD_STEPS
+                if isinstance(field_obj, Relationship):
+                    steps += _RELATIONSHIP_STEPS
+                for name, step in steps:
+                    key = (current.__class__, field_name, step)
+                    patcher.patch(
+                        field_obj, name, functools.partial(_timed, profiler, key)
+                    )
+        patcher.activate()
+        yield profiler
+    finally:
+        patcher.restore()
+
+
+@contextlib.contextmanager
+def instrument(schema, callback=None):
+    """Context manager that calls ``callback(phase, duration)`` with the
+    duration in seconds, measured with `time.perf_counter`, each time a phase of
+    ``schema`` runs. Yields the callback, a new `PhaseTimings` by default.
+    """
+    callback = callback or PhaseTimings()
+    patcher = _Patcher()
+    try:
+        for target, name, phase in _iter_targets(schema):
+            patcher.patch(target, name, functools.partial(_timed, callback, phase))
+        patcher.activate()
+        yield callback
+    finally:
+        patcher.restore()
+
+
+#: Patchers active in the current context
+_active_patchers = contextvars.ContextVar("active_patchers", default=())
+_missing = object()
+
+
+class _Patcher:
+    """Hooks into methods of instances, for the current context only.
+
+    A method hooked by any patcher is replaced with a dispatcher, which calls the
+    hooks of the patchers active in the current context, or only the method if
+    there are none. The method is restored when the last patcher hooking it is
+    restored, whatever the order.
+    """
+
+    _lock = threading.Lock()
+    # ``[obj, previous, count]`` lists keyed by ``(id(obj), name)``
+    _installed = {}
+
+    def __init__(self):
+        self._hooks = {}
+
+    def patch(self, obj, name, hook):
+        """Call ``hook(method, *args, **kwargs)`` instead of the ``name`` method of
+        ``obj`` while this patcher is active.
+        """
+        key = (id(obj), name)
+        with self._lock:
+            entry = self._installed.get(key)
+            if entry is None:
+                method = getattr(obj, name)
+                previous = obj.__dict__.get(name, _missing)
+                setattr(obj, name, _make_dispatcher(key, method, previous))
+                self._installed[key] = [obj, previous, 1]
+            else:
+                entry[2] += 1
+            self._hooks.setdefault(key, []).append(hook)
+
+    def activate(self):
+        """Apply the hooks of this patcher in the current context."""
+        _active_patchers.set(_active_patchers.get() + (self,))
+
+    def restore(self):
+        """Deactivate this patcher and restore the methods no other patcher hooks."""
+        active = _active_patchers.get()
+        if self in active:
+            _active_patchers.set(tuple(each for each in active if each is not self))
+        with self._lock:
+            for key, hooks in self._hooks.items():
+                entry = self._installed[key]
+                entry[2] -= len(hooks)
+                if entry[2]:
+                    continue
+                del self._installed[key]
+                obj, previous, _ = entry
+                if previous is _missing:
+                    delattr(obj, key[1])
+                else:
+                    setattr(obj, key[1], previous)
+            self._hooks = {}
+
+
+def _make_dispatcher(key, method, previous):
+    @functools.wraps(method)
+    def dispatcher(*args, **kwargs):
+        call = method
+        for patcher in _active_patchers.get():
+            for hook in patcher._hooks.get(key, ()):
+                call = functools.partial(hook, call)
+        return call(*args, **kwargs)
+
+    dispatcher._patcher_previous = previous
+    return dispatcher
+
+
+def _unpatch_copy(obj):
+    """Remove the dispatchers that a shallow copy of a patched instance shares
+    with the original. They call the methods of the original, and restoring the
+    original does not reach the copy.
+    """
+    if not _Patcher._installed:
+        return
+    for name, value in list(vars(obj).items()):
+        if isinstance(value, types.FunctionType) and hasattr(
+            value, "_patcher_previous"
+        ):
+            if value._patcher_previous is _missing:
+                delattr(obj, name)
+            else:
+                setattr(obj, name, value._patcher_previous)
+
+
+def _iter_schemas(schema):
+    """Yield ``schema`` and the nested schemas of its included relationships."""
+    seen = set()
+    queue = [schema]
+    while queue:
+        current = queue.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        yield current
+        for field_obj in current.fields.values():
+            if isinstance(field_obj, Relationship) and field_obj.include_data:
+                queue.append(field_obj.schema)
+
+
+def _iter_targets(schema):
+    for current in _iter_schemas(schema):
+        for name, phase in _SCHEMA_PHASES:
+            yield current, name, phase
+        for field_obj in current.fields.values():
+            if isinstance(field_obj, Relationship):
+                for name, phase in _RELATIONSHIP_PHASES:
+                    yield field_obj, name, phase
+
+
+def _timed(callback, key, method, *args, **kwargs):
+    start = time.perf_counter()
+    try:
+        return method(*args, **kwargs)
+    finally:
+        callback(key, time.perf_counter() - start)
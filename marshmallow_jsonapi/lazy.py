@@ -0,0 +1,128 @@
+"""Lazily-deserialized resource objects returned by `Schema.load_lazy
+<marshmallow_jsonapi.Schema.load_lazy>`.
+"""
+import collections.abc
+
+from marshmallow import EXCLUDE, INCLUDE, RAISE, ValidationError
+from marshmallow.utils import is_collection, missing
+
+
+class LazyResource(collections.abc.Mapping):
+    """Read-only mapping of a single deserialized resource object.
+
+    Each field is deserialized and validated by its schema field the first time
+    its key is accessed; the result is cached. Keys are the same as the keys of
+    the dictionary returned by `Schema.load <marshmallow_jsonapi.Schema.load>`.
+    Iterating over the resource or calling `validate_all` loads every field.
+
+    Schema-level processors and validators are not run.
+
+    :param Schema schema: The schema that unwrapped the resource object.
+    :param dict payload: The unwrapped resource object.
+    :param int index: Position of the resource in the ``data`` array, if the
+        document holds a collection.
+    :param partial: Whether to ignore missing required fields, or the names of
+        the fields to ignore, as for `Schema.load
+        <marshmallow_jsonapi.Schema.load>`.
+    :param unknown: How unknown keys of the resource object are handled: one of
+        ``RAISE``, ``EXCLUDE`` or ``INCLUDE``. Defaults to the ``unknown`` option
+        of ``schema``.
+    """
+
+    def __init__(self, schema, payload, index=None, partial=None, unknown=None):
+        self._schema = schema
+        self._payload = payload
+        self._index = index
+        self._partial = partial
+        self._unknown = schema.unknown if unknown is None else unknown
+        self._included_data = schema.included_data
+        self._document_meta = schema.document_meta
+        self._fields = {
+            field_obj.attribute or field_name: (field_name, field_obj)
+            for field_name, field_obj in schema.load_fields.items()
+        }
+        self._values = {}
+        if self._unknown == EXCLUDE:
+            self._unknown_keys = ()
+        else:
+            known = {
+                field_obj.data_key or field_name
+                for field_name, field_obj in self._fields.values()
+            }
+            self._unknown_keys = [key for key in payload if key not in known]
+        if self._unknown == INCLUDE:
+            for key in self._unknown_keys:
+                self._values[key] = payload[key]
+
+    def __repr__(self):
+        return "<LazyResource(type={!r}, id={!r})>".format(
+            self._schema.opts.type_, self._payload.get("id")
+        )
+
+    def __getitem__(self, key):
+        try:
+            value = self._values[key]
+        except KeyError:
+            if key not in self._fields:
+                raise
+            value = self._values[key] = self._load_field(*self._fields[key])
+        if value is missing:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self):
+        return iter(self.validate_all())
+
+    def __len__(self):
+        return len(self.validate_all())
+
+    def validate_all(self):
+        """Load every field that has not been accessed yet and return the result
+        as a `dict`. Unknown keys are errors if the ``unknown`` policy is
+        ``RAISE``, as for `Schema.load <marshmallow_jsonapi.Schema.load>`, but
+        only here: accessing a field does not check for them.
+
+        :raise ValidationError: With all field errors formatted as JSON API
+            Error objects.
+        """
+        errors = {}
+        for key, (field_name, field_obj) in self._fields.items():
+            if key in self._values:
+                continue
+            try:
+                self._values[key] = self._deserialize(field_name, field_obj)
+            except ValidationError as err:
+                errors[field_obj.data_key or field_name] = err.messages
+        if self._unknown == RAISE:
+            for key in self._unknown_keys:
+                errors[key] = ["Unknown field."]
+        if errors:
+            raise ValidationError(self._format_errors(errors))
+        return {
+            key: value for key, value in self._values.items() if value is not missing
+        }
+
+    def _load_field(self, field_name, field_obj):
+        try:
+            return self._deserialize(field_name, field_obj)
+        except ValidationError as err:
+            raise ValidationError(
+                self._format_errors({field_obj.data_key or field_name: err.messages})
+            ) from err
+
+    def _deserialize(self, field_name, field_obj):
+        # Relationships read the document's ``included`` member from the schema
+        self._schema.included_data = self._included_data
+        self._schema.document_meta = self._document_meta
+        raw_value = self._payload.get(field_obj.data_key or field_name, missing)
+        if raw_value is missing and (
+            self._partial is True
+            or (is_collection(self._partial) and field_name in self._partial)
+        ):
+            return missing
+        return field_obj.deserialize(raw_value, field_name, self._payload)
+
+    def _format_errors(self, errors):
+        if self._index is None:
+            return self._schema.format_errors(errors, many=False)
+        return self._schema.format_errors({self._index: errors}, many=True)
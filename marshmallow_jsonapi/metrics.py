@@ -0,0 +1,246 @@
+"""Shape metrics of dumped and loaded JSON API documents.
+
+Metrics are enabled per schema with the ``metrics`` `class Meta` option. After
+each top-level `dump <marshmallow_jsonapi.Schema.dump>`, `dumps_bytes
+<marshmallow_jsonapi.Schema.dumps_bytes>`, `load
+<marshmallow_jsonapi.Schema.load>` and `loads_bytes
+<marshmallow_jsonapi.Schema.loads_bytes>`, the schema summarizes the shape of
+the document (never its data) as a `DocumentShape` and passes it to the sink: ::
+
+    from marshmallow_jsonapi import Schema
+    from marshmallow_jsonapi.metrics import InMemoryMetrics
+
+    metrics = InMemoryMetrics(latency_threshold=0.5, size_threshold=1_000_000)
+
+
+    class PostSchema(Schema):
+        class Meta:
+            type_ = "posts"
+            metrics = metrics
+
+The size of documents is measured by `dumps_bytes
+<marshmallow_jsonapi.Schema.dumps_bytes>` and `loads_bytes
+<marshmallow_jsonapi.Schema.loads_bytes>`, which encode or decode them anyway.
+Documents returned by `dump <marshmallow_jsonapi.Schema.dump>` are only
+measured if the sink sets ``measure_size``, at the cost of encoding them again.
+
+Included resources serialized or deserialized for a relationship are part of
+the document of the top-level schema and are not recorded on their own. The
+functions of `marshmallow_jsonapi.parallel` do not record metrics.
+"""
+import collections
+import threading
+
+from marshmallow.utils import is_collection
+
+#: Summary of a document: the operation (``"dump"`` or ``"load"``), the ``type_``
+#: of the schema, the number of primary resources, the number of included
+#: resources per type, the maximum depth of included resources (``1`` for
+#: resources referred to by primary data), the linkage lengths as
+#: ``(resources, identifiers, maximum)`` tuples keyed by ``(type, relationship)``,
+#: the number of errors, the size in bytes (`None` if not measured) and the
+#: duration in seconds.
+DocumentShape = collections.namedtuple(
+    "DocumentShape",
+    (
+        "operation",
+        "type_",
+        "primary",
+        "included",
+        "depth",
+        "linkage",
+        "errors",
+        "size",
+        "duration",
+    ),
+)
+
+
+class MetricsSink:
+    """Interface of metrics sinks. Subclass it to send document shapes to other
+    backends. The base class records nothing and is the default ``metrics``.
+    """
+
+    #: Whether schemas summarize documents for this sink. If `False`, schemas
+    #: skip the summary and `record` is never called.
+    enabled = False
+    #: Whether schemas encode dumped documents with their ``codec`` to measure
+    #: the size of documents they did not encode themselves. Loaded documents
+    #: are only measured by `loads_bytes <marshmallow_jsonapi.Schema.loads_bytes>`.
+    measure_size = False
+
+    def record(self, shape):
+        """Record a `DocumentShape`."""
+        pass
+
+
+class InMemoryMetrics(MetricsSink):
+    """Thread-safe sink that aggregates document shapes in memory and keeps the
+    shapes of slow or large documents.
+
+    Counters are keyed by ``(operation, type_)`` of the schema, except
+    ``included``, which is keyed by ``(operation, type)`` of the included
+    resources, and ``linkage``, which holds ``[resources, identifiers, maximum]``
+    lists keyed by ``(type, relationship)``.
+
+    :param float latency_threshold: Keep the shapes of documents that took at
+        least this many seconds. `None` disables the threshold.
+    :param int size_threshold: Keep the shapes of documents of at least this
+        many bytes. `None` disables the threshold.
+    :param int max_samples: Number of most recent shapes kept in ``samples``.
+    :param bool measure_size: Whether to measure the size of documents dumped
+        with `dump <marshmallow_jsonapi.Schema.dump>`, which encodes them once
+        more. The size of documents dumped with `dumps_bytes
+        <marshmallow_jsonapi.Schema.dumps_bytes>` is always measured.
+    """
+
+    enabled = True
+
+    def __init__(
+        self,
+        latency_threshold=None,
+        size_threshold=None,
+        max_samples=100,
+        measure_size=False,
+    ):
+        self.latency_threshold = latency_threshold
+        self.size_threshold = size_threshold
+        self.measure_size = measure_size
+        self.documents = collections.Counter()
+        self.primary = collections.Counter()
+        self.included = collections.Counter()
+        self.errors = collections.Counter()
+        self.size = collections.Counter()
+        self.duration = collections.Counter()
+        self.linkage = {}
+        self.max_depth = 0
+        self.max_size = 0
+        self.samples = collections.deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+
+    def record(self, shape):
+        key = (shape.operation, shape.type_)
+        with self._lock:
+            self.documents[key] += 1
+            self.primary[key] += shape.primary
+            for type_, count in shape.included.items():
+                self.included[(shape.operation, type_)] += count
+            self.errors[key] += shape.errors
+            self.duration[key] += shape.duration
+            if shape.size is not None:
+                self.size[key] += shape.size
+                self.max_size = max(self.max_size, shape.size)
+            if shape.depth is not None:
+                self.max_depth = max(self.max_depth, shape.depth)
+            for linkage_key, (resources, identifiers, maximum) in shape.linkage.items():
+                stat = self.linkage.setdefault(linkage_key, [0, 0, 0])
+                stat[0] += resources
+                stat[1] += identifiers
+                stat[2] = max(stat[2], maximum)
+            if self._is_sampled(shape):
+                self.samples.append(shape)
+
+    def _is_sampled(self, shape):
+        if self.latency_threshold is not None:
+            if shape.duration >= self.latency_threshold:
+                return True
+        if self.size_threshold is not None and shape.size is not None:
+            return shape.size >= self.size_threshold
+        return False
+
+    def clear(self):
+        """Reset the counters and remove the samples."""
+        with self._lock:
+            for counter in (
+                self.documents,
+                self.primary,
+                self.included,
+                self.errors,
+                self.size,
+                self.duration,
+            ):
+                counter.clear()
+            self.linkage.clear()
+            self.max_depth = self.max_size = 0
+            self.samples.clear()
+
+
+def summarize(document, operation, type_, *, errors=0, size=None, duration=0.0):
+    """Return the `DocumentShape` of a JSON API ``document``. Malformed parts of
+    the document are ignored.
+    """
+    data = document.get("data") if isinstance(document, dict) else None
+    if isinstance(data, dict):
+        resources = [data]
+    elif is_collection(data):
+        resources = [item for item in data if isinstance(item, dict)]
+    else:
+        resources = []
+    included = document.get("included") if isinstance(document, dict) else None
+    if is_collection(included):
+        included = [item for item in included if isinstance(item, dict)]
+    else:
+        included = []
+
+    linkage = {}
+    for item in resources + included:
+        for name, identifiers in _iter_relationships(item):
+            stat = linkage.setdefault((item.get("type"), name), [0, 0, 0])
+            stat[0] += 1
+            stat[1] += len(identifiers)
+            stat[2] = max(stat[2], len(identifiers))
+
+    return DocumentShape(
+        operation,
+        type_,
+        len(data) if is_collection(data) else int(data is not None),
+        dict(collections.Counter(item.get("type") for item in included)),
+        _get_depth(resources, included),
+        {key: tuple(stat) for key, stat in linkage.items()},
+        errors,
+        size,
+        duration,
+    )
+
+
+def _iter_relationships(item):
+    """Yield the name and the resource identifiers of the relationships of a
+    resource object that have resource linkage.
+    """
+    relationships = item.get("relationships")
+    if not isinstance(relationships, dict):
+        return
+    for name, value in relationships.items():
+        if not isinstance(value, dict) or "data" not in value:
+            continue
+        linkage = value["data"]
+        if isinstance(linkage, dict):
+            yield name, [linkage]
+        elif is_collection(linkage):
+            yield name, [each for each in linkage if isinstance(each, dict)]
+        else:
+            yield name, []
+
+
+def _get_depth(resources, included):
+    """Return the number of relationship hops from ``resources`` to the farthest
+    included resource reachable through resource linkage.
+    """
+    index = {(item.get("type"), str(item.get("id"))): item for item in included}
+    seen = set()
+    depth = 0
+    level = resources
+    while level and index:
+        next_level = []
+        for item in level:
+            for _, identifiers in _iter_relationships(item):
+                for identifier in identifiers:
+                    key = (identifier.get("type"), str(identifier.get("id")))
+                    if key in index and key not in seen:
+                        seen.add(key)
+                        next_level.append(index[key])
+        if not next_level:
+            break
+        depth += 1
+        level = next_level
+    return depth
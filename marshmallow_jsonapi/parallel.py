@@ -0,0 +1,343 @@
+"""Serialization and deserialization of large collections in parallel worker
+processes or threads.
+
+The primary data is split into chunks that worker processes serialize or
+deserialize with their own instance of the schema, created from the schema class
+and its constructor options. The results are then merged in the original
+order: ::
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    from marshmallow_jsonapi.parallel import dump_parallel
+
+    with ProcessPoolExecutor() as executor:
+        document = dump_parallel(
+            PostSchema(include_data=("author",)), posts, executor=executor
+        )
+
+The schema class must be importable by the workers (i.e. defined at module
+level), and the objects, the context and the results must be picklable.
+`dump_threaded` has no such requirements.
+"""
+import collections
+import concurrent.futures
+import copy
+import itertools
+import math
+import os
+import uuid
+
+from marshmallow import ValidationError
+from marshmallow.utils import is_collection
+
+# Schema instance of the current worker process, keyed by the token of the
+# definition it was created from
+_worker_schema = {}
+
+
+def dump_parallel(
+    schema,
+    objs,
+    *,
+    sparse_fields=None,
+    chunk_size=None,
+    max_workers=None,
+    executor=None,
+):
+    """Serialize a collection of objects to a JSON API document in worker
+    processes. The result is the same as ``schema.dump(objs, many=True)``, except
+    that ``pass_many`` processors receive one chunk at a time.
+
+    :param Schema schema: The schema to serialize the objects with.
+    :param objs: The objects to serialize.
+    :param dict sparse_fields: Optional sparse fieldsets, as for `Schema.dump
+        <marshmallow_jsonapi.Schema.dump>`.
+    :param int chunk_size: Number of objects serialized per task. Defaults to
+        splitting the objects in four chunks per worker.
+    :param int max_workers: Number of worker processes, if ``executor`` is not
+        given. Defaults to the number of processors.
+    :param executor: A `concurrent.futures.Executor` to run the tasks in. By
+        default, a `ProcessPoolExecutor <concurrent.futures.ProcessPoolExecutor>`
+        is created and shut down for the call.
+    """
+    if chunk_size is None:
+        if not hasattr(objs, "__len__"):
+            objs = list(objs)
+        chunk_size = _get_chunk_size(len(objs), max_workers)
+    results = _map(
+        executor or concurrent.futures.ProcessPoolExecutor,
+        max_workers,
+        _dump_chunk,
+        itertools.repeat(_get_definition(schema)),
+        _iter_chunks(objs, chunk_size),
+        itertools.repeat(sparse_fields),
+    )
+    return _merge_dumps(schema, results, sparse_fields)
+
+
+def dump_threaded(
+    schema,
+    objs,
+    *,
+    sparse_fields=None,
+    chunk_size=None,
+    max_workers=None,
+    executor=None,
+):
+    """Serialize a collection of objects to a JSON API document in threads. The
+    result is the same as ``schema.dump(objs, many=True)``, except that
+    ``pass_many`` processors receive one chunk at a time.
+
+    Each chunk is serialized by a schema derived from ``schema`` with
+    `Schema.derive <marshmallow_jsonapi.Schema.derive>`, so chunks do not share
+    included data, document meta or relationship include settings, and
+    ``schema`` itself is not modified. It can therefore be shared by concurrent
+    calls. Threads serialize in parallel on free-threaded builds of CPython;
+    otherwise they only help when getting attributes releases the GIL, e.g.
+    when it queries a database.
+
+    :param Schema schema: The schema to serialize the objects with.
+    :param objs: The objects to serialize.
+    :param dict sparse_fields: Optional sparse fieldsets, as for `Schema.dump
+        <marshmallow_jsonapi.Schema.dump>`.
+    :param int chunk_size: Number of objects serialized per task. Defaults to
+        splitting the objects in four chunks per worker.
+    :param int max_workers: Number of threads, if ``executor`` is not given.
+        Defaults to the number of processors.
+    :param executor: A `concurrent.futures.Executor` to run the tasks in. By
+        default, a `ThreadPoolExecutor <concurrent.futures.ThreadPoolExecutor>`
+        is created and shut down for the call.
+    """
+    if chunk_size is None:
+        if not hasattr(objs, "__len__"):
+            objs = list(objs)
+        chunk_size = _get_chunk_size(len(objs), max_workers)
+
+    def dump_chunk(chunk):
+        return _dump_with(schema.derive(many=True), chunk, sparse_fields)
+
+    results = _map(
+        executor or concurrent.futures.ThreadPoolExecutor,
+        max_workers,
+        dump_chunk,
+        _iter_chunks(objs, chunk_size),
+    )
+    # Render the document with a copy, to leave the shared schema untouched
+    return _merge_dumps(copy.copy(schema), results, sparse_fields)
+
+
+def _merge_dumps(schema, results, sparse_fields):
+    """Merge the results of serializing chunks into a document, like the
+    ``post_dump`` processor of ``schema`` would, and store the merged included
+    data and document meta on ``schema``.
+    """
+    data = []
+    included = {}
+    document_meta = {}
+    for chunk_data, chunk_included, chunk_meta in results:
+        data.extend(chunk_data)
+        included.update(chunk_included)
+        document_meta.update(chunk_meta)
+
+    schema.included_data = included
+    schema.document_meta = document_meta
+    schema.sparse_fields = sparse_fields or {}
+    ret = schema.wrap_response(data, True)
+    ret = schema.render_included_data(ret)
+    ret = schema.render_meta_document(ret)
+    return ret
+
+
+def load_parallel(
+    schema,
+    data,
+    *,
+    partial=None,
+    unknown=None,
+    chunk_size=None,
+    max_workers=None,
+    executor=None,
+):
+    """Deserialize a JSON API document holding a collection of resource objects
+    in worker processes. The result and the error messages are the same as
+    for ``schema.load(data, many=True)``, except that ``pass_many`` processors and
+    validators receive one chunk at a time.
+
+    Each chunk is sent with the included resources its resource objects refer
+    to, directly or through other included resources.
+
+    :param Schema schema: The schema to deserialize the document with.
+    :param dict data: The JSON API document to deserialize.
+    :param partial: Same as for `marshmallow.Schema.load`.
+    :param unknown: Same as for `marshmallow.Schema.load`.
+    :param int chunk_size: Number of resource objects deserialized per task.
+        Defaults to splitting them in four chunks per worker.
+    :param int max_workers: Number of worker processes, if ``executor`` is not
+        given. Defaults to the number of processors.
+    :param executor: A `concurrent.futures.Executor` to run the tasks in. By
+        default, a `ProcessPoolExecutor <concurrent.futures.ProcessPoolExecutor>`
+        is created and shut down for the call.
+    :raise ValidationError: With JSON API error objects, if the document is
+        invalid.
+    """
+    if not isinstance(data, dict) or not is_collection(data.get("data")):
+        # Let the schema report the invalid document structure
+        return schema.load(data, many=True, partial=partial, unknown=unknown)
+
+    resources = data["data"]
+    included = data.get("included")
+    index = _index_included(included) if included else None
+    if chunk_size is None:
+        chunk_size = _get_chunk_size(len(resources), max_workers)
+    documents = []
+    for chunk in _iter_chunks(resources, chunk_size):
+        document = {"data": chunk}
+        if index is not None:
+            document["included"] = _get_referenced(chunk, index)
+        if "meta" in data:
+            document["meta"] = data["meta"]
+        documents.append(document)
+    results = _map(
+        executor or concurrent.futures.ProcessPoolExecutor,
+        max_workers,
+        _load_chunk,
+        itertools.repeat(_get_definition(schema)),
+        documents,
+        itertools.repeat(partial),
+        itertools.repeat(unknown),
+    )
+
+    loaded = []
+    errors = {}
+    for offset, (chunk_loaded, chunk_errors) in zip(
+        range(0, len(resources), chunk_size), results
+    ):
+        if chunk_errors and "_schema" in chunk_errors:
+            # The document failed validation before any resource was loaded
+            errors = chunk_errors["_schema"]
+            break
+        loaded.extend(chunk_loaded)
+        for index_, messages in (chunk_errors or {}).items():
+            errors[offset + index_] = messages
+
+    schema.included_data = data.get("included", {})
+    schema.document_meta = data.get("meta", {})
+    if errors:
+        raise ValidationError(
+            schema.format_errors(errors, many=True), data=data, valid_data=loaded
+        )
+    return loaded
+
+
+def _map(executor, max_workers, func, *iterables):
+    """Run ``func`` over ``iterables`` in ``executor``, or in an executor created
+    for the call if ``executor`` is an executor class. Return the results in
+    order.
+    """
+    if not isinstance(executor, type):
+        return executor.map(func, *iterables)
+    with executor(max_workers) as pool:
+        return list(pool.map(func, *iterables))
+
+
+def _get_chunk_size(count, max_workers):
+    workers = max_workers or os.cpu_count() or 1
+    return max(1, math.ceil(count / (workers * 4)))
+
+
+def _index_included(included):
+    """Return the included resource objects by type and id."""
+    index = collections.defaultdict(list)
+    for item in included:
+        index[(item.get("type"), str(item.get("id")))].append(item)
+    return index
+
+
+def _get_referenced(resources, index):
+    """Return the included resource objects that ``resources`` refer to through
+    their relationships, directly or through other included resource objects.
+    """
+    ret = []
+    seen = set()
+    queue = collections.deque(resources)
+    while queue:
+        item = queue.popleft()
+        relationships = item.get("relationships") if isinstance(item, dict) else None
+        if not isinstance(relationships, dict):
+            continue
+        for value in relationships.values():
+            linkage = value.get("data") if isinstance(value, dict) else None
+            if isinstance(linkage, dict):
+                linkage = [linkage]
+            elif not is_collection(linkage):
+                continue
+            for identifier in linkage:
+                if not isinstance(identifier, dict):
+                    continue
+                key = (identifier.get("type"), str(identifier.get("id")))
+                if key in seen:
+                    continue
+                seen.add(key)
+                for included in index.get(key, ()):
+                    ret.append(included)
+                    queue.append(included)
+    return ret
+
+
+def _get_definition(schema):
+    """Return a unique token, the schema class and the constructor arguments of
+    ``schema``. Unlike pickling the schema itself, this lets workers reuse the
+    schema they created for the token.
+    """
+    return (uuid.uuid4().hex, schema.__class__, schema._init_kwargs)
+
+
+def _get_worker_schema(definition):
+    """Return the schema of the current worker process for ``definition``."""
+    token, schema_class, kwargs = definition
+    try:
+        return _worker_schema[token]
+    except KeyError:
+        _worker_schema.clear()
+        schema = _worker_schema[token] = schema_class(**kwargs)
+        return schema
+
+
+def _iter_chunks(objs, chunk_size):
+    iterator = iter(objs)
+    chunk = list(itertools.islice(iterator, chunk_size))
+    while chunk:
+        yield chunk
+        chunk = list(itertools.islice(iterator, chunk_size))
+
+
+def _load_chunk(definition, document, partial, unknown):
+    """Deserialize ``document`` in a worker process. Return the loaded data and
+    the unformatted error messages, if any.
+    """
+    schema = _get_worker_schema(definition)
+    try:
+        return (
+            schema._load_document(
+                document, many=True, partial=partial, unknown=unknown
+            ),
+            None,
+        )
+    except ValidationError as error:
+        return error.valid_data or [], error.messages
+
+
+def _dump_chunk(definition, chunk, sparse_fields):
+    """Serialize ``chunk`` in a worker process. Return the resource objects, the
+    included resources and the document meta.
+    """
+    return _dump_with(_get_worker_schema(definition), chunk, sparse_fields)
+
+
+def _dump_with(schema, chunk, sparse_fields):
+    result = schema._dump_document(chunk, many=True, sparse_fields=sparse_fields)
+    return (
+        result["data"],
+        tuple(schema.included_data.items()),
+        dict(schema.document_meta),
+    )
@@ -0,0 +1,238 @@
+"""Parsing of JSON API query parameters (``include``, ``fields``, ``sort``,
+``page`` and ``filter``).
+
+Example: ::
+
+    from marshmallow_jsonapi.query import QueryParser
+
+    parser = QueryParser(PostSchema)
+
+    query = parser.parse("include=comments.author&fields[posts]=title,comments")
+    data = PostSchema(include_data=query.include).dump(
+        post, sparse_fields=query.fields
+    )
+
+See: http://jsonapi.org/format/#fetching
+"""
+import functools
+import re
+import types
+from urllib.parse import parse_qsl
+
+from .exceptions import InvalidQueryParameterError
+from .fields import BaseRelationship, DocumentMeta, ResourceMeta
+
+_FAMILY_MEMBER = re.compile(r"^(\w+)\[([^\[\]]*)\]$")
+
+
+class QueryParams:
+    """Parsed and validated JSON API query parameters. Instances are immutable
+    so that they can be shared between requests.
+
+    * ``include`` - relationship paths to include, using schema field names, in
+      the form expected by the ``include_data`` argument of `Schema
+      <marshmallow_jsonapi.Schema>`.
+    * ``fields`` - sparse fieldsets mapping resource types to member names, in
+      the form expected by the ``sparse_fields`` argument of `Schema.dump
+      <marshmallow_jsonapi.Schema.dump>`.
+    * ``sort`` - sort keys, using schema attribute names. Descending keys are
+      prefixed with ``-``.
+    * ``page`` - the ``page[...]`` parameters, unvalidated.
+    * ``filter`` - the ``filter[...]`` parameters, unvalidated.
+    """
+
+    __slots__ = ("include", "fields", "sort", "page", "filter")
+
+    def __init__(self, include=(), fields=None, sort=(), page=None, filter=None):
+        set_ = super().__setattr__
+        set_("include", tuple(include))
+        set_("fields", types.MappingProxyType(dict(fields or {})))
+        set_("sort", tuple(sort))
+        set_("page", types.MappingProxyType(dict(page or {})))
+        set_("filter", types.MappingProxyType(dict(filter or {})))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __eq__(self, other):
+        if not isinstance(other, QueryParams):
+            return NotImplemented
+        return all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__
+        )
+
+    def __repr__(self):
+        return "<QueryParams({})>".format(
+            ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        )
+
+
+class QueryParser:
+    """Parse and validate JSON API query strings against a schema.
+
+    Include paths, sparse fieldsets and sort keys are validated against the
+    fields and relationships of ``schema`` and of the schemas it relates to.
+    Results are memoized by raw query string with LRU eviction, so repeated
+    queries skip parsing and validation entirely.
+
+    :param schema: The `Schema <marshmallow_jsonapi.Schema>` class or instance
+        of the primary data.
+    :param int maxsize: Maximum number of parsed query strings to keep.
+    """
+
+    def __init__(self, schema, maxsize=256):
+        if isinstance(schema, type):
+            schema = schema()
+        self.schema = schema
+        self._schemas = {}
+        self._members = {}
+        self._index_schema(schema)
+        self._parse_cached = functools.lru_cache(maxsize=maxsize)(self._parse)
+
+    def parse(self, query_string):
+        """Parse a raw query string.
+
+        :param query_string: The query string as `str` or `bytes`, without the
+            leading ``?``.
+        :rtype: QueryParams
+        :raise InvalidQueryParameterError: If a parameter is malformed or refers
+            to unknown fields, relationships or types.
+        """
+        return self._parse_cached(query_string)
+
+    def cache_info(self):
+        """Return hit and miss statistics of the parse cache."""
+        return self._parse_cached.cache_info()
+
+    def cache_clear(self):
+        """Clear the parse cache."""
+        self._parse_cached.cache_clear()
+
+    def _index_schema(self, schema):
+        type_ = schema.opts.type_
+        if type_ in self._schemas:
+            return
+        self._schemas[type_] = schema
+        for field_obj in schema.fields.values():
+            related = self._get_related_schema(field_obj)
+            if related is not None:
+                self._index_schema(related)
+
+    @staticmethod
+    def _get_related_schema(field_obj):
+        if not isinstance(field_obj, BaseRelationship):
+            return None
+        try:
+            return field_obj.schema
+        except (AttributeError, ValueError):
+            return None
+
+    def _get_members(self, schema):
+        """Return a mapping of member names to field names for the attributes and
+        relationships of ``schema``.
+        """
+        try:
+            return self._members[id(schema)]
+        except KeyError:
+            pass
+        ret = self._members[id(schema)] = {
+            schema.inflect(field_obj.data_key or field_name): field_name
+            for field_name, field_obj in schema.fields.items()
+            if field_name != "id"
+            and not isinstance(field_obj, (DocumentMeta, ResourceMeta))
+        }
+        return ret
+
+    def _parse(self, query_string):
+        if isinstance(query_string, bytes):
+            query_string = query_string.decode("utf-8")
+        include, sort = [], []
+        fields, page, filter_ = {}, {}, {}
+        for key, value in parse_qsl(query_string, keep_blank_values=True):
+            if key == "include":
+                include.extend(self._parse_include(value))
+                continue
+            if key == "sort":
+                sort.extend(self._parse_sort(value))
+                continue
+            match = _FAMILY_MEMBER.match(key)
+            if not match:
+                continue
+            family, member = match.groups()
+            if family == "fields":
+                fields[member] = self._parse_fieldset(key, member, value)
+            elif family == "page":
+                page[member] = value
+            elif family == "filter":
+                filter_[member] = value
+        return QueryParams(
+            include=include, fields=fields, sort=sort, page=page, filter=filter_
+        )
+
+    def _parse_include(self, value):
+        for path in _split(value):
+            schema = self.schema
+            field_names = []
+            for member in path.split("."):
+                field_name = self._get_members(schema).get(member)
+                field_obj = schema.fields.get(field_name)
+                if not isinstance(field_obj, BaseRelationship):
+                    raise InvalidQueryParameterError(
+                        f'Unknown relationship "{member}" in include path "{path}".',
+                        "include",
+                    )
+                schema = self._get_related_schema(field_obj)
+                if schema is None:
+                    raise InvalidQueryParameterError(
+                        f'Relationship "{member}" in include path "{path}" '
+                        "cannot be included.",
+                        "include",
+                    )
+                field_names.append(field_name)
+            yield ".".join(field_names)
+
+    def _parse_fieldset(self, key, type_, value):
+        try:
+            schema = self._schemas[type_]
+        except KeyError:
+            raise InvalidQueryParameterError(
+                f'Unknown resource type "{type_}".', key
+            ) from None
+        members = self._get_members(schema)
+        fieldset = tuple(_split(value))
+        for member in fieldset:
+            if member not in members:
+                raise InvalidQueryParameterError(
+                    f'Unknown field "{member}" for resource type "{type_}".', key
+                )
+        return fieldset
+
+    def _parse_sort(self, value):
+        for key in _split(value):
+            descending = key.startswith("-")
+            path = key[1:] if descending else key
+            schema = self.schema
+            parts = path.split(".")
+            attributes = []
+            for position, member in enumerate(parts, 1):
+                field_name = self._get_members(schema).get(member)
+                field_obj = schema.fields.get(field_name)
+                is_last = position == len(parts)
+                if field_obj is None or (
+                    isinstance(field_obj, BaseRelationship) == is_last
+                ):
+                    raise InvalidQueryParameterError(
+                        f'Invalid sort field "{path}".', "sort"
+                    )
+                attributes.append(field_obj.attribute or field_name)
+                if not is_last:
+                    schema = self._get_related_schema(field_obj)
+                    if schema is None:
+                        raise InvalidQueryParameterError(
+                            f'Invalid sort field "{path}".', "sort"
+                        )
+            yield ("-" if descending else "") + ".".join(attributes)
+
+
+def _split(value):
+    return [part.strip() for part in value.split(",") if part.strip()]
@@ -1,12 +1,24 @@
+import collections
+import copy
+import functools
+import hashlib
 import itertools
+import time
 
 import marshmallow as ma
+from marshmallow.decorators import POST_DUMP
 from marshmallow.exceptions import ValidationError
 from marshmallow.utils import is_collection
 
-from .fields import BaseRelationship, DocumentMeta, ResourceMeta
+from .cache import CacheEntry
+from .codecs import JSONCodec
+from .fields import BaseRelationship, DocumentMeta, Relationship, ResourceMeta
 from .fields import _RESOURCE_META_LOAD_FROM, _DOCUMENT_META_LOAD_FROM
 from .exceptions import IncorrectTypeError
+from .instrumentation import _unpatch_copy, instrument, profile_fields
+from .lazy import LazyResource
+from .metrics import DocumentShape, MetricsSink, summarize
+from .tracing import trace_access
 from .utils import resolve_params
 
 TYPE = "type"
@@ -16,14 +28,66 @@ ID = "id"
 class SchemaOpts(ma.SchemaOpts):
     def __init__(self, meta, *args, **kwargs):
         super().__init__(meta, *args, **kwargs)
+        self._meta = meta
         self.type_ = getattr(meta, "type_", None)
         self.inflect = getattr(meta, "inflect", None)
+        self.inflection_cache = {}
         self.self_url = getattr(meta, "self_url", None)
         self.self_url_kwargs = getattr(meta, "self_url_kwargs", None)
         self.self_url_many = getattr(meta, "self_url_many", None)
+        self.codec = getattr(meta, "codec", None) or JSONCodec()
+        self.version_attribute = getattr(meta, "version_attribute", None)
+        self.fragment_cache = getattr(meta, "fragment_cache", None)
+        self.resource_cache = getattr(meta, "resource_cache", None)
+        self.metrics = getattr(meta, "metrics", None) or MetricsSink()
 
+    def __reduce__(self):
+        # Rebuild the options from ``class Meta``, with empty caches
+        return (self.__class__, (self._meta, self.ordered))
 
-class Schema(ma.Schema):
+
+class SchemaMeta(ma.schema.SchemaMeta):
+    """Metaclass that validates the class Meta options and fields of a `Schema`
+    class once, when the class is defined. Schema classes without a ``type_`` can
+    be used as base classes but raise a `ValueError` when instantiated.
+    """
+
+    def __init__(cls, name, bases, attrs):  # noqa: B902
+        super().__init__(name, bases, attrs)
+        cls._definition_error = _get_definition_error(cls)
+
+
+def _copy_field(field_obj, field_name, schema, context):
+    """Copy a bound field and bind the copy to ``schema``."""
+    ret = copy.copy(field_obj)
+    _unpatch_copy(ret)
+    ret.parent = ret.name = ret.root = None
+    if isinstance(ret, ma.fields.Nested):
+        ret._schema = None
+    if isinstance(ret, BaseRelationship):
+        ret.include_data = False
+    if isinstance(ret, Relationship):
+        ret._derive_schema(context)
+    ret._bind_to_schema(field_name, schema)
+    return ret
+
+
+def _get_definition_error(schema_class):
+    """Return why ``schema_class`` cannot be instantiated, or `None`."""
+    if not schema_class.opts.type_:
+        return "Must specify type_ class Meta option"
+    # ``fields`` and ``additional`` may infer the id field on instantiation
+    opts = schema_class.opts
+    if "id" not in schema_class._declared_fields and not (
+        opts.fields or opts.additional
+    ):
+        return "Must have an `id` field"
+    if schema_class.opts.self_url_kwargs and not schema_class.opts.self_url:
+        return "Must specify `self_url` Meta option when `self_url_kwargs` is specified"
+    return None
+
+
+class Schema(ma.Schema, metaclass=SchemaMeta):
     """Schema class that formats data according to JSON API 1.0.
     Must define the ``type_`` `class Meta` option.
 
@@ -63,38 +127,89 @@ class Schema(ma.Schema):
 
         * ``type_`` - required, the JSON API resource type as a string.
         * ``inflect`` - optional, an inflection function to modify attribute names.
+          Its results are cached, so it must always return the same value for a
+          given name.
         * ``self_url`` - optional, URL to use to `self` in links
         * ``self_url_kwargs`` - optional, replacement fields for `self_url`.
           String arguments enclosed in ``< >`` will be interpreted as attributes
           to pull from the schema data.
         * ``self_url_many`` - optional, URL to use to `self` in top-level ``links``
           when a collection of resources is returned.
+        * ``codec`` - optional, the JSON codec used by `dumps_bytes` and
+          `loads_bytes`. Defaults to `JSONCodec <marshmallow_jsonapi.codecs.JSONCodec>`.
+        * ``version_attribute`` - optional, name of the attribute holding the version
+          of a resource, used to key cached resource objects.
+        * ``fragment_cache`` - optional, a cache (such as
+          `LRUCache <marshmallow_jsonapi.cache.LRUCache>`) of encoded resource objects
+          used by `dumps_bytes`.
+        * ``resource_cache`` - optional, a cache (such as
+          `LRUCache <marshmallow_jsonapi.cache.LRUCache>`) of formatted resource
+          objects used by `dump`. Both caches key resources by schema class and
+          ``context`` as well, and are not used if the context holds unhashable
+          values.
+        * ``metrics`` - optional, a sink (such as
+          `InMemoryMetrics <marshmallow_jsonapi.metrics.InMemoryMetrics>`) that
+          records the shape of each dumped and loaded document. Defaults to
+          `MetricsSink <marshmallow_jsonapi.metrics.MetricsSink>`, which records
+          nothing.
         """
 
         pass
 
     def __init__(self, *args, **kwargs):
+        # Constructor arguments, used to pickle the schema
+        self._init_kwargs = kwargs.copy()
         self.include_data = kwargs.pop("include_data", ())
+        self._include_paths = set()
+        # ``included`` of the loaded document and its items by type and id
+        self._included_index = (None, {})
         super().__init__(*args, **kwargs)
         if self.include_data:
             self.check_relations(self.include_data)
 
-        if not self.opts.type_:
-            raise ValueError("Must specify type_ class Meta option")
-
-        if "id" not in self.fields:
+        if self._definition_error:
+            raise ValueError(self._definition_error)
+        restricted = (
+            self.only is not None
+            or self.exclude
+            or self.opts.fields
+            or self.opts.additional
+        )
+        if restricted and "id" not in self.fields:
             raise ValueError("Must have an `id` field")
-
-        if self.opts.self_url_kwargs and not self.opts.self_url:
-            raise ValueError(
-                "Must specify `self_url` Meta option when "
-                "`self_url_kwargs` is specified"
-            )
         self.included_data = {}
         self.document_meta = {}
+        self.sparse_fields = {}
+        self._sparse_dump_fields = {}
+        self._identifier_field = None
 
     OPTIONS_CLASS = SchemaOpts
 
+    def __reduce__(self):
+        """Pickle the schema as its class and constructor arguments, so that
+        unpickling creates a new instance without per-call state or resolved
+        nested schemas. The class must be importable and the arguments, including
+        ``context``, picklable.
+        """
+        return (functools.partial(self.__class__, **self._init_kwargs), ())
+
+    def __copy__(self):
+        ret = self.__class__.__new__(self.__class__)
+        ret.__dict__.update(self.__dict__)
+        _unpatch_copy(ret)
+        return ret
+
+    @classmethod
+    def invalidate_cache(cls, id=None):
+        """Remove the cached resource objects of the resource identified by ``id``
+        (or of all resources of this type if ``id`` is `None`) from the
+        ``resource_cache`` and ``fragment_cache`` of this schema, including the
+        cached resource objects that included it.
+        """
+        for cache in (cls.opts.resource_cache, cls.opts.fragment_cache):
+            if cache is not None:
+                cache.invalidate(cls.opts.type_, id)
+
     def check_relations(self, relations):
         """Recursive function which checks if a relation is valid."""
         for rel in relations:
@@ -115,9 +230,683 @@ class Schema(ma.Schema):
                 )
 
             field.include_data = True
+            self._include_paths.add(rel)
             if len(fields) > 1:
                 field.schema.check_relations(fields[1:])
 
+    def derive(self, *, many=None, include_data=None, context=None):
+        """Return a copy of this schema with different ``many``, ``include_data``
+        or ``context`` arguments. Deriving skips the field setup done by the
+        constructor, so it is cheaper than instantiating the schema class, e.g.
+        to create per-request schemas from a prototype: ::
+
+            post_schema = PostSchema()
+
+            def get_post(post_id):
+                schema = post_schema.derive(include_data=request_includes())
+                return schema.dump(Post.query.get(post_id))
+
+        Arguments that are `None` are copied from this schema. The nested schemas
+        of relationships are derived as well.
+        """
+        ret = copy.copy(self)
+        ret._init_kwargs = self._init_kwargs.copy()
+        if many is not None:
+            ret.many = ret._init_kwargs["many"] = many
+        if include_data is not None:
+            ret.include_data = ret._init_kwargs["include_data"] = include_data
+        if context is not None:
+            ret.context = ret._init_kwargs["context"] = context
+        fields = {
+            field_name: _copy_field(field_obj, field_name, ret, context)
+            for field_name, field_obj in self.fields.items()
+        }
+        ret.declared_fields = {**self.declared_fields, **fields}
+        ret.fields = fields
+        ret.load_fields = {name: fields[name] for name in self.load_fields}
+        ret.dump_fields = {name: fields[name] for name in self.dump_fields}
+        ret._include_paths = set()
+        if ret.include_data:
+            ret.check_relations(ret.include_data)
+        ret.included_data = {}
+        ret.document_meta = {}
+        ret.sparse_fields = {}
+        ret._sparse_dump_fields = {}
+        ret._identifier_field = None
+        return ret
+
+    def instrument(self, callback=None):
+        """Return a context manager that times the phases of the dumps and loads
+        of this schema, e.g. link generation or error formatting, while it is
+        active. See `marshmallow_jsonapi.instrumentation`.
+
+        :param callable callback: Called with the name and duration in seconds of
+            each phase. Defaults to a new `PhaseTimings
+            <marshmallow_jsonapi.instrumentation.PhaseTimings>`, which the context
+            manager yields.
+        """
+        return instrument(self, callback)
+
+    def profile_fields(self, profiler=None):
+        """Return a context manager that records the number of calls and the
+        cumulative time of the serialization, deserialization and relationship
+        steps of each field of this schema, and of the schemas of its included
+        relationships, while it is active.
+
+        :param profiler: Defaults to a new `FieldProfiler
+            <marshmallow_jsonapi.instrumentation.FieldProfiler>`, which the context
+            manager yields.
+        """
+        return profile_fields(self, profiler)
+
+    def trace_access(self, trace=None):
+        """Return a context manager that records the dotted path of each attribute
+        this schema, and the schemas of its included relationships, read from the
+        dumped objects while it is active. See `marshmallow_jsonapi.tracing`.
+
+        :param trace: Defaults to a new `AccessTrace
+            <marshmallow_jsonapi.tracing.AccessTrace>`, which the context manager
+            yields.
+        """
+        return trace_access(self, trace)
+
+    def dump(self, obj, *, many=None, sparse_fields=None):
+        """Serialize an object to a JSON API document.
+
+        :param obj: The object to serialize.
+        :param bool many: Whether to serialize `obj` as a collection. If `None`, the value
+            for `self.many` is used.
+        :param dict sparse_fields: Optional sparse fieldsets, mapping resource types to
+            the member names to serialize for resources of that type. Fields left out
+            are not serialized at all, except included relationships, whose related
+            resources are still included. Applies to primary data and included
+            resources.
+            See: http://jsonapi.org/format/#fetching-sparse-fieldsets
+
+        If the ``resource_cache`` class Meta option is set, resource objects are
+        looked up in the cache before being serialized, and the returned document
+        shares them with the cache, so it must not be modified. ``pass_many``
+        processors then receive one object at a time.
+        """
+        if not self.opts.metrics.enabled:
+            return self._dump_document(obj, many=many, sparse_fields=sparse_fields)
+        start = time.perf_counter()
+        ret = self._dump_document(obj, many=many, sparse_fields=sparse_fields)
+        self._record_metrics("dump", ret, start)
+        return ret
+
+    def _dump_document(self, obj, *, many=None, sparse_fields=None):
+        """Same as `dump`, without recording metrics."""
+        self.included_data = {}
+        self.document_meta = {}
+        self.sparse_fields = sparse_fields or {}
+        many = self.many if many is None else bool(many)
+        if self.opts.resource_cache is None or obj is None:
+            return super().dump(obj, many=many)
+        return self._dump_cached(obj, many)
+
+    def _dump_cached(self, obj, many):
+        cache = self.opts.resource_cache
+        shape = self._get_cache_shape()
+        if shape is None:
+            return super().dump(obj, many=many)
+        data = []
+        included = {}
+        document_meta = {}
+        for item in obj if many else [obj]:
+            key = self._get_cache_key(item, shape) if item is not None else None
+            entry = cache.get(key) if key is not None else None
+            if entry is None:
+                self.included_data = {}
+                self.document_meta = {}
+                result = super().dump(item, many=False)
+                entry = CacheEntry(
+                    result["data"],
+                    tuple(self.included_data.items()),
+                    dict(self.document_meta),
+                )
+                if key is not None:
+                    cache.set(key, entry)
+            data.append(entry.resource)
+            included.update(entry.included)
+            document_meta.update(entry.meta)
+
+        self.included_data = included
+        self.document_meta = document_meta
+        ret = self.wrap_response(data if many else data[0], many)
+        ret = self.render_included_data(ret)
+        ret = self.render_meta_document(ret)
+        return ret
+
+    def dump_identifiers(self, obj, *, many=None, links=None):
+        """Serialize objects to a JSON API relationship document holding their
+        resource identifier objects, e.g. for relationship endpoints whose related
+        objects are queried separately: ::
+
+            schema.dump_identifiers(comments, many=True, links={"self": url})
+
+        Ids are read and stringified like the resource linkage of relationships,
+        no field is serialized and processors are not invoked. `None` objects
+        are left out of collections.
+
+        :param obj: The object or objects to identify.
+        :param bool many: Whether to serialize `obj` as a collection. If `None`,
+            the value for `self.many` is used.
+        :param dict links: Optional links of the relationship, such as its
+            ``self`` and ``related`` URLs.
+        """
+        many = self.many if many is None else bool(many)
+        if self._identifier_field is None:
+            self._identifier_field = Relationship(type_=self.opts.type_, schema=self)
+        identify = self._identifier_field._get_resource_identifier
+        if many:
+            data = [identify(item) for item in obj if item is not None]
+        else:
+            data = None if obj is None else identify(obj)
+        return self._format_relationship_document(data, links)
+
+    def dump_relationship(self, obj, name):
+        """Serialize a relationship of an object to a JSON API relationship
+        document, as served by ``/posts/1/relationships/comments`` endpoints: ::
+
+            {
+                "links": {"related": "/posts/1/comments"},
+                "data": [{"type": "comments", "id": "5"}],
+            }
+
+        Only the related objects and their ids are read. The other fields of the
+        object and of the related objects are not serialized.
+
+        :param obj: The object holding the relationship.
+        :param str name: The name of the relationship field.
+        """
+        field_obj = self.fields.get(name)
+        if not isinstance(field_obj, Relationship):
+            raise ValueError(f'Unknown relationship "{name}"')
+        if not field_obj.type_:
+            raise ValueError(f'Relationship "{name}" requires the type_ argument.')
+        value = field_obj.get_value(obj, name, accessor=self.get_attribute)
+        if value is None or value is ma.missing:
+            data = [] if field_obj.many else None
+        else:
+            data = field_obj.get_resource_linkage(value)
+        links = self.dict_class()
+        self_url = field_obj.get_self_url(obj)
+        if self_url:
+            links["self"] = self_url
+        related_url = field_obj.get_related_url(obj)
+        if related_url:
+            links["related"] = related_url
+        return self._format_relationship_document(data, links)
+
+    def _format_relationship_document(self, data, links):
+        ret = self.dict_class()
+        ret["data"] = data
+        if links:
+            ret["links"] = links
+        return ret
+
+    def dump_columns(self, columns, *, relationships=None, sparse_fields=None):
+        """Serialize a collection of resources given as columns to a JSON API
+        document, without creating an object per resource: ::
+
+            schema.dump_columns(
+                {"id": ids, "title": titles},
+                relationships={"author": author_ids, "comments": comment_ids},
+            )
+
+        Field values are serialized one column at a time. Fields that compute
+        their value from the object, such as ``Method`` and ``Function`` fields,
+        are left out, and so are fields without a column, unless they have a
+        default. Pre-dump processors are not invoked. Included data is not
+        supported. Sequences such as NumPy arrays are iterated as is; their
+        ``tolist()`` is faster to serialize.
+
+        :param dict columns: Sequences of attribute values keyed by attribute
+            name. Link parameters such as ``"<author.id>"`` are read from the
+            column of the same name. The ``id`` column is required.
+        :param dict relationships: Sequences keyed by relationship name, holding
+            the id (or `None`) of the related resource of each resource, or the
+            ids of the related resources for to-many relationships. Relationships
+            without a column are serialized without resource linkage, unless
+            they have ``include_resource_linkage``, in which case they are left
+            out.
+        :param dict sparse_fields: Optional sparse fieldsets, as for `dump`.
+        """
+        if not self.opts.metrics.enabled:
+            return self._dump_columns(columns, relationships, sparse_fields)
+        start = time.perf_counter()
+        ret = self._dump_columns(columns, relationships, sparse_fields)
+        self._record_metrics("dump", ret, start)
+        return ret
+
+    def _dump_columns(self, columns, relationships, sparse_fields):
+        if self._include_paths:
+            raise ValueError("Included data cannot be dumped from columns.")
+        relationships = relationships or {}
+        self.included_data = {}
+        self.document_meta = {}
+        self.sparse_fields = sparse_fields or {}
+        fieldset = self.sparse_fields.get(self.opts.type_)
+        if fieldset is None:
+            dump_fields = self.dump_fields
+        else:
+            dump_fields, _ = self._get_sparse_dump_fields(fieldset)
+
+        id_attribute = self.fields[ID].attribute or ID
+        if id_attribute not in columns:
+            raise ValueError(f"Missing the {id_attribute!r} column.")
+        length = len(columns[id_attribute])
+        data = [self.dict_class() for _ in range(length)]
+        for field_name, field_obj in dump_fields.items():
+            key = field_obj.data_key or field_name
+            if isinstance(field_obj, Relationship):
+                ids = relationships.get(field_name)
+                if ids is None and field_obj.include_resource_linkage:
+                    continue
+                _check_column_length(field_name, ids, length)
+                values = field_obj._serialize_column(columns, ids, length)
+            elif not field_obj._CHECK_ATTRIBUTE:
+                continue
+            else:
+                column = columns.get(field_obj.attribute or field_name)
+                if column is None:
+                    default = field_obj.default
+                    if default is ma.missing:
+                        continue
+                    if callable(default):
+                        column = [default() for _ in range(length)]
+                    else:
+                        column = [default] * length
+                _check_column_length(field_name, column, length)
+                values = [
+                    field_obj._serialize(value, field_name, None) for value in column
+                ]
+            for item, value in zip(data, values):
+                item[key] = value
+
+        if self._has_processors(POST_DUMP):
+            return self._invoke_dump_processors(
+                POST_DUMP, data, many=True, original_data=columns
+            )
+        return data
+
+    def dumps_bytes(self, obj, *, many=None, sparse_fields=None, codec=None):
+        """Same as `dump`, except return the document encoded as JSON `bytes`.
+
+        If the ``fragment_cache`` class Meta option is set, the document is
+        written with `iter_dumps_bytes` and cached resource objects are spliced
+        into the output without being serialized again.
+
+        :param codec: The codec to encode the document with. Defaults to the
+            ``codec`` class Meta option.
+        """
+        codec = codec or self.opts.codec
+        if self.opts.fragment_cache is None:
+            start = time.perf_counter()
+            document = self._dump_document(obj, many=many, sparse_fields=sparse_fields)
+            ret = codec.encode(document)
+            if self.opts.metrics.enabled:
+                self._record_metrics("dump", document, start, size=len(ret))
+            return ret
+        return b"".join(
+            self.iter_dumps_bytes(
+                obj, many=many, sparse_fields=sparse_fields, codec=codec
+            )
+        )
+
+    def iter_dumps_bytes(self, obj, *, many=None, sparse_fields=None, codec=None):
+        """Same as `dumps_bytes`, except generate the document as chunks of
+        `bytes`, dumping and encoding one resource object at a time. ``obj`` may
+        be any iterable, including a generator, when ``many`` is `True`.
+
+        Only included resources are held in memory until the end of the
+        document. ``pass_many`` processors receive one object at a time and
+        `get_top_level_links` receives `None` as data for collections.
+        """
+        many = self.many if many is None else bool(many)
+        codec = codec or self.opts.codec
+        fragments = self._encode_resources(
+            obj if many else [obj], sparse_fields or {}, codec
+        )
+        yield from self._iter_recorded(
+            self._iter_document_bytes(fragments, many, codec)
+        )
+
+    def iter_dumps_rows(
+        self,
+        cursor,
+        *,
+        relationships=None,
+        batch_size=1000,
+        sparse_fields=None,
+        codec=None,
+    ):
+        """Serialize the rows of a DB-API cursor to a JSON API document encoded as
+        chunks of `bytes`, like `iter_dumps_bytes`, without creating an object per
+        row: ::
+
+            cursor.execute("SELECT id, title, author_id FROM posts")
+            chunks = schema.iter_dumps_rows(
+                cursor, relationships={"author": "author_id"}
+            )
+
+        Rows are fetched ``batch_size`` at a time with ``fetchmany`` and each batch
+        is serialized as columns with `dump_columns`, so the columns must be named
+        after the attributes of the schema fields and link parameters, and the
+        same limitations apply. ``pass_many`` processors receive one batch at a
+        time.
+
+        :param cursor: A DB-API cursor on which a query was executed.
+        :param dict relationships: Names of the columns holding the ids of the
+            related resources (e.g. foreign keys), keyed by relationship name.
+        :param int batch_size: Number of rows fetched at a time.
+        :param dict sparse_fields: Optional sparse fieldsets, as for `dump`.
+        :param codec: The codec to encode the document with. Defaults to the
+            ``codec`` class Meta option.
+        """
+        codec = codec or self.opts.codec
+        names = [column[0] for column in cursor.description]
+        relationships = relationships or {}
+        for column in relationships.values():
+            if column not in names:
+                raise ValueError(f"Missing the {column!r} column.")
+        fragments = self._encode_rows(
+            cursor, names, relationships, batch_size, sparse_fields or {}, codec
+        )
+        yield from self._iter_recorded(
+            self._iter_document_bytes(fragments, True, codec)
+        )
+
+    def _encode_rows(
+        self, cursor, names, relationships, batch_size, sparse_fields, codec
+    ):
+        """Yield a `CacheEntry <marshmallow_jsonapi.cache.CacheEntry>` holding the
+        encoded resource object and the document meta of each row of ``cursor``.
+        """
+        rows = cursor.fetchmany(batch_size)
+        while rows:
+            columns = dict(zip(names, zip(*rows)))
+            ids = {name: columns[column] for name, column in relationships.items()}
+            document = self._dump_columns(columns, ids, sparse_fields)
+            for resource in document["data"]:
+                yield CacheEntry(codec.encode(resource), (), self.document_meta)
+            rows = cursor.fetchmany(batch_size)
+
+    def _iter_recorded(self, chunks):
+        """Yield the chunks generated by `_iter_document_bytes` and record the
+        metrics of the document.
+        """
+        if not self.opts.metrics.enabled:
+            yield from chunks
+            return
+
+        start = time.perf_counter()
+        size = 0
+        while True:
+            try:
+                chunk = next(chunks)
+            except StopIteration as stop:
+                primary, included = stop.value
+                break
+            size += len(chunk)
+            yield chunk
+        # Only the encoded resource objects are available: record the counts
+        # and the size, without the depth and linkage
+        self.opts.metrics.record(
+            DocumentShape(
+                "dump",
+                self.opts.type_,
+                primary,
+                dict(collections.Counter(type_ for type_, _ in included)),
+                None,
+                {},
+                0,
+                size,
+                time.perf_counter() - start,
+            )
+        )
+
+    def _iter_document_bytes(self, fragments, many, codec):
+        """Generate the chunks of a document holding the resource objects of
+        ``fragments``, as `CacheEntry <marshmallow_jsonapi.cache.CacheEntry>`
+        instances. Return the number of primary resources and the keys of the
+        included resources.
+        """
+        included = {}
+        document_meta = {}
+        data = None
+        primary = 0
+
+        yield b'{"data":[' if many else b'{"data":'
+        for index, fragment in enumerate(fragments):
+            if index:
+                yield b","
+            yield fragment.resource
+            primary += 1
+            included.update(fragment.included)
+            if fragment.meta:
+                document_meta.update(fragment.meta)
+            if not many:
+                data = codec.decode(fragment.resource)
+                primary = int(data is not None)
+        if many:
+            yield b"]"
+
+        links = self.wrap_response(data, many).get("links")
+        if links:
+            yield b',"links":' + codec.encode(links)
+        if included:
+            yield b',"included":[' + b",".join(included.values()) + b"]"
+        if document_meta:
+            yield b',"meta":' + codec.encode(document_meta)
+        yield b"}"
+        return primary, included.keys()  # noqa: B901
+
+    def _encode_resources(self, objs, sparse_fields, codec):
+        """Yield a `CacheEntry <marshmallow_jsonapi.cache.CacheEntry>` holding the
+        encoded resource object, included resources and document meta of each
+        object in ``objs``, reading from and writing to the fragment cache.
+        """
+        cache = self.opts.fragment_cache
+        if cache is not None:
+            self.sparse_fields = sparse_fields
+            shape = self._get_cache_shape()
+            if shape is None:
+                cache = None
+        for obj in objs:
+            key = None
+            if cache is not None and obj is not None:
+                key = self._get_cache_key(obj, shape)
+                entry = cache.get(key)
+                if entry is not None:
+                    yield entry
+                    continue
+            result = self._dump_document(obj, many=False, sparse_fields=sparse_fields)
+            entry = CacheEntry(
+                codec.encode(result["data"]),
+                tuple(
+                    (key_, codec.encode(item))
+                    for key_, item in self.included_data.items()
+                ),
+                dict(self.document_meta),
+            )
+            if key is not None:
+                cache.set(key, entry)
+            yield entry
+
+    def _get_cache_shape(self):
+        """Return a hashable description of what a dump of a resource contains,
+        given the schema class, context, fields, included relationships and sparse
+        fieldsets. Return `None` if the context is not hashable, in which case
+        resources are not cached.
+        """
+        try:
+            context = frozenset(self.context.items()) if self.context else None
+        except TypeError:
+            return None
+        return (
+            self.__class__,
+            context,
+            frozenset(self.dump_fields),
+            frozenset(self._include_paths),
+            frozenset(
+                (type_, _normalize_fieldset(fieldset))
+                for type_, fieldset in self.sparse_fields.items()
+            ),
+        )
+
+    def compute_etag(self, obj, *, many=None, sparse_fields=None):
+        """Return a validator for the document that `dump` would produce, computed
+        from the ids and versions of the primary and included resources without
+        serializing them. The ETag also covers the shape of the document (``many``,
+        fields, sparse fieldsets and included relationships), the resource linkage
+        of relationships that are not included and the document meta. Any other
+        member, such as attributes, links and resource meta, is assumed to change
+        only with the version of its resource.
+
+        Return `None` if this schema, or the schema of an included relationship,
+        does not set the ``version_attribute`` class Meta option. The values of
+        included to-many relationships are iterated, so they must not be one-shot
+        iterables such as generators.
+
+        See: https://tools.ietf.org/html/rfc7232#section-2.3
+        """
+        many = self.many if many is None else bool(many)
+        self.sparse_fields = sparse_fields or {}
+        hasher = hashlib.sha1()
+        hasher.update(
+            repr(
+                (
+                    sorted(
+                        (type_, sorted(_normalize_fieldset(fieldset)))
+                        for type_, fieldset in self.sparse_fields.items()
+                    ),
+                    many,
+                )
+            ).encode("utf-8")
+        )
+        objs = obj if many else [obj]
+        if obj is not None and not self._update_etag(hasher, objs, self.sparse_fields):
+            return None
+        return hasher.hexdigest()
+
+    def _update_etag(self, hasher, objs, sparse_fields):
+        """Feed the identity and version of ``objs``, the resource linkage of their
+        relationships, their document meta and the same for the resources they
+        include to ``hasher``. Return `False` if a version is unavailable.
+        """
+        if not self.opts.version_attribute:
+            return False
+        hasher.update(
+            repr(
+                (
+                    self.opts.type_,
+                    sorted(self.dump_fields),
+                    sorted(self._include_paths),
+                )
+            ).encode("utf-8")
+        )
+        fieldset = sparse_fields.get(self.opts.type_)
+        if fieldset is None:
+            dump_fields = self.dump_fields
+        else:
+            dump_fields, _ = self._get_sparse_dump_fields(fieldset)
+        included = []
+        # Members that do not depend on the version of the resource
+        unversioned = []
+        for field_name, field_obj in dump_fields.items():
+            if isinstance(field_obj, BaseRelationship) and field_obj.include_data:
+                included.append((field_name, field_obj))
+            elif isinstance(field_obj, DocumentMeta) or (
+                isinstance(field_obj, BaseRelationship)
+                and field_obj.include_resource_linkage
+            ):
+                unversioned.append((field_name, field_obj))
+        for obj in objs:
+            if obj is None:
+                continue
+            resource_id, version = self._get_cache_key(obj, None)[1:3]
+            hasher.update(repr((resource_id, version)).encode("utf-8"))
+            for field_name, field_obj in unversioned:
+                value = field_obj.serialize(
+                    field_name, obj, accessor=self.get_attribute
+                )
+                hasher.update(repr(value).encode("utf-8"))
+            for field_name, field_obj in included:
+                value = field_obj.get_value(
+                    obj, field_name, accessor=self.get_attribute
+                )
+                if value is None or value is ma.missing:
+                    continue
+                related = value if field_obj.many else [value]
+                if not field_obj.schema._update_etag(hasher, related, sparse_fields):
+                    return False
+        return True
+
+    def _get_cache_key(self, obj, shape):
+        resource_id = self.fields[ID].serialize(ID, obj, accessor=self.get_attribute)
+        version = None
+        if self.opts.version_attribute:
+            version = self.get_attribute(obj, self.opts.version_attribute, None)
+        return (self.opts.type_, resource_id, version, shape)
+
+    def _serialize(self, obj, *, many=False):
+        fieldset = self.sparse_fields.get(self.opts.type_)
+        if fieldset is None:
+            return super()._serialize(obj, many=many)
+        dump_fields = self.dump_fields
+        self.dump_fields, hidden = self._get_sparse_dump_fields(fieldset)
+        try:
+            ret = super()._serialize(obj, many=many)
+        finally:
+            self.dump_fields = dump_fields
+        # Included relationships left out of the fieldset are serialized for
+        # their included resources only
+        for item in ret if many else (ret,):
+            for key in hidden:
+                item.pop(key, None)
+        return ret
+
+    def _get_sparse_dump_fields(self, fieldset):
+        """Return the subset of `dump_fields` selected by a sparse fieldset and the
+        keys of the included relationships it leaves out, which are serialized
+        but removed from the resource objects.
+
+        ``id`` and meta fields are always kept.
+        """
+        fieldset = _normalize_fieldset(fieldset)
+        try:
+            return self._sparse_dump_fields[fieldset]
+        except KeyError:
+            pass
+        names = {
+            self.inflect(field_obj.data_key or field_name): field_name
+            for field_name, field_obj in self.dump_fields.items()
+        }
+        # Unknown names are ignored and fieldsets are cached without them, which
+        # bounds the cache by the subsets of the fields
+        fieldset = fieldset.intersection(names)
+        try:
+            return self._sparse_dump_fields[fieldset]
+        except KeyError:
+            pass
+        selected = {names[name] for name in fieldset}
+        dump_fields = self.dict_class()
+        hidden = []
+        for field_name, field_obj in self.dump_fields.items():
+            if (
+                field_name == ID
+                or isinstance(field_obj, (DocumentMeta, ResourceMeta))
+                or field_name in selected
+            ):
+                dump_fields[field_name] = field_obj
+            elif isinstance(field_obj, BaseRelationship) and field_obj.include_data:
+                dump_fields[field_name] = field_obj
+                hidden.append(field_obj.data_key or field_name)
+        ret = self._sparse_dump_fields[fieldset] = (dump_fields, tuple(hidden))
+        return ret
+
     @ma.post_dump(pass_many=True)
     def format_json_api_response(self, data, many, **kwargs):
         """Post-dump hook that formats serialized data as a top-level JSON API object.
@@ -220,6 +1009,49 @@ class Schema(ma.Schema):
             field_obj.data_key = self.inflect(field_name)
         return None
 
+    def load(self, data, *, many=None, partial=None, unknown=None):
+        """Deserialize a JSON API document. Same as `marshmallow.Schema.load`.
+
+        If the ``metrics`` class Meta option is set, the shape of the document
+        and the number of errors are recorded. Loads that raise other exceptions
+        than `ValidationError` are recorded with one error.
+        """
+        return self._load_recorded(
+            data, None, many=many, partial=partial, unknown=unknown
+        )
+
+    def _load_recorded(self, data, size, **kwargs):
+        if not self.opts.metrics.enabled:
+            return super().load(data, **kwargs)
+        start = time.perf_counter()
+        errors = 0
+        try:
+            return super().load(data, **kwargs)
+        except (ValidationError, IncorrectTypeError) as err:
+            errors = len(err.messages.get("errors", ())) or 1
+            raise
+        except Exception:
+            errors = 1
+            raise
+        finally:
+            self._record_metrics("load", data, start, errors=errors, size=size)
+
+    def _record_metrics(self, operation, document, start, *, errors=0, size=None):
+        metrics = self.opts.metrics
+        duration = time.perf_counter() - start
+        if size is None and operation == "dump" and metrics.measure_size:
+            size = len(self.opts.codec.encode(document))
+        metrics.record(
+            summarize(
+                document,
+                operation,
+                self.opts.type_,
+                errors=errors,
+                size=size,
+                duration=duration,
+            )
+        )
+
     def _do_load(self, data, many=None, **kwargs):
         """Override `marshmallow.Schema._do_load` for custom JSON API handling.
 
@@ -227,15 +1059,8 @@ class Schema(ma.Schema):
         and to support loading of included data.
         """
         many = self.many if many is None else bool(many)
-
-        # Store this on the instance so we have access to the included data
-        # when processing relationships (``included`` is outside of the
-        # ``data``).
-        self.included_data = data.get("included", {})
-        self.document_meta = data.get("meta", {})
-
         try:
-            result = super()._do_load(data, many=many, **kwargs)
+            result = self._load_document(data, many=many, **kwargs)
         except ValidationError as err:  # strict mode
             error_messages = err.messages
             if "_schema" in error_messages:
@@ -245,23 +1070,140 @@ class Schema(ma.Schema):
             raise err
         return result
 
+    def _load_document(self, data, *, many, **kwargs):
+        """Deserialize a JSON API document. Raise `ValidationError` with the
+        unformatted error messages.
+        """
+        # Store this on the instance so we have access to the included data
+        # when processing relationships (``included`` is outside of the
+        # ``data``).
+        self.included_data = data.get("included", {})
+        self.document_meta = data.get("meta", {})
+        return super()._do_load(data, many=many, **kwargs)
+
+    def load_relationship(self, name, data):
+        """Deserialize the document of a relationship endpoint, such as a
+        ``PATCH /posts/1/relationships/comments`` request, to the ids of the
+        related resources (or the id, or `None`, for to-one relationships).
+
+        The resource identifiers are validated in one pass and their ids are
+        deserialized with the ``id`` field of the relationship schema. Duplicate
+        resource identifiers are errors.
+
+        :param str name: The name of the relationship field.
+        :param dict data: The relationship document.
+        :raise ValidationError: With JSON API error objects pointing to the
+            invalid resource identifiers, if the document is invalid.
+        """
+        field_obj = self.fields.get(name)
+        if not isinstance(field_obj, Relationship):
+            raise ValueError(f'Unknown relationship "{name}"')
+        if not field_obj.type_:
+            raise ValueError(f'Relationship "{name}" requires the type_ argument.')
+        if not isinstance(data, dict) or "data" not in data:
+            errors = [("/", "Object must include `data` key.")]
+            ids = None
+        else:
+            ids, errors = field_obj._load_linkage(data["data"])
+        if errors:
+            raise ValidationError(
+                self.format_errors(
+                    [
+                        {"detail": message, "source": {"pointer": pointer}}
+                        for pointer, message in errors
+                    ],
+                    many=field_obj.many,
+                ),
+                data=data,
+                valid_data=ids,
+            )
+        return ids
+
+    def loads_bytes(self, data, *, many=None, partial=None, unknown=None, codec=None):
+        """Same as `load`, except decode the document from JSON `bytes` (or `str`)
+        first.
+
+        :param codec: The codec to decode the document with. Defaults to the
+            ``codec`` class Meta option.
+        """
+        codec = codec or self.opts.codec
+        return self._load_recorded(
+            codec.decode(data), len(data), many=many, partial=partial, unknown=unknown
+        )
+
+    def load_lazy(self, data, *, many=None, partial=None, unknown=None):
+        """Deserialize a JSON API document into `LazyResource
+        <marshmallow_jsonapi.lazy.LazyResource>` objects.
+
+        The document structure, the ``type`` of each resource object and its
+        ``id`` are validated immediately. Every other field is deserialized and
+        validated the first time it is accessed. Unknown attributes and
+        relationships are handled by `LazyResource.validate_all
+        <marshmallow_jsonapi.lazy.LazyResource.validate_all>`.
+
+        :param dict data: The JSON API document to deserialize.
+        :param bool many: Whether to deserialize ``data`` as a collection. If
+            `None`, the value for `self.many` is used.
+        :param partial: Whether to ignore missing required fields, or the names
+            of the fields to ignore, as for `load`. If `None`, the value for
+            `self.partial` is used.
+        :param unknown: Whether to exclude, include, or raise an error for
+            unknown fields, as for `load`. If `None`, the value for
+            `self.unknown` is used.
+        :return: A `LazyResource <marshmallow_jsonapi.lazy.LazyResource>` or a
+            list of them if ``many`` is `True`.
+        """
+        many = self.many if many is None else bool(many)
+
+        self.included_data = data.get("included", {})
+        self.document_meta = data.get("meta", {})
+
+        try:
+            payload = self.unwrap_request(data, many)
+        except ValidationError as err:
+            err.messages = self.format_errors(err.messages, many=many)
+            raise err
+
+        partial = self.partial if partial is None else partial
+        unknown = self.unknown if unknown is None else unknown
+        if many:
+            resources = [
+                LazyResource(self, item, index=index, partial=partial, unknown=unknown)
+                for index, item in enumerate(payload)
+            ]
+        else:
+            resources = [LazyResource(self, payload, partial=partial, unknown=unknown)]
+        if ID in self.load_fields:
+            for resource in resources:
+                resource.get(ID)
+        return resources if many else resources[0]
+
     def _extract_from_included(self, data):
         """Extract included data matching the items in ``data``.
 
         For each item in ``data``, extract the full data from the included
         data.
         """
-        return (
-            item
-            for item in self.included_data
-            if item["type"] == data["type"] and str(item["id"]) == str(data["id"])
-        )
+        included, index = self._included_index
+        if included is not self.included_data:
+            index = {}
+            for item in self.included_data:
+                key = (item.get("type"), str(item.get("id")))
+                index.setdefault(key, []).append(item)
+            self._included_index = (self.included_data, index)
+        return iter(index.get((data["type"], str(data["id"])), ()))
 
     def inflect(self, text):
         """Inflect ``text`` if the ``inflect`` class Meta option is defined, otherwise
-        do nothing.
+        do nothing. Results are cached per schema class.
         """
-        return self.opts.inflect(text) if self.opts.inflect else text
+        if not self.opts.inflect:
+            return text
+        try:
+            return self.opts.inflection_cache[text]
+        except KeyError:
+            ret = self.opts.inflection_cache[text] = self.opts.inflect(text)
+            return ret
 
     ### Overridable hooks ###
 
@@ -420,3 +1362,14 @@ class Schema(ma.Schema):
     def generate_url(self, link, **kwargs):
         """Generate URL with any kwargs interpolated."""
         return link.format_map(kwargs) if link else None
+
+
+def _check_column_length(field_name, column, length):
+    if column is not None and len(column) != length:
+        raise ValueError(f"The column of {field_name!r} has a different length.")
+
+
+def _normalize_fieldset(fieldset):
+    if isinstance(fieldset, str):
+        fieldset = fieldset.split(",")
+    return frozenset(fieldset)
@@ -0,0 +1,176 @@
+"""Tracing of the attributes read while dumping JSON API documents.
+
+Relationship links, resource linkage and included resources read related
+objects, which ORMs usually load lazily, one query per object. `eager_load_plan`
+returns the relationship paths a dump reads, to load them ahead of time: ::
+
+    from sqlalchemy.orm import selectinload
+
+    from marshmallow_jsonapi.tracing import eager_load_plan
+
+    schema = PostSchema(include_data=("comments.author",))
+    options = [selectinload(path) for path in eager_load_plan(schema)]
+
+Paths are dotted attribute names relative to the primary objects, with a
+segment per relationship, e.g. ``"comments.author"``. Use `Schema.trace_access
+<marshmallow_jsonapi.Schema.trace_access>` to check them against the attributes
+actually read during a dump: ::
+
+    with schema.trace_access() as trace:
+        schema.dump(posts, many=True)
+    print(trace.paths.most_common())
+"""
+import collections
+import contextlib
+import functools
+
+from .fields import Relationship
+from .instrumentation import _Patcher
+from .utils import tpl
+
+
+class AccessTrace:
+    """Callback that counts the reads of each dotted attribute path.
+
+    :ivar collections.Counter paths: Number of reads per path.
+    """
+
+    def __init__(self):
+        self.paths = collections.Counter()
+
+    def __call__(self, path):
+        self.paths[path] += 1
+
+
+@contextlib.contextmanager
+def trace_access(schema, trace=None):
+    """Context manager that calls ``trace(path)`` each time ``schema`` or the
+    schema of one of its included relationships reads an attribute of the dumped
+    objects: field values (``get_value``), link parameters (``resolve_params``)
+    and the ids of related objects (``_get_id``). Yields the trace, a new
+    `AccessTrace` by default.
+
+    Like `Schema.instrument <marshmallow_jsonapi.Schema.instrument>`, only the
+    dumps run in the context that entered the block are traced.
+    """
+    trace = trace or AccessTrace()
+    patcher = _Patcher()
+    try:
+        for current, prefix in _iter_schemas(schema):
+            for field_name, field_obj in current.fields.items():
+                for name, paths in _get_read_paths(field_obj, field_name):
+                    paths = [_join(prefix, path) for path in paths]
+                    if paths:
+                        patcher.patch(
+                            field_obj, name, functools.partial(_traced, trace, paths)
+                        )
+        patcher.activate()
+        yield trace
+    finally:
+        patcher.restore()
+
+
+def eager_load_plan(schema, include=None):
+    """Return the sorted relationship paths that dumping with ``schema`` reads
+    related objects through, without dumping anything.
+
+    Relationship paths are read by included relationships, relationships with
+    ``include_resource_linkage``, link parameters such as ``"<author.id>"`` and
+    fields with a dotted ``attribute``. Parents of a path are also returned,
+    before it.
+
+    :param schema: A schema class or instance.
+    :param include: Relationship names to include, as for ``include_data``.
+        Defaults to the ``include_data`` of ``schema`` if it is an instance.
+    """
+    if isinstance(schema, type):
+        schema_class, fields = schema, schema._declared_fields
+    else:
+        schema_class, fields = schema.__class__, schema.fields
+        if include is None:
+            include = schema.include_data
+    tree = {}
+    for path in include or ():
+        node = tree
+        for name in path.split("."):
+            node = node.setdefault(name, {})
+    paths = set()
+    _plan(schema_class, fields, tree, "", paths)
+    return sorted(paths)
+
+
+def _plan(schema_class, fields, tree, prefix, paths):
+    for field_name, field_obj in fields.items():
+        if field_obj.load_only:
+            continue
+        # Linkage reads the related objects, which are added below
+        for _, read_paths in _get_read_paths(field_obj, field_name, ids=False):
+            for path in read_paths:
+                # Every segment but the attribute itself is a related object
+                parents = path.split(".")[:-1]
+                for index in range(1, len(parents) + 1):
+                    paths.add(_join(prefix, ".".join(parents[:index])))
+        if not isinstance(field_obj, Relationship):
+            continue
+        attribute = field_obj.attribute or field_name
+        if field_name in tree:
+            nested_class = field_obj._resolve_schema_class() or schema_class
+            _plan(
+                nested_class,
+                nested_class._declared_fields,
+                tree[field_name],
+                _join(prefix, attribute),
+                paths,
+            )
+        if field_name in tree or field_obj.include_resource_linkage:
+            parts = attribute.split(".")
+            for index in range(1, len(parts) + 1):
+                paths.add(_join(prefix, ".".join(parts[:index])))
+
+
+def _get_read_paths(field_obj, field_name, *, ids=True):
+    """Yield the names of the methods of ``field_obj`` that read attributes of
+    the dumped objects, with the paths they read. Unless ``ids`` is `False`, this
+    resolves the ``id_field`` of relationships.
+    """
+    attribute = field_obj.attribute or field_name
+    if field_obj._CHECK_ATTRIBUTE:
+        yield "get_value", [attribute]
+    if isinstance(field_obj, Relationship):
+        for link, params in field_obj._get_link_params().items():
+            yield f"get_{link}_url", _get_param_paths(params)
+        if ids and (field_obj.include_resource_linkage or field_obj.include_data):
+            yield "_get_id", [_join(attribute, field_obj.id_field)]
+
+
+def _get_param_paths(params):
+    paths = (tpl(str(value)) for value in params.values())
+    return [path for path in paths if path]
+
+
+def _iter_schemas(schema):
+    """Yield ``schema`` and the nested schemas of its included relationships, with
+    the attribute path to the objects they dump.
+    """
+    seen = set()
+    queue = [(schema, "")]
+    while queue:
+        current, prefix = queue.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        yield current, prefix
+        for field_name, field_obj in current.fields.items():
+            if isinstance(field_obj, Relationship) and field_obj.include_data:
+                attribute = field_obj.attribute or field_name
+                queue.append((field_obj.schema, _join(prefix, attribute)))
+
+
+def _join(prefix, path):
+    return f"{prefix}.{path}" if prefix else path
+
+
+def _traced(trace, paths, method, *args, **kwargs):
+    for path in paths:
+        trace(path)
+    return method(*args, **kwargs)
@@ -0,0 +1,98 @@
+"""Startup warm-up of schemas.
+
+The first instantiation, dump or load of a schema class resolves the
+``class_registry`` names of its relationships and computes inflected field
+names, both cached on the class. `warm_up` does that work ahead of time and
+validates the schema classes, e.g. in the master process of a pre-forking
+server, so that workers share the results copy-on-write: ::
+
+    from marshmallow_jsonapi import warm_up
+
+    import myapp.schemas  # noqa: F401 (define the schemas)
+
+    report = warm_up()
+    for schema_class, error in report.errors:
+        log.error("Invalid schema %s: %s", schema_class.__name__, error)
+
+Nested schemas are instantiated per schema instance and are not warmed up. To
+reuse them across requests, keep a schema instance and `derive
+<marshmallow_jsonapi.Schema.derive>` per-request schemas from it.
+
+For the Flask integration, use `marshmallow_jsonapi.flask.warm_up`, which also
+prepares the URL map of the application.
+"""
+import collections
+import time
+
+from .fields import Relationship
+from .schema import Schema
+
+#: Result of `warm_up`: the schema classes that were warmed up, the number of
+#: relationships resolved, ``(schema_class, exception)`` pairs for the schema
+#: classes that failed and the duration in seconds.
+WarmUpReport = collections.namedtuple(
+    "WarmUpReport", ("schemas", "relationships", "errors", "duration")
+)
+
+
+def warm_up(schemas=None):
+    """Resolve the ``class_registry`` names of relationships and fill the
+    inflection caches of schema classes and of the schema classes reachable
+    through their relationships, and validate them by instantiating them.
+
+    Schema classes without a ``type_`` are considered abstract and skipped.
+    Errors raised by invalid schema classes are collected in the report
+    rather than raised.
+
+    :param schemas: Schema classes to warm up. Defaults to all the subclasses of
+        `marshmallow_jsonapi.Schema` defined so far.
+    :return: A `WarmUpReport`.
+    """
+    start = time.perf_counter()
+    if schemas is None:
+        schemas = _iter_subclasses(Schema)
+    queue = collections.deque(schemas)
+    seen = set()
+    warmed, errors, relationships = [], [], 0
+    while queue:
+        schema_class = queue.popleft()
+        if schema_class in seen:
+            continue
+        seen.add(schema_class)
+        if not issubclass(schema_class, Schema) or not schema_class.opts.type_:
+            continue
+        try:
+            nested = _warm_up_schema(schema_class)
+        except Exception as error:
+            errors.append((schema_class, error))
+            continue
+        warmed.append(schema_class)
+        relationships += len(nested)
+        queue.extend(nested)
+    return WarmUpReport(
+        tuple(warmed), relationships, tuple(errors), time.perf_counter() - start
+    )
+
+
+def _iter_subclasses(cls):
+    for subclass in cls.__subclasses__():
+        yield subclass
+        yield from _iter_subclasses(subclass)
+
+
+def _warm_up_schema(schema_class):
+    """Warm up ``schema_class`` and return the schema classes of its relationships.
+    The instance created to validate ``schema_class`` is discarded.
+    """
+    nested = []
+    for field_obj in schema_class._declared_fields.values():
+        if isinstance(field_obj, Relationship):
+            nested_class = field_obj._resolve_schema_class()
+            nested.append(nested_class or schema_class)
+
+    schema = schema_class()
+    for field_name, field_obj in schema.fields.items():
+        schema.inflect(field_name)
+        if field_obj.data_key:
+            schema.inflect(field_obj.data_key)
+    return nested
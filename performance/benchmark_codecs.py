@@ -0,0 +1,139 @@
+"""Benchmark encoding and decoding of JSON API documents with the available codecs.
+
+Compares ``json.dumps(schema.dump(...))`` with `Schema.dumps_bytes` and
+``schema.load(json.loads(...))`` with `Schema.loads_bytes` on a collection of
+posts with included authors and comments.
+
+Usage: ::
+
+    python performance/benchmark_codecs.py --posts 100 --iterations 20
+"""
+import argparse
+import datetime as dt
+import json
+import timeit
+
+from marshmallow_jsonapi import Schema, fields
+from marshmallow_jsonapi.codecs import JSONCodec, orjson, OrjsonCodec
+
+
+class Bunch:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+class AuthorSchema(Schema):
+    id = fields.Str()
+    first_name = fields.Str()
+    last_name = fields.Str()
+    twitter = fields.Str()
+
+    class Meta:
+        type_ = "people"
+
+
+class CommentSchema(Schema):
+    id = fields.Str()
+    body = fields.Str()
+    author = fields.Relationship(schema=AuthorSchema, type_="people")
+
+    class Meta:
+        type_ = "comments"
+
+
+class PostSchema(Schema):
+    id = fields.Str()
+    title = fields.Str()
+    body = fields.Str()
+    created = fields.DateTime()
+    author = fields.Relationship(
+        "/authors/{author_id}",
+        related_url_kwargs={"author_id": "<author.id>"},
+        schema=AuthorSchema,
+        type_="people",
+    )
+    comments = fields.Relationship(
+        "/posts/{post_id}/comments",
+        related_url_kwargs={"post_id": "<id>"},
+        schema=CommentSchema,
+        many=True,
+        type_="comments",
+    )
+
+    class Meta:
+        type_ = "posts"
+        self_url = "/posts/{post_id}"
+        self_url_kwargs = {"post_id": "<id>"}
+        self_url_many = "/posts/"
+
+
+def make_posts(count):
+    authors = [
+        Bunch(id=i, first_name="Dan", last_name="Gebhardt", twitter="dgeb")
+        for i in range(10)
+    ]
+    return [
+        Bunch(
+            id=i,
+            title=f"Post number {i}",
+            body="JSON API paints my bikeshed! " * 10,
+            created=dt.datetime(2020, 1, 1),
+            author=authors[i % 10],
+            comments=[
+                Bunch(id=i * 10 + j, body="First!", author=authors[j]) for j in range(5)
+            ],
+        )
+        for i in range(count)
+    ]
+
+
+def run(posts_count, iterations):
+    schema = PostSchema(
+        many=True, include_data=("author", "comments", "comments.author")
+    )
+    load_schema = PostSchema(many=True)
+    posts = make_posts(posts_count)
+    document = schema.dump(posts)
+    load_document = {"data": document["data"]}
+    raw = json.dumps(load_document).encode()
+
+    codecs = [("json", JSONCodec())]
+    if orjson is not None:
+        codecs.append(("orjson", OrjsonCodec()))
+
+    def report(name, func):
+        total = timeit.timeit(func, number=iterations)
+        print(f"{name:<40} {total / iterations * 1000:10.3f} ms")
+
+    print(f"Document size: {len(raw)} bytes, {posts_count} posts\n")
+    report("json.dumps(schema.dump())", lambda: json.dumps(schema.dump(posts)))
+    for name, codec in codecs:
+        report(
+            f"dumps_bytes(codec={name})",
+            lambda codec=codec: schema.dumps_bytes(posts, codec=codec),
+        )
+    print()
+    report("schema.load(json.loads())", lambda: load_schema.load(json.loads(raw)))
+    for name, codec in codecs:
+        report(
+            f"loads_bytes(codec={name})",
+            lambda codec=codec: load_schema.loads_bytes(raw, codec=codec),
+        )
+    print()
+    for name, codec in codecs:
+        report(f"encode only (codec={name})", lambda c=codec: c.encode(document))
+        report(f"decode only (codec={name})", lambda c=codec: c.decode(raw))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--posts", type=int, default=100, help="Posts per document.")
+    parser.add_argument(
+        "--iterations", type=int, default=20, help="Iterations per benchmark."
+    )
+    args = parser.parse_args()
+    run(args.posts, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Benchmark dumping a collection given as columns.
+
+Compares building row objects from columns and dumping them with `Schema.dump`
+to `Schema.dump_columns` on the same columns.
+
+Usage: ::
+
+    python performance/benchmark_columns.py --rows 10000 --iterations 5
+"""
+import argparse
+import timeit
+
+from marshmallow_jsonapi import Schema, fields
+
+
+class Bunch:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+class PostSchema(Schema):
+    id = fields.Int()
+    title = fields.Str()
+    views = fields.Int()
+    score = fields.Float()
+    author = fields.Relationship(
+        "/authors/{author_id}",
+        related_url_kwargs={"author_id": "<author_id>"},
+        type_="people",
+        include_resource_linkage=True,
+    )
+
+    class Meta:
+        type_ = "posts"
+        self_url = "/posts/{post_id}"
+        self_url_kwargs = {"post_id": "<id>"}
+        self_url_many = "/posts/"
+
+
+def make_columns(count):
+    return {
+        "id": list(range(count)),
+        "title": [f"Post number {i}" for i in range(count)],
+        "views": [i * 7 for i in range(count)],
+        "score": [i / 3 for i in range(count)],
+        "author_id": [i % 100 for i in range(count)],
+    }
+
+
+def run(rows, iterations):
+    schema = PostSchema(many=True)
+    columns = make_columns(rows)
+    relationships = {"author": columns["author_id"]}
+
+    def dump_rows():
+        names = list(columns)
+        objs = [
+            Bunch(**dict(zip(names, values)), author=Bunch(id=values[-1]))
+            for values in zip(*columns.values())
+        ]
+        return schema.dump(objs)
+
+    def dump_columns():
+        return schema.dump_columns(columns, relationships=relationships)
+
+    def report(name, func):
+        total = timeit.timeit(func, number=iterations)
+        print(f"{name:<40} {total / iterations * 1000:10.3f} ms")
+
+    print(f"{rows} rows\n")
+    report("rows + schema.dump()", dump_rows)
+    report("schema.dump_columns()", dump_columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--rows", type=int, default=10000, help="Rows per document.")
+    parser.add_argument(
+        "--iterations", type=int, default=5, help="Iterations per benchmark."
+    )
+    args = parser.parse_args()
+    run(args.rows, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
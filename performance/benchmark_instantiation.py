@@ -0,0 +1,92 @@
+"""Benchmark the cost of creating per-request schemas.
+
+Compares instantiating a schema class with deriving a schema from a prepared
+prototype with `Schema.derive`, with and without included relationships.
+
+Usage: ::
+
+    python performance/benchmark_instantiation.py --iterations 10000
+"""
+import argparse
+import timeit
+
+from marshmallow_jsonapi import Schema, fields
+
+
+class AuthorSchema(Schema):
+    id = fields.Str()
+    first_name = fields.Str()
+    last_name = fields.Str()
+    twitter = fields.Str()
+
+    class Meta:
+        type_ = "people"
+
+
+class CommentSchema(Schema):
+    id = fields.Str()
+    body = fields.Str()
+    author = fields.Relationship(schema=AuthorSchema, type_="people")
+
+    class Meta:
+        type_ = "comments"
+
+
+class PostSchema(Schema):
+    id = fields.Str()
+    title = fields.Str()
+    body = fields.Str()
+    created = fields.DateTime()
+    author = fields.Relationship(
+        "/authors/{author_id}",
+        related_url_kwargs={"author_id": "<author.id>"},
+        schema=AuthorSchema,
+        type_="people",
+    )
+    comments = fields.Relationship(
+        "/posts/{post_id}/comments",
+        related_url_kwargs={"post_id": "<id>"},
+        schema=CommentSchema,
+        many=True,
+        type_="comments",
+    )
+
+    class Meta:
+        type_ = "posts"
+        self_url = "/posts/{post_id}"
+        self_url_kwargs = {"post_id": "<id>"}
+        self_url_many = "/posts/"
+
+
+def run(iterations):
+    # Including the relationships resolves the nested schemas of the prototype
+    prototype = PostSchema(include_data=("author", "comments", "comments.author"))
+
+    def report(name, func):
+        total = timeit.timeit(func, number=iterations)
+        print(f"{name:<50} {total / iterations * 1e6:10.2f} us")
+
+    for include_data in [(), ("author", "comments", "comments.author")]:
+        print(f"include_data={include_data}")
+        report(
+            "PostSchema(many=True, include_data=...)",
+            lambda: PostSchema(many=True, include_data=include_data),
+        )
+        report(
+            "prototype.derive(many=True, include_data=...)",
+            lambda: prototype.derive(many=True, include_data=include_data),
+        )
+        print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--iterations", type=int, default=10000, help="Iterations per benchmark."
+    )
+    args = parser.parse_args()
+    run(args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+import json
+
+import pytest
+
+from marshmallow_jsonapi import Schema, fields
+from marshmallow_jsonapi.cache import CacheEntry, LRUCache
+from marshmallow_jsonapi.codecs import JSONCodec
+from tests.base import Author, AuthorSchema, Comment, CommentSchema, PostSchema
+
+
+def set_ids(post, index):
+    post.id = index
+    post.author.id = post.author_id = 100 + index
+
+
+@pytest.fixture()
+def post(post):
+    set_ids(post, 1)
+    return post
+
+
+@pytest.fixture()
+def posts(posts):
+    # Random ids could collide and share cache entries
+    for index, post in enumerate(posts, 1):
+        set_ids(post, index)
+    return posts
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLRUCache:
+    def test_get_and_set(self):
+        cache = LRUCache()
+        assert cache.get("key") is None
+        assert cache.get("key", "default") == "default"
+        cache.set("key", "value")
+        assert cache.get("key") == "value"
+        assert len(cache) == 1
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_ttl(self):
+        timer = FakeTimer()
+        cache = LRUCache(ttl=10, timer=timer)
+        cache.set("key", "value")
+        timer.now = 9
+        assert cache.get("key") == "value"
+        timer.now = 10
+        assert cache.get("key") is None
+        assert len(cache) == 0
+
+    def test_clear(self):
+        cache = LRUCache()
+        cache.set("key", "value")
+        cache.clear()
+        assert cache.get("key") is None
+
+
+def make_cached_schemas(cache, calls):
+    class CachedAuthorSchema(AuthorSchema):
+        class Meta(AuthorSchema.Meta):
+            version_attribute = "version"
+
+    class CachedPostSchema(Schema):
+        id = fields.Str()
+        title = fields.Method("get_title")
+        author = fields.Relationship(
+            schema=CachedAuthorSchema, type_="people", include_resource_linkage=True
+        )
+        meta = fields.DocumentMeta()
+
+        def get_title(self, obj):
+            calls.append(obj.id)
+            return obj.title
+
+        class Meta:
+            type_ = "posts"
+            self_url = "/posts/{id}"
+            self_url_kwargs = {"id": "<id>"}
+            self_url_many = "/posts/"
+            version_attribute = "version"
+            fragment_cache = cache
+
+    return CachedPostSchema
+
+
+class TestFragmentCache:
+    @pytest.fixture()
+    def calls(self):
+        return []
+
+    @pytest.fixture()
+    def schema_class(self, calls):
+        return make_cached_schemas(LRUCache(), calls)
+
+    @pytest.fixture()
+    def posts(self, posts):
+        for post in posts:
+            post.version = 1
+            post.author.version = 1
+            post.meta = {"count": 3}
+        return posts
+
+    @pytest.mark.parametrize("include_data", [(), ("author",)])
+    def test_output_matches_dump(self, schema_class, posts, include_data):
+        schema = schema_class(include_data=include_data)
+        expected = JSONCodec().encode(schema.dump(posts, many=True))
+        assert schema.dumps_bytes(posts, many=True) == expected
+        # Served from the cache
+        assert schema.dumps_bytes(posts, many=True) == expected
+
+    def test_output_matches_dump_single(self, schema_class, posts):
+        schema = schema_class(include_data=("author",))
+        expected = JSONCodec().encode(schema.dump(posts[0]))
+        assert schema.dumps_bytes(posts[0]) == expected
+        assert schema.dumps_bytes(posts[0]) == expected
+
+    def test_cache_hits_skip_serialization(self, schema_class, posts, calls):
+        schema = schema_class(many=True)
+        schema.dumps_bytes(posts)
+        assert len(calls) == 3
+        schema_class(many=True).dumps_bytes(posts)
+        assert len(calls) == 3
+
+    def test_version_change_invalidates(self, schema_class, posts, calls):
+        schema = schema_class(many=True)
+        schema.dumps_bytes(posts)
+        posts[0].version = 2
+        posts[0].title = "Updated"
+        result = schema.dumps_bytes(posts)
+        assert len(calls) == 4
+        assert b'"Updated"' in result
+
+    def test_sparse_fields_are_part_of_the_key(self, schema_class, posts, calls):
+        schema = schema_class()
+        full = schema.dumps_bytes(posts[0])
+        sparse = schema.dumps_bytes(posts[0], sparse_fields={"posts": ["author"]})
+        assert full != sparse
+        assert b'"title"' not in sparse
+        assert schema.dumps_bytes(posts[0]) == full
+
+    def test_include_data_is_part_of_the_key(self, schema_class, posts):
+        without = schema_class().dumps_bytes(posts[0])
+        with_author = schema_class(include_data=("author",)).dumps_bytes(posts[0])
+        assert b'"included"' not in without
+        assert b'"included"' in with_author
+
+    def test_included_resources_are_deduplicated(self, schema_class, posts):
+        posts[1].author = posts[0].author
+        schema = schema_class(many=True, include_data=("author",))
+        expected = JSONCodec().encode(schema.dump(posts))
+        assert schema.dumps_bytes(posts) == expected
+        assert len(json.loads(schema.dumps_bytes(posts))["included"]) == 2
+
+    def test_without_version_attribute(self):
+        cache = LRUCache()
+
+        class CachedCommentSchema(CommentSchema):
+            class Meta(CommentSchema.Meta):
+                fragment_cache = cache
+
+        comment = Comment(id=1, body="First!", author=Author(id=1))
+        first = CachedCommentSchema().dumps_bytes(comment)
+        comment.body = "Updated"
+        assert CachedCommentSchema().dumps_bytes(comment) == first
+        cache.clear()
+        assert b'"Updated"' in CachedCommentSchema().dumps_bytes(comment)
+
+    def test_context_is_part_of_the_key(self, schema_class, posts):
+        class ContextSchema(schema_class):
+            greeting = fields.Function(lambda obj, context: context["greeting"])
+
+        hello = ContextSchema(context={"greeting": "Hello"}).dumps_bytes(posts[0])
+        hi = ContextSchema(context={"greeting": "Hi"}).dumps_bytes(posts[0])
+        assert b'"Hello"' in hello
+        assert b'"Hi"' in hi
+
+    def test_dumps_bytes_without_cache(self, posts):
+        schema = PostSchema(many=True)
+        expected = JSONCodec().encode(schema.dump(posts))
+        assert schema.dumps_bytes(posts) == expected
+
+
+class TestLRUCacheInvalidation:
+    def test_invalidate_resource(self):
+        cache = LRUCache()
+        cache.set(("posts", "1", None, ()), "first")
+        cache.set(("posts", "1", 2, ()), "second")
+        cache.set(("posts", "2", None, ()), "other")
+        cache.invalidate("posts", 1)
+        assert cache.get(("posts", "1", None, ())) is None
+        assert cache.get(("posts", "1", 2, ())) is None
+        assert cache.get(("posts", "2", None, ())) == "other"
+
+    def test_invalidate_type(self):
+        cache = LRUCache()
+        cache.set(("posts", "1", None, ()), "post")
+        cache.set(("people", "1", None, ()), "person")
+        cache.invalidate("posts")
+        assert cache.get(("posts", "1", None, ())) is None
+        assert cache.get(("people", "1", None, ())) == "person"
+
+    def test_invalidate_including_entries(self):
+        cache = LRUCache()
+        entry = CacheEntry({}, ((("people", "9"), {}),), {})
+        cache.set(("posts", "1", None, ()), entry)
+        cache.invalidate("people", 9)
+        assert cache.get(("posts", "1", None, ())) is None
+        assert len(cache) == 0
+
+    def test_hits_and_misses(self):
+        cache = LRUCache()
+        cache.get("key")
+        cache.set("key", "value")
+        cache.get("key")
+        cache.get("key")
+        assert (cache.hits, cache.misses) == (2, 1)
+
+
+class TestResourceCache:
+    @pytest.fixture()
+    def cache(self):
+        return LRUCache()
+
+    @pytest.fixture()
+    def calls(self):
+        return []
+
+    @pytest.fixture()
+    def schema_class(self, cache, calls):
+        class CachedAuthorSchema(AuthorSchema):
+            class Meta(AuthorSchema.Meta):
+                resource_cache = cache
+
+        class CachedPostSchema(Schema):
+            id = fields.Str()
+            title = fields.Method("get_title")
+            author = fields.Relationship(
+                schema=CachedAuthorSchema,
+                type_="people",
+                include_resource_linkage=True,
+            )
+
+            def get_title(self, obj):
+                calls.append(obj.id)
+                return obj.title
+
+            class Meta:
+                type_ = "posts"
+                self_url_many = "/posts/"
+                resource_cache = cache
+
+        return CachedPostSchema
+
+    @pytest.mark.parametrize("include_data", [(), ("author",)])
+    def test_output_matches_uncached_dump(self, schema_class, posts, include_data):
+        class UncachedSchema(schema_class):
+            class Meta(schema_class.Meta):
+                resource_cache = None
+
+        expected = UncachedSchema(include_data=include_data).dump(posts, many=True)
+        schema = schema_class(include_data=include_data)
+        assert schema.dump(posts, many=True) == expected
+        assert schema.dump(posts, many=True) == expected
+        assert schema.dump(posts[0]) == UncachedSchema(include_data=include_data).dump(
+            posts[0]
+        )
+
+    def test_cache_hits_skip_serialization(self, schema_class, posts, calls, cache):
+        schema_class(many=True).dump(posts)
+        assert len(calls) == 3
+        assert cache.misses == 3
+        schema_class(many=True).dump(posts)
+        assert len(calls) == 3
+        assert cache.hits == 3
+
+    def test_included_resources_are_cached(self, schema_class, post, cache):
+        schema_class(include_data=("author",)).dump(post)
+        keys = {key[:2] for key in cache._data}
+        assert ("people", str(post.author.id)) in keys
+
+    def test_invalidate_cache(self, schema_class, posts, calls):
+        schema_class(many=True).dump(posts)
+        posts[0].title = "Updated"
+        schema_class.invalidate_cache(posts[0].id)
+        data = schema_class(many=True).dump(posts)
+        assert len(calls) == 4
+        assert data["data"][0]["attributes"]["title"] == "Updated"
+
+    def test_context_is_part_of_the_key(self, cache, post):
+        class ContextSchema(Schema):
+            id = fields.Str()
+            greeting = fields.Function(lambda obj, context: context["greeting"])
+
+            class Meta:
+                type_ = "posts"
+                resource_cache = cache
+
+        hello = ContextSchema(context={"greeting": "Hello"}).dump(post)
+        hi = ContextSchema(context={"greeting": "Hi"}).dump(post)
+        assert hello["data"]["attributes"]["greeting"] == "Hello"
+        assert hi["data"]["attributes"]["greeting"] == "Hi"
+
+    def test_unhashable_context_is_not_cached(self, schema_class, post, cache):
+        schema_class(context={"user": {"id": 1}}).dump(post)
+        assert len(cache) == 0
+
+    def test_schema_class_is_part_of_the_key(self, schema_class, post, cache):
+        class ShoutingSchema(schema_class):
+            title = fields.Function(lambda obj: obj.title.upper())
+
+        schema_class().dump(post)
+        data = ShoutingSchema().dump(post)
+        assert data["data"]["attributes"]["title"] == post.title.upper()
+        ShoutingSchema.invalidate_cache(post.id)
+        assert len(cache) == 0
+
+    def test_invalidating_included_resource(self, schema_class, post):
+        schema = schema_class(include_data=("author",))
+        schema.dump(post)
+        post.author.first_name = "Changed"
+        schema.opts.resource_cache.invalidate("people", post.author.id)
+        data = schema.dump(post)
+        assert data["included"][0]["attributes"]["first_name"] == "Changed"
@@ -0,0 +1,116 @@
+import json
+
+import pytest
+
+from marshmallow_jsonapi import Schema, fields
+from marshmallow_jsonapi.codecs import JSONCodec, OrjsonCodec, fastest_codec
+from tests.base import AuthorSchema, PostSchema, PolygonSchema
+
+
+class TestJSONCodec:
+    def test_encode_is_compact_utf8(self):
+        encoded = JSONCodec().encode({"data": {"id": "1", "name": "café"}})
+        assert encoded == '{"data":{"id":"1","name":"café"}}'.encode()
+
+    def test_roundtrip(self):
+        codec = JSONCodec()
+        obj = {"data": [{"type": "people", "id": "1"}], "meta": {"count": 1}}
+        assert codec.decode(codec.encode(obj)) == obj
+
+
+class TestOrjsonCodec:
+    def test_roundtrip(self):
+        pytest.importorskip("orjson")
+        codec = OrjsonCodec()
+        obj = {"data": [{"type": "people", "id": "1"}], "meta": {"count": 1}}
+        assert codec.decode(codec.encode(obj)) == obj
+        assert codec.encode(obj) == JSONCodec().encode(obj)
+
+    def test_fastest_codec(self):
+        pytest.importorskip("orjson")
+        assert isinstance(fastest_codec(), OrjsonCodec)
+
+
+class TestDumpsBytes:
+    def test_dumps_bytes(self, post):
+        schema = PostSchema(include_data=("author",))
+        result = schema.dumps_bytes(post)
+        assert isinstance(result, bytes)
+        assert json.loads(result) == schema.dump(post)
+
+    def test_dumps_bytes_many(self, authors):
+        result = AuthorSchema(many=True).dumps_bytes(authors)
+        assert json.loads(result) == AuthorSchema(many=True).dump(authors)
+
+    def test_sparse_fields(self, author):
+        result = AuthorSchema().dumps_bytes(
+            author, sparse_fields={"people": ["twitter"]}
+        )
+        assert json.loads(result)["data"]["attributes"] == {"twitter": author.twitter}
+
+    def test_codec_argument(self, author):
+        class UpperCodec(JSONCodec):
+            def encode(self, obj):
+                return super().encode(obj).upper()
+
+        result = AuthorSchema().dumps_bytes(author, codec=UpperCodec())
+        assert b'"DATA"' in result
+
+    def test_codec_meta_option(self, author):
+        calls = []
+
+        class RecordingCodec(JSONCodec):
+            def encode(self, obj):
+                calls.append(obj)
+                return super().encode(obj)
+
+        class AuthorCodecSchema(Schema):
+            id = fields.Str()
+
+            class Meta:
+                type_ = "people"
+                codec = RecordingCodec()
+
+        AuthorCodecSchema().dumps_bytes(author)
+        assert calls == [{"data": {"type": "people", "id": str(author.id)}}]
+
+
+class TestLoadsBytes:
+    def test_loads_bytes(self):
+        data = {
+            "data": {
+                "type": "people",
+                "attributes": {"first_name": "Dan", "last_name": "Gebhardt"},
+            }
+        }
+        result = AuthorSchema().loads_bytes(json.dumps(data).encode())
+        assert result == {"first_name": "Dan", "last_name": "Gebhardt"}
+
+    def test_loads_bytes_with_meta(self):
+        data = {
+            "data": {"type": "shapes", "id": "1", "meta": {"some": "meta"}},
+            "meta": {"total": 1},
+        }
+        result = PolygonSchema().loads_bytes(json.dumps(data).encode())
+        assert result["resource_meta"] == {"some": "meta"}
+        assert result["document_meta"] == {"total": 1}
+
+    def test_loads_bytes_with_included(self):
+        data = {
+            "data": {
+                "type": "posts",
+                "id": "1",
+                "relationships": {
+                    "author": {"data": {"type": "people", "id": "1"}},
+                },
+            },
+            "included": [
+                {
+                    "type": "people",
+                    "id": "1",
+                    "attributes": {"first_name": "Dan", "last_name": "Gebhardt"},
+                }
+            ],
+        }
+        raw = json.dumps(data).encode()
+        assert PostSchema().loads_bytes(raw) == PostSchema().load(json.loads(raw))
@@ -1,3 +1,7 @@
+import copy
+import pickle
+import sqlite3
+
 import pytest
 
 from hashlib import md5
@@ -6,6 +10,7 @@ from marshmallow.fields import Int
 
 from marshmallow_jsonapi import Schema
 from marshmallow_jsonapi.fields import Str, DocumentMeta, ResourceMeta, Relationship
+from tests.base import PostSchema
 
 
 class TestGenericRelationshipField:
@@ -391,6 +396,79 @@ class TestGenericRelationshipField:
             field.deserialize({"data": {"type": "authors", "id": "not_a_number"}})
         assert excinfo.value.args[0] == "Not a valid integer."
 
+    def test_resource_linkage_ids_of_mixed_values(self):
+        field = Relationship(include_resource_linkage=True, type_="people", many=True)
+        value = [{"id": 1}, 2, type("Person", (), {"id": 3})()]
+        result = field.serialize("authors", {"authors": value})
+        assert [each["id"] for each in result["data"]] == ["1", "2", "3"]
+
+    def test_resource_linkage_ids_of_item_access_objects(self):
+        class Row:
+            def __init__(self, **values):
+                self.values = values
+
+            def __getitem__(self, key):
+                return self.values[key]
+
+        connection = sqlite3.connect(":memory:")
+        connection.row_factory = sqlite3.Row
+        row = connection.execute("SELECT 2 AS id").fetchone()
+        field = Relationship(include_resource_linkage=True, type_="people", many=True)
+        result = field.serialize("authors", {"authors": [Row(id=1), row]})
+        assert [each["id"] for each in result["data"]] == ["1", "2"]
+
+    def test_resource_linkage_dotted_id_field(self):
+        field = Relationship(
+            include_resource_linkage=True, type_="people", id_field="profile.key"
+        )
+        result = field.serialize("author", {"author": {"profile": {"key": "dgeb"}}})
+        assert result["data"]["id"] == "dgeb"
+
+    def test_id_field_is_resolved_once(self):
+        class AuthorSchema(Schema):
+            id = Str(attribute="name")
+
+            class Meta:
+                type_ = "authors"
+
+        field = Relationship(
+            include_resource_linkage=True, type_="authors", schema=AuthorSchema
+        )
+        assert field.id_field == "name"
+        field.schema.fields["id"].attribute = "other"
+        assert field.id_field == "name"
+
+    def test_accessors_are_reset_when_bound(self):
+        field = Relationship(
+            include_resource_linkage=True, type_="authors", id_field="name"
+        )
+        field.serialize("author", {"author": {"name": "Ray Bradbury"}})
+        field_copy = copy.copy(field)
+        field_copy._Relationship__id_field = "pseudonym"
+        field_copy._bind_to_schema("author", None)
+        result = field_copy.serialize("author", {"author": {"pseudonym": "Ray"}})
+        assert result["data"]["id"] == "Ray"
+
+    def test_pickle(self, post):
+        schema = PostSchema(include_data=("author",))
+        field = schema.fields["author"]
+        expected = field.serialize("author", post)
+        unpickled = pickle.loads(pickle.dumps(field))
+        assert unpickled._Relationship__get_id is None
+        assert unpickled.serialize("author", post) == expected
+
+    def test_pickle_recursive(self):
+        class Recursive(Schema):
+            id = Str()
+
+            class Meta:
+                type_ = "recursive"
+
+        field = Relationship(schema="self", type_="recursive")
+        field._Relationship__schema = Recursive()
+        state = field.__getstate__()
+        assert state["_Relationship__schema"] == "self"
+
 
 class TestDocumentMetaField:
     def test_serialize(self):
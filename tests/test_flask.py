@@ -1,9 +1,20 @@
+import gzip
+import json
+import pickle
+import sqlite3
+
 from flask import Flask, url_for
 import pytest
+from werkzeug.exceptions import HTTPException
 from werkzeug.routing import BuildError
 
 from marshmallow_jsonapi import fields
-from marshmallow_jsonapi.flask import Relationship, Schema
+from marshmallow_jsonapi.flask import (
+    Relationship,
+    Schema,
+    get_request_document,
+    warm_up,
+)
 
 
 @pytest.fixture()
@@ -61,6 +72,21 @@ class TestSchema:
             self_view_kwargs = {"post_id": "<id>"}
             self_view_many = "posts"
 
+    def test_meta_inheritance(self, app, post):
+        class InheritedPostFlaskSchema(self.PostFlaskSchema):
+            class Meta(self.PostFlaskSchema.Meta):
+                pass
+
+        data = InheritedPostFlaskSchema().dump(post)
+        assert data["data"]["links"]["self"] == url_for("post_detail", post_id=post.id)
+        assert not hasattr(self.PostFlaskSchema.Meta, "self_url")
+
+    def test_pickle(self, app, post):
+        schema = self.PostFlaskSchema()
+        unpickled = pickle.loads(pickle.dumps(schema))
+        assert unpickled.dump(post) == schema.dump(post)
+        assert pickle.loads(pickle.dumps(schema.opts)).self_url == "post_detail"
+
     def test_schema_requires_view_options(self):
         with pytest.raises(ValueError):
 
@@ -171,3 +197,283 @@ class TestRelationshipField:
         result = field.serialize("author", post_with_null_author)
 
         assert not result
+
+
+class TestConditionalResponse:
+    class VersionedPostSchema(Schema):
+        id = fields.Int()
+        title = fields.Str()
+
+        class Meta:
+            type_ = "posts"
+            self_view = "post_detail"
+            self_view_kwargs = {"post_id": "<id>"}
+            self_view_many = "posts"
+            version_attribute = "version"
+
+    @pytest.fixture()
+    def post(self, post):
+        post.version = 1
+        return post
+
+    def test_response(self, app, post):
+        schema = self.VersionedPostSchema()
+        response = schema.make_response(post)
+        assert response.status_code == 200
+        assert response.mimetype == "application/vnd.api+json"
+        assert response.get_json() == schema.dump(post)
+        etag, weak = response.get_etag()
+        assert weak
+        assert etag == schema.compute_etag(post)
+
+    def test_not_modified_skips_serialization(self, app, post, monkeypatch):
+        schema = self.VersionedPostSchema()
+        etag = schema.compute_etag(post)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("should not be serialized")
+
+        monkeypatch.setattr(schema, "dumps_bytes", fail)
+        headers = {"If-None-Match": f'W/"{etag}"'}
+        with app.test_request_context("/posts/1/", headers=headers):
+            response = schema.make_response(post)
+        assert response.status_code == 304
+        assert response.get_etag() == (etag, True)
+        assert not response.get_data()
+
+    def test_modified(self, app, post):
+        schema = self.VersionedPostSchema()
+        headers = {"If-None-Match": f'W/"{schema.compute_etag(post)}"'}
+        post.version = 2
+        with app.test_request_context("/posts/1/", headers=headers):
+            response = schema.make_response(post)
+        assert response.status_code == 200
+
+    def test_full_document_hash_without_version(self, app, post):
+        schema = TestSchema.PostFlaskSchema()
+        response = schema.make_response(post)
+        etag, weak = response.get_etag()
+        assert not weak
+        with app.test_request_context("/posts/1/", headers={"If-None-Match": etag}):
+            response = schema.make_response(post)
+        assert response.status_code == 304
+
+    def test_only_get_is_conditional(self, app, post):
+        schema = self.VersionedPostSchema()
+        headers = {"If-None-Match": f'W/"{schema.compute_etag(post)}"'}
+        with app.test_request_context("/posts/1/", method="POST", headers=headers):
+            response = schema.make_response(post, status=201)
+        assert response.status_code == 201
+
+
+class TestStreamResponse:
+    def read(self, response):
+        return b"".join(response.response)
+
+    def test_stream_many(self, app, posts):
+        schema = TestSchema.PostFlaskSchema(many=True)
+        response = schema.stream_response(posts)
+        assert response.is_streamed
+        assert response.mimetype == "application/vnd.api+json"
+        assert json.loads(self.read(response)) == schema.dump(posts)
+
+    def test_stream_single(self, app, post):
+        schema = TestSchema.PostFlaskSchema()
+        response = schema.stream_response(post)
+        assert json.loads(self.read(response)) == schema.dump(post)
+
+    def test_stream_generator(self, app, posts):
+        schema = TestSchema.PostFlaskSchema(many=True)
+        response = schema.stream_response(post for post in posts)
+        assert json.loads(self.read(response)) == schema.dump(posts)
+
+    def test_chunks_are_coalesced(self, app, posts):
+        schema = TestSchema.PostFlaskSchema(many=True)
+        chunks = list(schema.stream_response(posts, chunk_size=1).response)
+        assert len(chunks) > 1
+        chunks = list(schema.stream_response(posts, chunk_size=1 << 20).response)
+        assert len(chunks) == 1
+
+    def test_gzip(self, app, posts):
+        schema = TestSchema.PostFlaskSchema(many=True)
+        headers = {"Accept-Encoding": "gzip, deflate"}
+        with app.test_request_context("/posts/", headers=headers):
+            response = schema.stream_response(posts, gzip=True, chunk_size=64)
+            body = self.read(response)
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert response.headers["Vary"] == "Accept-Encoding"
+        assert json.loads(gzip.decompress(body)) == schema.dump(posts)
+
+    def test_gzip_not_accepted(self, app, posts):
+        schema = TestSchema.PostFlaskSchema(many=True)
+        response = schema.stream_response(posts, gzip=True)
+        assert "Content-Encoding" not in response.headers
+        assert json.loads(self.read(response)) == schema.dump(posts)
+
+
+class TestLoadRequest:
+    class AuthorFlaskSchema(Schema):
+        id = fields.Int()
+        first_name = fields.Str(required=True)
+        last_name = fields.Str(required=True)
+
+        class Meta:
+            type_ = "people"
+
+    def request(self, app, body, content_type="application/vnd.api+json"):
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode()
+        return app.test_request_context(
+            "/authors/", method="POST", data=body, content_type=content_type
+        )
+
+    def abort_response(self, func):
+        with pytest.raises(HTTPException) as excinfo:
+            func()
+        return excinfo.value.get_response()
+
+    def test_load_request(self, app):
+        body = {
+            "data": {
+                "type": "people",
+                "attributes": {"first_name": "Dan", "last_name": "Gebhardt"},
+            }
+        }
+        with self.request(app, body):
+            result = self.AuthorFlaskSchema().load_request()
+        assert result == {"first_name": "Dan", "last_name": "Gebhardt"}
+
+    def test_document_is_decoded_once(self, app, monkeypatch):
+        body = {"data": {"type": "people", "attributes": {}}}
+        with self.request(app, body):
+            document = get_request_document()
+            monkeypatch.setattr(json, "loads", None)
+            assert get_request_document() is document
+
+    def test_validation_errors(self, app):
+        body = {"data": {"type": "people", "attributes": {"first_name": "Dan"}}}
+        with self.request(app, body):
+            response = self.abort_response(self.AuthorFlaskSchema().load_request)
+        assert response.status_code == 422
+        assert response.mimetype == "application/vnd.api+json"
+        assert response.get_json() == {
+            "errors": [
+                {
+                    "detail": "Missing data for required field.",
+                    "source": {"pointer": "/data/attributes/last_name"},
+                }
+            ]
+        }
+
+    def test_incorrect_type(self, app):
+        body = {"data": {"type": "posts", "attributes": {}}}
+        with self.request(app, body):
+            response = self.abort_response(self.AuthorFlaskSchema().load_request)
+        assert response.status_code == 409
+        assert response.get_json()["errors"][0]["source"] == {"pointer": "/data/type"}
+
+    @pytest.mark.parametrize(
+        "content_type",
+        ["application/json", "application/vnd.api+json; charset=utf-8"],
+    )
+    def test_unsupported_media_type(self, app, content_type):
+        with self.request(app, {"data": {}}, content_type=content_type):
+            response = self.abort_response(get_request_document)
+        assert response.status_code == 415
+
+    @pytest.mark.parametrize("body", [b"{not json", b"[]"])
+    def test_bad_request(self, app, body):
+        with self.request(app, body):
+            response = self.abort_response(get_request_document)
+        assert response.status_code == 400
+        assert response.get_json()["errors"][0]["source"] == {"pointer": "/"}
+
+
+class TestDumpColumns:
+    class ColumnPostFlaskSchema(Schema):
+        id = fields.Int()
+        title = fields.Str()
+        author = Relationship(
+            self_view="post_detail",
+            self_view_kwargs={"post_id": "<id>"},
+            related_view="author_detail",
+            related_view_kwargs={"author_id": "<author.id>"},
+            include_resource_linkage=True,
+            type_="people",
+        )
+
+        class Meta:
+            type_ = "posts"
+            self_view = "post_detail"
+            self_view_kwargs = {"post_id": "<id>"}
+            self_view_many = "posts"
+
+    def test_relationship_links(self, app, posts):
+        schema = self.ColumnPostFlaskSchema(many=True)
+        result = schema.dump_columns(
+            {
+                "id": [post.id for post in posts],
+                "title": [post.title for post in posts],
+                "author.id": [post.author.id for post in posts],
+            },
+            relationships={"author": [post.author.id for post in posts]},
+        )
+        assert result == schema.dump(posts)
+        links = result["data"][0]["relationships"]["author"]["links"]
+        assert links == {
+            "self": url_for("post_detail", post_id=posts[0].id),
+            "related": url_for("author_detail", author_id=posts[0].author.id),
+        }
+
+    def test_iter_dumps_rows(self, app, posts):
+        connection = sqlite3.connect(":memory:")
+        connection.execute("CREATE TABLE posts (id, title, author_id)")
+        connection.executemany(
+            "INSERT INTO posts VALUES (?, ?, ?)",
+            [(post.id, post.title, post.author.id) for post in posts],
+        )
+        cursor = connection.execute(
+            'SELECT id, title, author_id AS "author.id", author_id FROM posts'
+            " ORDER BY rowid"
+        )
+        schema = self.ColumnPostFlaskSchema(many=True)
+        chunks = schema.iter_dumps_rows(
+            cursor, relationships={"author": "author_id"}, batch_size=2
+        )
+        assert b"".join(chunks) == schema.dumps_bytes(posts)
+        connection.close()
+
+
+class TestWarmUp:
+    def test_warm_up(self, app):
+        class WarmUpPostFlaskSchema(Schema):
+            id = fields.Str()
+            author = Relationship(
+                related_view="author_detail",
+                related_view_kwargs={"author_id": "<author.id>"},
+            )
+
+            class Meta:
+                type_ = "posts"
+                self_view = "post_detail"
+                self_view_kwargs = {"post_id": "<id>"}
+                self_view_many = "posts"
+
+        report = warm_up(app, [WarmUpPostFlaskSchema])
+        assert report.schemas == (WarmUpPostFlaskSchema,)
+        assert report.errors == ()
+
+    def test_reports_unknown_views(self, app):
+        class WarmUpUnknownViewSchema(Schema):
+            id = fields.Str()
+            author = Relationship(self_view="missing_relationship")
+
+            class Meta:
+                type_ = "posts"
+                self_view_many = "missing_list"
+
+        report = warm_up(app, [WarmUpUnknownViewSchema])
+        assert [str(error) for _, error in report.errors] == [
+            'Unknown view "missing_list"',
+            'Unknown view "missing_relationship"',
+        ]
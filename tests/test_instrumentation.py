@@ -0,0 +1,196 @@
+import io
+import threading
+
+import pytest
+from marshmallow import ValidationError
+
+from marshmallow_jsonapi.fields import Relationship
+from marshmallow_jsonapi.instrumentation import FieldProfiler, PhaseTimings
+from marshmallow_jsonapi.parallel import dump_threaded
+from tests.base import AuthorSchema, PostSchema
+
+
+class TestInstrument:
+    def test_dump_phases(self, post):
+        schema = PostSchema(include_data=("author",))
+        with schema.instrument() as timings:
+            schema.dump(post)
+        assert isinstance(timings, PhaseTimings)
+        # Primary and included resource
+        assert timings.counts["serialize"] == 2
+        assert timings.counts["format_response"] == 2
+        assert timings.counts["format_items"] == 2
+        assert timings.counts["resource_links"] == 2
+        assert timings.counts["include"] == 1
+        # Related and self links of the three relationships
+        assert timings.counts["relationship_links"] == 6
+        assert all(duration >= 0 for duration in timings.totals.values())
+        assert timings.totals["serialize"] >= timings.totals["include"]
+
+    def test_load_phases(self):
+        data = {
+            "data": {
+                "type": "people",
+                "attributes": {"first_name": "Dan", "password": "short"},
+            }
+        }
+        schema = AuthorSchema()
+        with schema.instrument() as timings:
+            with pytest.raises(ValidationError):
+                schema.load(data)
+        assert timings.counts["load"] == 1
+        assert timings.counts["unwrap"] == 1
+        assert timings.counts["deserialize"] == 1
+        assert timings.counts["format_errors"] == 1
+
+    def test_callback(self, author):
+        calls = []
+        schema = AuthorSchema()
+        with schema.instrument(lambda *args: calls.append(args)) as callback:
+            schema.dump(author)
+        assert callback is not None
+        assert {phase for phase, _ in calls} >= {"serialize", "format_items"}
+
+    def test_restores_methods(self, post):
+        schema = PostSchema(include_data=("author",))
+        expected = schema.dump(post)
+        with schema.instrument():
+            assert schema.dump(post) == expected
+        assert "_serialize" not in vars(schema)
+        assert "get_related_url" not in vars(schema.fields["author"])
+        assert "_serialize" not in vars(schema.fields["author"].schema)
+        assert schema.dump(post) == expected
+
+    def test_restores_methods_on_error(self):
+        schema = AuthorSchema()
+        with pytest.raises(RuntimeError):
+            with schema.instrument():
+                raise RuntimeError()
+        assert "_serialize" not in vars(schema)
+
+    def test_nested_blocks(self, post):
+        schema = PostSchema(include_data=("author",))
+        with schema.instrument() as outer:
+            with schema.instrument() as inner, schema.profile_fields() as profiler:
+                schema.dump(post)
+            schema.dump(post)
+        assert outer.counts["include"] == 2
+        assert inner.counts["include"] == 1
+        assert profiler.stats[(PostSchema, "author", "include")][0] == 1
+        assert "_serialize" not in vars(schema)
+
+    def test_blocks_exited_out_of_order(self, post):
+        schema = PostSchema(include_data=("author",))
+        first = schema.instrument()
+        second = schema.profile_fields()
+        timings = first.__enter__()
+        profiler = second.__enter__()
+        first.__exit__(None, None, None)
+        schema.dump(post)
+        assert not timings.counts
+        assert profiler.stats[(PostSchema, "author", "include")][0] == 1
+        second.__exit__(None, None, None)
+        assert "_serialize_included" not in vars(schema.fields["author"])
+        assert "serialize" not in vars(schema.fields["author"])
+
+    def test_other_threads_are_not_instrumented(self, post):
+        schema = PostSchema(include_data=("author",))
+        expected = schema.dump(post)
+        results = []
+        with schema.instrument() as timings:
+            thread = threading.Thread(target=lambda: results.append(schema.dump(post)))
+            thread.start()
+            thread.join()
+        assert results == [expected]
+        assert not timings.counts
+
+    def test_repr(self):
+        timings = PhaseTimings()
+        timings("serialize", 0.5)
+        assert repr(timings) == "<PhaseTimings(serialize=500.000ms/1)>"
+
+
+def iter_objects(schema):
+    """Yield ``schema``, its nested schemas and their fields."""
+    yield schema
+    for field_obj in schema.fields.values():
+        yield field_obj
+        if isinstance(field_obj, Relationship) and field_obj.include_data:
+            yield from iter_objects(field_obj.schema)
+
+
+@pytest.mark.parametrize("method", ["instrument", "profile_fields", "trace_access"])
+def test_copies_are_not_patched(method, posts):
+    schema = PostSchema(include_data=("author", "post_comments.author"))
+    expected = schema.dump(posts, many=True)
+    with getattr(schema, method)():
+        derived = schema.derive()
+        assert derived.dump(posts, many=True) == expected
+        assert dump_threaded(schema, posts, chunk_size=1) == expected
+    assert schema.dump(posts, many=True) == expected
+    for obj in iter_objects(derived):
+        assert not [
+            name for name, value in vars(obj).items() if hasattr(value, "__wrapped__")
+        ]
+
+
+class TestProfileFields:
+    def test_dump_steps(self, posts):
+        schema = PostSchema(include_data=("author",))
+        with schema.profile_fields() as profiler:
+            schema.dump(posts, many=True)
+        assert isinstance(profiler, FieldProfiler)
+        stats = profiler.stats
+        assert stats[(PostSchema, "post_title", "serialize")][0] == 3
+        assert stats[(PostSchema, "author", "serialize")][0] == 3
+        assert stats[(PostSchema, "author", "links")][0] == 6
+        assert stats[(PostSchema, "author", "linkage")][0] == 3
+        assert stats[(PostSchema, "author", "include")][0] == 3
+        # Fields of the included resource
+        assert stats[(AuthorSchema, "first_name", "serialize")][0] == 3
+        assert (PostSchema, "post_comments", "include") not in stats
+        calls, seconds = stats[(PostSchema, "author", "serialize")]
+        assert seconds >= stats[(PostSchema, "author", "include")][1]
+
+    def test_load_steps(self):
+        data = {
+            "data": {
+                "type": "people",
+                "attributes": {
+                    "first_name": "Dan",
+                    "last_name": "Gebhardt",
+                    "password": "supersecure",
+                },
+            }
+        }
+        schema = AuthorSchema()
+        with schema.profile_fields() as profiler:
+            schema.load(data)
+        assert profiler.stats[(AuthorSchema, "first_name", "deserialize")][0] == 1
+        assert profiler.stats[(AuthorSchema, "password", "deserialize")][0] == 1
+
+    def test_report(self):
+        profiler = FieldProfiler()
+        profiler((PostSchema, "title", "serialize"), 0.1)
+        profiler((PostSchema, "author", "serialize"), 0.5)
+        profiler((PostSchema, "author", "serialize"), 0.5)
+        assert profiler.report() == [
+            (PostSchema, "author", "serialize", 2, 1.0),
+            (PostSchema, "title", "serialize", 1, 0.1),
+        ]
+        assert len(profiler.report(limit=1)) == 1
+        out = io.StringIO()
+        profiler.print_report(file=out)
+        lines = out.getvalue().splitlines()
+        assert len(lines) == 3
+        assert lines[1].startswith("PostSchema.author")
+        assert lines[1].split()[1:] == ["serialize", "2", "1.000000", "0.500000"]
+
+    def test_restores_methods(self, post):
+        schema = PostSchema(include_data=("author",))
+        expected = schema.dump(post)
+        with schema.profile_fields():
+            assert schema.dump(post) == expected
+        assert "serialize" not in vars(schema.fields["post_title"])
+        assert "_get_resource_identifier" not in vars(schema.fields["author"])
+        assert schema.dump(post) == expected
@@ -0,0 +1,163 @@
+import pytest
+from marshmallow import EXCLUDE, INCLUDE, ValidationError
+
+from marshmallow_jsonapi import Schema, fields
+from marshmallow_jsonapi.exceptions import IncorrectTypeError
+from marshmallow_jsonapi.lazy import LazyResource
+from tests.base import AuthorSchema, ArticleSchema
+from tests.test_schema import make_serialized_author, make_serialized_authors
+
+
+class IntIdAuthorSchema(Schema):
+    id = fields.Int()
+    first_name = fields.Str(required=True)
+
+    class Meta:
+        type_ = "people"
+
+
+class TestLoadLazy:
+    def test_returns_lazy_resource(self):
+        data = make_serialized_author({"first_name": "Dan", "last_name": "Gebhardt"})
+        result = AuthorSchema().load_lazy(data)
+        assert isinstance(result, LazyResource)
+        assert result["first_name"] == "Dan"
+        assert result["last_name"] == "Gebhardt"
+
+    def test_matches_load(self):
+        data = make_serialized_author(
+            {"first_name": "Dan", "last_name": "Gebhardt", "password": "verysecure"}
+        )
+        result = AuthorSchema().load_lazy(data)
+        assert dict(result) == AuthorSchema().load(data)
+
+    def test_many(self):
+        data = make_serialized_authors(
+            [
+                {"first_name": "Dan", "last_name": "Gebhardt"},
+                {"first_name": "Joe", "last_name": "Schmoe"},
+            ]
+        )
+        result = AuthorSchema(many=True).load_lazy(data)
+        assert [each["first_name"] for each in result] == ["Dan", "Joe"]
+
+    def test_fields_are_validated_on_access(self):
+        data = make_serialized_author({"first_name": "Dan", "password": "short"})
+        result = AuthorSchema().load_lazy(data)
+        assert result["first_name"] == "Dan"
+
+        with pytest.raises(ValidationError) as excinfo:
+            result["password"]
+        assert excinfo.value.messages == {
+            "errors": [
+                {
+                    "detail": "Shorter than minimum length 6.",
+                    "source": {"pointer": "/data/attributes/password"},
+                }
+            ]
+        }
+
+    def test_error_pointer_includes_index(self):
+        data = make_serialized_authors(
+            [
+                {"first_name": "Dan", "last_name": "Gebhardt"},
+                {"first_name": "Joe", "password": "short"},
+            ]
+        )
+        result = AuthorSchema().load_lazy(data, many=True)
+        with pytest.raises(ValidationError) as excinfo:
+            result[1]["password"]
+        pointer = excinfo.value.messages["errors"][0]["source"]["pointer"]
+        assert pointer == "/data/1/attributes/password"
+
+    def test_validate_all_collects_errors(self):
+        data = make_serialized_author({"first_name": "Dan", "password": "short"})
+        result = AuthorSchema().load_lazy(data)
+        with pytest.raises(ValidationError) as excinfo:
+            result.validate_all()
+        errors = AuthorSchema().validate(data)
+        assert sorted(
+            e["source"]["pointer"] for e in excinfo.value.messages["errors"]
+        ) == sorted(e["source"]["pointer"] for e in errors["errors"])
+
+    def test_unknown_fields_match_load(self):
+        data = make_serialized_author(
+            {"first_name": "Dan", "last_name": "Gebhardt", "bogus": 1}
+        )
+        data["data"]["relationships"] = {"editor": {"data": None}}
+        with pytest.raises(ValidationError) as expected:
+            AuthorSchema().load(data)
+        result = AuthorSchema().load_lazy(data)
+        assert result["first_name"] == "Dan"
+        with pytest.raises(ValidationError) as excinfo:
+            result.validate_all()
+        # marshmallow reports unknown keys in set order
+        assert sorted(map(str, excinfo.value.messages["errors"])) == sorted(
+            map(str, expected.value.messages["errors"])
+        )
+
+    @pytest.mark.parametrize("unknown", [EXCLUDE, INCLUDE])
+    def test_unknown_argument(self, unknown):
+        data = make_serialized_author(
+            {"first_name": "Dan", "last_name": "Gebhardt", "bogus": 1}
+        )
+        result = AuthorSchema().load_lazy(data, unknown=unknown)
+        assert dict(result) == AuthorSchema().load(data, unknown=unknown)
+
+    def test_partial(self):
+        data = make_serialized_author({"first_name": "Dan"})
+        with pytest.raises(ValidationError):
+            AuthorSchema().load_lazy(data).validate_all()
+        result = AuthorSchema().load_lazy(data, partial=("last_name",))
+        assert dict(result) == AuthorSchema().load(data, partial=("last_name",))
+        assert dict(AuthorSchema().load_lazy(data, partial=True)) == {
+            "first_name": "Dan"
+        }
+
+    def test_missing_optional_field_raises_key_error(self):
+        data = make_serialized_author({"first_name": "Dan", "last_name": "Gebhardt"})
+        result = AuthorSchema().load_lazy(data)
+        assert "twitter" not in result
+        with pytest.raises(KeyError):
+            result["twitter"]
+
+    def test_type_is_checked_eagerly(self):
+        data = {"data": {"type": "posts", "attributes": {"first_name": "Dan"}}}
+        with pytest.raises(IncorrectTypeError):
+            AuthorSchema().load_lazy(data)
+
+    def test_structure_errors_are_formatted(self):
+        with pytest.raises(ValidationError) as excinfo:
+            AuthorSchema().load_lazy({"meta": {}})
+        assert excinfo.value.messages == {
+            "errors": [
+                {
+                    "detail": "Object must include `data` key.",
+                    "source": {"pointer": "/"},
+                }
+            ]
+        }
+
+    def test_id_is_checked_eagerly(self):
+        data = {"data": {"type": "people", "id": "abc", "attributes": {}}}
+        with pytest.raises(ValidationError) as excinfo:
+            IntIdAuthorSchema().load_lazy(data)
+        pointer = excinfo.value.messages["errors"][0]["source"]["pointer"]
+        assert pointer == "/data/id"
+
+    def test_relationships(self):
+        data = {
+            "data": {
+                "type": "articles",
+                "id": "1",
+                "attributes": {"body": "Test"},
+                "relationships": {
+                    "author": {"data": {"type": "people", "id": "1"}},
+                    "comments": {"data": [{"type": "comments", "id": "1"}]},
+                },
+            }
+        }
+        result = ArticleSchema().load_lazy(data)
+        assert result["author"] == "1"
+        assert result["comments"] == ["1"]
+        assert result["id"] == 1
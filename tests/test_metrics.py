@@ -0,0 +1,253 @@
+import pytest
+from marshmallow import ValidationError
+
+from marshmallow_jsonapi import Schema, fields
+from marshmallow_jsonapi.cache import LRUCache
+from marshmallow_jsonapi.exceptions import IncorrectTypeError
+from marshmallow_jsonapi.metrics import DocumentShape, InMemoryMetrics, summarize
+from tests.base import AuthorSchema, PostSchema
+
+
+def make_shape(**kwargs):
+    values = dict(
+        operation="dump",
+        type_="posts",
+        primary=1,
+        included={},
+        depth=0,
+        linkage={},
+        errors=0,
+        size=None,
+        duration=0.0,
+    )
+    values.update(kwargs)
+    return DocumentShape(**values)
+
+
+@pytest.fixture()
+def metrics():
+    return InMemoryMetrics()
+
+
+@pytest.fixture()
+def schema_class(metrics):
+    class MeteredPostSchema(PostSchema):
+        class Meta(PostSchema.Meta):
+            pass
+
+    MeteredPostSchema.opts.metrics = metrics
+    return MeteredPostSchema
+
+
+class TestSummarize:
+    def test_dump(self, posts):
+        document = PostSchema(many=True, include_data=("author", "post_comments")).dump(
+            posts
+        )
+        shape = summarize(document, "dump", "posts", size=10)
+        assert shape.operation == "dump"
+        assert shape.type_ == "posts"
+        assert shape.primary == 3
+        assert shape.included["people"] == 3
+        assert shape.included["comments"] == sum(len(post.comments) for post in posts)
+        assert shape.depth == 1
+        resources, identifiers, maximum = shape.linkage[("posts", "post-comments")]
+        assert resources == 3
+        assert identifiers == sum(len(post.comments) for post in posts)
+        assert maximum == max(len(post.comments) for post in posts)
+        assert shape.size == 10
+
+    def test_single_resource_without_included(self, post):
+        shape = summarize(PostSchema().dump(post), "dump", "posts")
+        assert shape.primary == 1
+        assert shape.included == {}
+        assert shape.depth == 0
+
+    def test_depth(self):
+        def resource(type_, id_, *related):
+            linkage = [{"type": type_, "id": id_} for type_, id_ in related]
+            return {
+                "type": type_,
+                "id": id_,
+                "relationships": {"related": {"data": linkage}},
+            }
+
+        document = {
+            "data": [resource("posts", "1", ("comments", "1"))],
+            "included": [
+                resource("comments", "1", ("people", "1"), ("posts", "1")),
+                resource("people", "1", ("comments", "1")),
+                resource("people", "2"),
+            ],
+        }
+        shape = summarize(document, "dump", "posts")
+        assert shape.depth == 2
+        assert shape.included == {"comments": 1, "people": 2}
+
+    def test_null_linkage(self):
+        document = {
+            "data": {
+                "type": "posts",
+                "id": "1",
+                "relationships": {"author": {"data": None}, "comments": {}},
+            }
+        }
+        shape = summarize(document, "load", "posts")
+        assert shape.linkage == {("posts", "author"): (1, 0, 0)}
+
+    @pytest.mark.parametrize("document", [None, [], {}, {"data": 1, "included": 2}])
+    def test_malformed_document(self, document):
+        shape = summarize(document, "load", "posts")
+        assert shape.included == {}
+        assert shape.depth == 0
+
+
+class TestInMemoryMetrics:
+    def test_record(self, metrics):
+        metrics.record(
+            make_shape(
+                primary=3,
+                included={"people": 2},
+                depth=1,
+                linkage={("posts", "author"): (3, 3, 1)},
+                size=100,
+            )
+        )
+        metrics.record(
+            make_shape(linkage={("posts", "author"): (1, 1, 1)}, size=50, depth=None)
+        )
+        assert metrics.documents[("dump", "posts")] == 2
+        assert metrics.primary[("dump", "posts")] == 4
+        assert metrics.included[("dump", "people")] == 2
+        assert metrics.max_depth == 1
+        assert metrics.linkage[("posts", "author")] == [4, 4, 1]
+        assert metrics.size[("dump", "posts")] == 150
+        assert metrics.max_size == 100
+        assert not metrics.samples
+
+    def test_samples_above_thresholds(self):
+        metrics = InMemoryMetrics(
+            latency_threshold=1.0, size_threshold=1000, max_samples=2
+        )
+        slow = make_shape(duration=2.0)
+        large = make_shape(size=1000)
+        metrics.record(make_shape(duration=0.5, size=999))
+        metrics.record(slow)
+        metrics.record(large)
+        assert list(metrics.samples) == [slow, large]
+        metrics.record(make_shape(duration=3.0))
+        assert len(metrics.samples) == 2
+
+    def test_clear(self, metrics):
+        metrics.record(make_shape(size=10, depth=2))
+        metrics.clear()
+        assert not metrics.documents
+        assert metrics.max_depth == metrics.max_size == 0
+
+
+class TestSchemaMetrics:
+    def test_dump(self, schema_class, metrics, posts):
+        document = schema_class(many=True, include_data=("author",)).dump(posts)
+        assert metrics.documents == {("dump", "posts"): 1}
+        assert metrics.primary[("dump", "posts")] == 3
+        assert metrics.included[("dump", "people")] == len(document["included"])
+        assert metrics.max_depth == 1
+        # Not encoded again by default
+        assert metrics.max_size == 0
+        assert metrics.size == {}
+
+    def test_dump_measure_size(self, schema_class, posts):
+        metrics = schema_class.opts.metrics = InMemoryMetrics(measure_size=True)
+        document = schema_class(many=True).dump(posts)
+        assert metrics.max_size == len(schema_class.opts.codec.encode(document))
+
+    def test_dumps_bytes(self, schema_class, metrics, post):
+        result = schema_class(include_data=("author",)).dumps_bytes(post)
+        assert metrics.documents == {("dump", "posts"): 1}
+        assert metrics.size[("dump", "posts")] == len(result)
+
+    def test_dumps_bytes_with_fragment_cache(self, metrics, posts):
+        class CachedPostSchema(PostSchema):
+            class Meta(PostSchema.Meta):
+                fragment_cache = LRUCache()
+
+        CachedPostSchema.opts.metrics = metrics
+        schema = CachedPostSchema(many=True, include_data=("author",))
+        for _ in range(2):
+            result = schema.dumps_bytes(posts)
+        assert metrics.documents == {("dump", "posts"): 2}
+        assert metrics.primary[("dump", "posts")] == 6
+        assert metrics.included[("dump", "people")] == 6
+        assert metrics.max_size == len(result)
+
+    def test_load(self, metrics):
+        class MeteredAuthorSchema(AuthorSchema):
+            class Meta(AuthorSchema.Meta):
+                pass
+
+        MeteredAuthorSchema.opts.metrics = metrics
+        data = {
+            "data": {
+                "type": "people",
+                "attributes": {"first_name": "Dan", "password": "short"},
+            }
+        }
+        with pytest.raises(ValidationError):
+            MeteredAuthorSchema().load(data)
+        assert metrics.documents == {("load", "people"): 1}
+        # Missing last name and short password
+        assert metrics.errors[("load", "people")] == 2
+        assert metrics.size[("load", "people")] == 0
+
+    def test_load_incorrect_type(self, schema_class, metrics):
+        with pytest.raises(IncorrectTypeError):
+            schema_class().load({"data": {"type": "people", "id": "1"}})
+        assert metrics.documents == {("load", "posts"): 1}
+        assert metrics.errors[("load", "posts")] == 1
+
+    def test_load_malformed_document(self, schema_class, metrics):
+        with pytest.raises(AttributeError):
+            schema_class().load([])
+        assert metrics.errors[("load", "posts")] == 1
+
+    def test_loads_bytes_with_included(self, schema_class, metrics):
+        data = (
+            b'{"data": {"type": "posts", "id": "1", "attributes": {"title": "Hi"},'
+            b' "relationships": {"author": {"data": {"type": "people", "id": "2"}}}},'
+            b' "included": [{"type": "people", "id": "2",'
+            b' "attributes": {"first_name": "Dan", "last_name": "G"}}]}'
+        )
+        schema_class(include_data=("author",)).loads_bytes(data)
+        assert metrics.documents == {("load", "posts"): 1}
+        assert metrics.included[("load", "people")] == 1
+        assert metrics.linkage[("posts", "author")] == [1, 1, 1]
+        assert metrics.size[("load", "posts")] == len(data)
+
+    def test_included_schemas_do_not_record(self, metrics, post):
+        class MeteredAuthorSchema(AuthorSchema):
+            class Meta(AuthorSchema.Meta):
+                pass
+
+        class PostWithMeteredAuthorSchema(Schema):
+            id = fields.Str()
+            author = fields.Relationship(
+                schema=MeteredAuthorSchema,
+                type_="people",
+                include_resource_linkage=True,
+            )
+
+            class Meta:
+                type_ = "posts"
+
+        MeteredAuthorSchema.opts.metrics = metrics
+        schema = PostWithMeteredAuthorSchema(include_data=("author",))
+        document = schema.dump(post)
+        assert len(document["included"]) == 1
+        document["included"][0]["attributes"]["last_name"] = "G"
+        schema.load(document)
+        assert not metrics.documents
+
+    def test_disabled_by_default(self, post):
+        schema = PostSchema()
+        assert not schema.opts.metrics.enabled
+        assert schema.dump(post)["data"]["id"] == str(post.id)
@@ -0,0 +1,212 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import sys
+
+import pytest
+
+from marshmallow import ValidationError
+
+from marshmallow_jsonapi.exceptions import IncorrectTypeError
+from marshmallow_jsonapi.parallel import dump_parallel, dump_threaded, load_parallel
+from tests.base import AuthorSchema, PostSchema
+
+
+@pytest.fixture(scope="module")
+def executor():
+    with ProcessPoolExecutor(max_workers=2) as executor_:
+        yield executor_
+
+
+@pytest.fixture()
+def many_posts(posts):
+    # Share an included resource across chunks
+    posts[2].author = posts[0].author
+    return posts
+
+
+class TestDumpParallel:
+    @pytest.mark.parametrize(
+        "include_data",
+        [(), ("author",), ("author", "post_comments", "post_comments.author")],
+    )
+    @pytest.mark.parametrize("chunk_size", [1, 2, 100])
+    def test_matches_serial_dump(self, executor, many_posts, include_data, chunk_size):
+        schema = PostSchema(include_data=include_data)
+        expected = PostSchema(include_data=include_data).dump(many_posts, many=True)
+        result = dump_parallel(
+            schema, many_posts, chunk_size=chunk_size, executor=executor
+        )
+        assert result == expected
+
+    def test_sparse_fields(self, executor, many_posts):
+        sparse_fields = {"posts": ["author"], "people": ["last_name"]}
+        schema = PostSchema(include_data=("author",))
+        expected = schema.dump(many_posts, many=True, sparse_fields=sparse_fields)
+        result = dump_parallel(
+            schema, many_posts, sparse_fields=sparse_fields, executor=executor
+        )
+        assert result == expected
+
+    def test_constructor_options(self, executor, authors):
+        schema = AuthorSchema(only=("id", "last_name"), context={"key": "value"})
+        result = dump_parallel(schema, authors, executor=executor)
+        assert result == schema.dump(authors, many=True)
+        assert set(result["data"][0]["attributes"]) == {"last_name"}
+
+    def test_empty(self, executor):
+        assert dump_parallel(AuthorSchema(), [], executor=executor) == AuthorSchema(
+            many=True
+        ).dump([])
+
+    def test_generator_with_own_pool(self, authors):
+        result = dump_parallel(
+            AuthorSchema(), (author for author in authors), max_workers=2
+        )
+        assert result == AuthorSchema(many=True).dump(authors)
+
+    def test_schema_holds_merged_state(self, executor, many_posts):
+        schema = PostSchema(include_data=("author",))
+        result = dump_parallel(schema, many_posts, chunk_size=2, executor=executor)
+        assert list(schema.included_data.values()) == result["included"]
+
+
+def make_authors_document(count):
+    return {
+        "data": [
+            {
+                "type": "people",
+                "attributes": {
+                    "first_name": f"First {i}",
+                    "last_name": f"Last {i}",
+                    "password": "secret",
+                },
+            }
+            for i in range(count)
+        ]
+    }
+
+
+def load_serial(schema, data):
+    try:
+        return schema.load(data, many=True), None
+    except ValidationError as error:
+        return error.valid_data, error.messages
+
+
+class TestLoadParallel:
+    @pytest.mark.parametrize("chunk_size", [1, 2, 100])
+    def test_matches_serial_load(self, executor, chunk_size):
+        data = make_authors_document(5)
+        result = load_parallel(
+            AuthorSchema(), data, chunk_size=chunk_size, executor=executor
+        )
+        assert result == AuthorSchema().load(data, many=True)
+
+    def test_included_resources(self, executor, many_posts):
+        include_data = ("author", "post_comments", "post_comments.author")
+        data = PostSchema(include_data=include_data).dump(many_posts, many=True)
+        for item in data["data"]:
+            del item["id"]
+        result = load_parallel(PostSchema(), data, chunk_size=1, executor=executor)
+        assert result == PostSchema().load(data, many=True)
+        assert result[1]["author"]["first_name"]
+        assert result[1]["comments"][0]["body"]
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 100])
+    def test_error_pointers(self, executor, chunk_size):
+        data = make_authors_document(6)
+        del data["data"][1]["attributes"]["last_name"]
+        data["data"][4]["attributes"]["password"] = "short"
+        data["data"][5]["attributes"]["first_name"] = None
+        expected_data, expected_errors = load_serial(AuthorSchema(), data)
+        with pytest.raises(ValidationError) as excinfo:
+            load_parallel(
+                AuthorSchema(), data, chunk_size=chunk_size, executor=executor
+            )
+        assert excinfo.value.messages == expected_errors
+        assert excinfo.value.valid_data == expected_data
+        pointers = [each["source"]["pointer"] for each in expected_errors["errors"]]
+        assert "/data/4/attributes/password" in pointers
+
+    def test_document_errors(self, executor):
+        data = make_authors_document(6)
+        data["data"][1]["attributes"]["password"] = "short"
+        del data["data"][4]["type"]
+        _, expected_errors = load_serial(AuthorSchema(), data)
+        with pytest.raises(ValidationError) as excinfo:
+            load_parallel(AuthorSchema(), data, chunk_size=2, executor=executor)
+        assert excinfo.value.messages == expected_errors
+
+    @pytest.mark.parametrize("data", [{}, {"data": {"type": "people"}}])
+    def test_invalid_document(self, executor, data):
+        _, expected_errors = load_serial(AuthorSchema(), data)
+        with pytest.raises(ValidationError) as excinfo:
+            load_parallel(AuthorSchema(), data, executor=executor)
+        assert excinfo.value.messages == expected_errors
+
+    def test_incorrect_type(self, executor):
+        data = make_authors_document(4)
+        data["data"][3]["type"] = "posts"
+        with pytest.raises(IncorrectTypeError):
+            load_parallel(AuthorSchema(), data, chunk_size=2, executor=executor)
+
+
+class TestDumpThreaded:
+    @pytest.mark.parametrize(
+        "include_data",
+        [(), ("author",), ("author", "post_comments", "post_comments.author")],
+    )
+    @pytest.mark.parametrize("chunk_size", [1, 2, 100])
+    def test_matches_serial_dump(self, many_posts, include_data, chunk_size):
+        schema = PostSchema(include_data=include_data)
+        expected = PostSchema(include_data=include_data).dump(many_posts, many=True)
+        result = dump_threaded(schema, many_posts, chunk_size=chunk_size)
+        assert result == expected
+
+    def test_sparse_fields(self, many_posts):
+        sparse_fields = {"posts": ["author"], "people": ["last_name"]}
+        schema = PostSchema(include_data=("author",))
+        expected = schema.dump(many_posts, many=True, sparse_fields=sparse_fields)
+        result = dump_threaded(
+            schema, many_posts, sparse_fields=sparse_fields, max_workers=2
+        )
+        assert result == expected
+
+    def test_schema_is_not_modified(self, many_posts):
+        schema = PostSchema(include_data=("author",))
+        with ThreadPoolExecutor(2) as executor:
+            dump_threaded(schema, many_posts, chunk_size=1, executor=executor)
+        assert schema.included_data == {}
+        assert schema.fields["post_comments"].include_data is False
+
+    def test_stress_shared_schemas(self, posts, authors):
+        # Switch threads as often as possible to surface races
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            schemas = [
+                (PostSchema(include_data=("author",)), posts),
+                (
+                    PostSchema(include_data=("post_comments.author",)),
+                    posts,
+                ),
+                (AuthorSchema(), authors),
+            ]
+            expected = [
+                schema.__class__(include_data=schema.include_data).dump(objs, many=True)
+                for schema, objs in schemas
+            ]
+
+            def run(index):
+                schema, objs = schemas[index % len(schemas)]
+                with ThreadPoolExecutor(4) as executor:
+                    for _ in range(10):
+                        result = dump_threaded(
+                            schema, objs, chunk_size=1, executor=executor
+                        )
+                        assert result == expected[index % len(schemas)]
+                return True
+
+            with ThreadPoolExecutor(16) as pool:
+                assert all(pool.map(run, range(48)))
+        finally:
+            sys.setswitchinterval(switch_interval)
@@ -0,0 +1,92 @@
+import pytest
+
+from marshmallow_jsonapi.exceptions import InvalidQueryParameterError
+from marshmallow_jsonapi.query import QueryParams, QueryParser
+from tests.base import PostSchema
+
+
+@pytest.fixture()
+def parser():
+    return QueryParser(PostSchema)
+
+
+class TestQueryParser:
+    def test_include(self, parser):
+        query = parser.parse("include=author,post-comments.author")
+        assert query.include == ("author", "post_comments.author")
+
+    def test_include_is_usable_as_include_data(self, parser, post):
+        query = parser.parse("include=post-comments.author")
+        data = PostSchema(include_data=query.include).dump(post)
+        assert len(data["included"]) == 4
+
+    def test_fields(self, parser):
+        query = parser.parse("fields[posts]=title,author&fields[people]=first_name")
+        assert query.fields == {"posts": ("title", "author"), "people": ("first_name",)}
+
+    def test_fields_are_usable_as_sparse_fields(self, parser, post):
+        query = parser.parse("include=author&fields[people]=twitter")
+        data = PostSchema(include_data=query.include).dump(
+            post, sparse_fields=query.fields
+        )
+        assert data["included"][0]["attributes"] == {"twitter": post.author.twitter}
+
+    def test_empty_fieldset(self, parser):
+        assert parser.parse("fields[posts]=").fields == {"posts": ()}
+
+    def test_sort(self, parser):
+        query = parser.parse("sort=-title,author.last_name")
+        assert query.sort == ("-title", "author.last_name")
+
+    def test_page_and_filter(self, parser):
+        query = parser.parse("page[number]=2&page[size]=10&filter[title]=Hello")
+        assert query.page == {"number": "2", "size": "10"}
+        assert query.filter == {"title": "Hello"}
+
+    def test_percent_encoded_bytes(self, parser):
+        query = parser.parse(b"fields%5Bposts%5D=title&include=author")
+        assert query.fields == {"posts": ("title",)}
+        assert query.include == ("author",)
+
+    def test_unrelated_parameters_are_ignored(self, parser):
+        assert parser.parse("foo=bar&baz[qux]=1") == QueryParams()
+
+    @pytest.mark.parametrize(
+        ("query_string", "parameter"),
+        [
+            ("include=unknown", "include"),
+            ("include=title", "include"),
+            ("include=author.unknown", "include"),
+            ("fields[unknown]=title", "fields[unknown]"),
+            ("fields[posts]=unknown", "fields[posts]"),
+            ("sort=unknown", "sort"),
+            ("sort=author", "sort"),
+            ("sort=title.length", "sort"),
+        ],
+    )
+    def test_invalid_parameters(self, parser, query_string, parameter):
+        with pytest.raises(InvalidQueryParameterError) as excinfo:
+            parser.parse(query_string)
+        error = excinfo.value.messages["errors"][0]
+        assert error["source"] == {"parameter": parameter}
+
+    def test_results_are_cached(self, parser):
+        first = parser.parse("include=author")
+        second = parser.parse("include=author")
+        assert first is second
+        info = parser.cache_info()
+        assert info.hits == 1
+        assert info.misses == 1
+
+    def test_lru_eviction(self):
+        parser = QueryParser(PostSchema, maxsize=1)
+        first = parser.parse("include=author")
+        parser.parse("sort=title")
+        assert parser.parse("include=author") is not first
+
+    def test_query_params_are_immutable(self, parser):
+        query = parser.parse("include=author")
+        with pytest.raises(AttributeError):
+            query.include = ()
+        with pytest.raises(TypeError):
+            query.fields["posts"] = ("title",)
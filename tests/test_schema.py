@@ -1,3 +1,7 @@
+import copy
+import pickle
+import sqlite3
+
 import pytest
 import marshmallow as ma
 from marshmallow import ValidationError, INCLUDE
@@ -43,6 +47,39 @@ def test_id_field_is_required():
     assert excinfo.value.args[0] == "Must have an `id` field"
 
 
+def test_definition_is_validated_once():
+    class BadSchema(Schema):
+        class Meta:
+            type_ = "users"
+
+    assert BadSchema._definition_error == "Must have an `id` field"
+    assert AuthorSchema._definition_error is None
+
+
+def test_id_field_inferred_from_fields_option():
+    class InferredSchema(Schema):
+        class Meta:
+            type_ = "users"
+            fields = ("id", "name")
+
+    data = InferredSchema().dump({"id": 1, "name": "Dan"})
+    assert data["data"] == {"type": "users", "id": 1, "attributes": {"name": "Dan"}}
+
+    class MissingIdSchema(Schema):
+        class Meta:
+            type_ = "users"
+            fields = ("name",)
+
+    with pytest.raises(ValueError, match="Must have an `id` field"):
+        MissingIdSchema()
+
+
+def test_id_field_cannot_be_excluded():
+    with pytest.raises(ValueError) as excinfo:
+        AuthorSchema(exclude=("id",))
+    assert excinfo.value.args[0] == "Must have an `id` field"
+
+
 class TestResponseFormatting:
     def test_dump_single(self, author):
         data = AuthorSchema().dump(author)
@@ -150,6 +187,26 @@ class TestCompoundDocuments:
         }
         assert included_comments_author_ids == expected_comments_author_ids
 
+    def test_include_to_many_generator(self, post):
+        expected = PostSchema(include_data=("post_comments",)).dump(post)
+        post.comments = (comment for comment in post.comments)
+        data = PostSchema(include_data=("post_comments",)).dump(post)
+        assert data == expected
+
+    def test_include_to_many_iterates_once(self, post):
+        class OneShot:
+            def __init__(self, items):
+                self.items = items
+                self.iterations = 0
+
+            def __iter__(self):
+                self.iterations += 1
+                return iter(self.items)
+
+        post.comments = OneShot(post.comments)
+        PostSchema(include_data=("post_comments",)).dump(post)
+        assert post.comments.iterations == 1
+
     def test_include_no_data(self, post):
         data = PostSchema(include_data=()).dump(post)
         assert "included" not in data
@@ -355,6 +412,631 @@ class TestCompoundDocuments:
                 assert included["attributes"]["from_context"] == "Hello World"
 
 
+class TestSparseFieldsets:
+    def test_primary_data(self, post):
+        data = PostSchema().dump(post, sparse_fields={"posts": ["title"]})
+        assert data["data"]["id"] == str(post.id)
+        assert data["data"]["attributes"] == {"title": post.title}
+        assert "relationships" not in data["data"]
+
+    def test_relationship_member_name(self, post):
+        data = PostSchema().dump(post, sparse_fields={"posts": ["post-comments"]})
+        assert "attributes" not in data["data"]
+        assert list(data["data"]["relationships"]) == ["post-comments"]
+
+    def test_comma_separated_string(self, post):
+        data = PostSchema().dump(post, sparse_fields={"posts": "title,author"})
+        assert data["data"]["attributes"] == {"title": post.title}
+        assert list(data["data"]["relationships"]) == ["author"]
+
+    def test_included_resources(self, post):
+        schema = PostSchema(include_data=("author", "post_comments"))
+        data = schema.dump(
+            post, sparse_fields={"people": ["first_name"], "comments": []}
+        )
+        for included in data["included"]:
+            if included["type"] == "people":
+                assert included["attributes"] == {"first_name": post.author.first_name}
+            else:
+                assert "attributes" not in included
+                assert "relationships" not in included
+
+    def test_included_relationship_outside_fieldset(self, post):
+        schema = PostSchema(include_data=("author",))
+        data = schema.dump(post, sparse_fields={"posts": ["title"]})
+        assert data["data"]["attributes"] == {"title": post.title}
+        assert "relationships" not in data["data"]
+        assert [item["id"] for item in data["included"]] == [str(post.author.id)]
+
+    def test_unknown_names_are_not_cached(self, post):
+        schema = PostSchema()
+        for name in ("a", "b", "c"):
+            schema.dump(post, sparse_fields={"posts": ["title", name]})
+        assert len(schema._sparse_dump_fields) == 1
+
+    def test_excluded_fields_are_not_serialized(self, author):
+        class AuthorMethodSchema(Schema):
+            id = fields.Str()
+            first_name = fields.Str()
+            expensive = fields.Method("get_expensive")
+
+            def get_expensive(self, obj):
+                raise AssertionError("should not be serialized")
+
+            class Meta:
+                type_ = "people"
+
+        data = AuthorMethodSchema().dump(
+            author, sparse_fields={"people": ["first_name"]}
+        )
+        assert data["data"]["attributes"] == {"first_name": author.first_name}
+
+    def test_fieldsets_apply_per_dump(self, post):
+        schema = PostSchema()
+        sparse = schema.dump(post, sparse_fields={"posts": ["title"]})
+        full = schema.dump(post)
+        assert "relationships" not in sparse["data"]
+        assert "relationships" in full["data"]
+
+    def test_included_data_is_reset_between_dumps(self, posts):
+        schema = PostSchema(include_data=("author",))
+        schema.dump(posts[0])
+        data = schema.dump(posts[1])
+        assert len(data["included"]) == 1
+        assert data["included"][0]["id"] == str(posts[1].author.id)
+
+
+class TestComputeEtag:
+    class VersionedAuthorSchema(AuthorSchema):
+        class Meta(AuthorSchema.Meta):
+            version_attribute = "version"
+
+    class VersionedPostSchema(Schema):
+        id = fields.Str()
+        title = fields.Str()
+        author = fields.Relationship(
+            schema="VersionedAuthorSchema", type_="people", many=False
+        )
+        post_comments = fields.Relationship(
+            attribute="comments", schema="CommentSchema", type_="comments", many=True
+        )
+
+        class Meta:
+            type_ = "posts"
+            version_attribute = "version"
+
+    @pytest.fixture()
+    def post(self, post):
+        post.version = 1
+        post.author.version = 1
+        return post
+
+    def test_etag_is_stable(self, post):
+        schema = self.VersionedPostSchema()
+        assert schema.compute_etag(post) == self.VersionedPostSchema().compute_etag(
+            post
+        )
+
+    def test_etag_changes_with_version(self, post):
+        schema = self.VersionedPostSchema()
+        etag = schema.compute_etag(post)
+        post.version = 2
+        assert schema.compute_etag(post) != etag
+
+    def test_etag_depends_on_document_shape(self, post):
+        schema = self.VersionedPostSchema()
+        etags = {
+            schema.compute_etag(post),
+            schema.compute_etag(post, sparse_fields={"posts": ["title"]}),
+            schema.compute_etag([post], many=True),
+            self.VersionedPostSchema(include_data=("author",)).compute_etag(post),
+        }
+        assert len(etags) == 4
+
+    def test_etag_covers_included_resources(self, post):
+        schema = self.VersionedPostSchema(include_data=("author",))
+        etag = schema.compute_etag(post)
+        post.author.version = 2
+        assert schema.compute_etag(post) != etag
+
+    def test_etag_covers_linkage_of_relationships(self, post):
+        class LinkedPostSchema(self.VersionedPostSchema):
+            author = fields.Relationship(
+                type_="people", include_resource_linkage=True, many=False
+            )
+
+        schema = LinkedPostSchema()
+        sparse_fields = {"posts": ["title"]}
+        etag = schema.compute_etag(post)
+        sparse_etag = schema.compute_etag(post, sparse_fields=sparse_fields)
+        post.author.id += 1
+        assert schema.compute_etag(post) != etag
+        assert schema.compute_etag(post, sparse_fields=sparse_fields) == sparse_etag
+
+    def test_etag_covers_document_meta(self, post):
+        class MetaPostSchema(self.VersionedPostSchema):
+            meta = fields.DocumentMeta()
+
+        post.meta = {"total": 1}
+        schema = MetaPostSchema()
+        etag = schema.compute_etag(post)
+        post.meta = {"total": 2}
+        assert schema.compute_etag(post) != etag
+
+    def test_etag_uses_sparse_fields_of_included_resources(self, post):
+        class LinkedAuthorSchema(self.VersionedAuthorSchema):
+            posts = fields.Relationship(
+                type_="posts", include_resource_linkage=True, many=True
+            )
+
+        class PostWithAuthorSchema(self.VersionedPostSchema):
+            author = fields.Relationship(
+                schema=LinkedAuthorSchema, type_="people", many=False
+            )
+
+        post.author.posts = [post]
+        schema = PostWithAuthorSchema(include_data=("author",))
+        sparse_fields = {"people": ["first_name"]}
+        etag = schema.compute_etag(post, sparse_fields=sparse_fields)
+        post.author.posts = []
+        assert schema.compute_etag(post, sparse_fields=sparse_fields) == etag
+        assert schema.compute_etag(post) != schema.compute_etag(
+            post, sparse_fields=sparse_fields
+        )
+
+    def test_etag_requires_versions(self, post):
+        assert AuthorSchema().compute_etag(post.author) is None
+        schema = self.VersionedPostSchema(include_data=("post_comments",))
+        assert schema.compute_etag(post) is None
+
+
+class TestDerive:
+    def test_matches_instantiation(self, post):
+        prototype = PostSchema()
+        for include_data in [(), ("author",), ("post_comments.author",)]:
+            derived = prototype.derive(include_data=include_data)
+            assert derived.dump(post) == PostSchema(include_data=include_data).dump(
+                post
+            )
+
+    def test_many(self, posts):
+        derived = PostSchema().derive(many=True)
+        assert derived.many is True
+        assert derived.dump(posts) == PostSchema(many=True).dump(posts)
+
+    def test_prototype_is_unchanged(self, post):
+        prototype = PostSchema()
+        expected = prototype.dump(post)
+        prototype.derive(include_data=("post_comments.author",)).dump(post)
+        assert prototype.dump(post) == expected
+        assert prototype.fields["post_comments"].include_data is False
+
+    def test_derived_schemas_are_independent(self, post):
+        prototype = PostSchema(include_data=("author",))
+        first = prototype.derive(include_data=("post_comments",))
+        second = prototype.derive(include_data=())
+        assert "included" in first.dump(post)
+        assert "included" not in second.dump(post)
+        assert first.fields["author"].include_data is False
+        assert prototype.fields["author"].include_data is True
+
+    def test_fields_are_bound_to_the_copy(self):
+        prototype = PostSchema()
+        derived = prototype.derive(context={"key": "value"})
+        for field in derived.fields.values():
+            assert field.parent is derived
+            assert field.root is derived
+        assert derived.fields["author"].context == {"key": "value"}
+        assert prototype.context == {}
+
+    def test_nested_schemas_are_derived(self, post):
+        prototype = PostSchema(include_data=("author",))
+        prototype.dump(post)
+        derived = prototype.derive(context={"key": "value"})
+        assert derived.fields["author"].schema is not prototype.fields["author"].schema
+        assert derived.fields["author"].schema.context == {"key": "value"}
+
+    def test_recursive_relationship(self, post):
+        class RecursivePostSchema(Schema):
+            id = fields.Str()
+            parent = fields.Relationship(
+                schema="self", type_="posts", include_resource_linkage=True
+            )
+
+            class Meta:
+                type_ = "posts"
+
+        post.parent = None
+        prototype = RecursivePostSchema()
+        derived = prototype.derive(include_data=("parent",))
+        expected = RecursivePostSchema(include_data=("parent",)).dump(post)
+        assert derived.dump(post) == expected
+
+
+class LinkedPostSchema(Schema):
+    id = fields.Integer()
+    title = fields.Str()
+    views = fields.Integer(default=0)
+    author = fields.Relationship(
+        "/authors/{author_id}",
+        related_url_kwargs={"author_id": "<author.id>"},
+        type_="people",
+        include_resource_linkage=True,
+    )
+    comments = fields.Relationship(
+        "/posts/{id}/comments/",
+        related_url_kwargs={"id": "<id>"},
+        many=True,
+        type_="comments",
+        include_resource_linkage=True,
+    )
+    keywords = fields.Relationship(
+        "/posts/{id}/keywords/", related_url_kwargs={"id": "<id>"}
+    )
+
+    class Meta:
+        type_ = "posts"
+        self_url = "/posts/{id}"
+        self_url_kwargs = {"id": "<id>"}
+        self_url_many = "/posts/"
+
+
+class TestDumpColumns:
+    @pytest.fixture()
+    def columns(self, posts):
+        return {
+            "id": [post.id for post in posts],
+            "title": [post.title for post in posts],
+            "author.id": [post.author.id for post in posts],
+        }
+
+    @pytest.fixture()
+    def relationships(self, posts):
+        return {
+            "author": [post.author.id for post in posts],
+            "comments": [[comment.id for comment in post.comments] for post in posts],
+        }
+
+    def test_matches_dump(self, posts, columns, relationships):
+        schema = LinkedPostSchema(many=True)
+        result = schema.dump_columns(columns, relationships=relationships)
+        assert result == schema.dump(posts)
+
+    def test_sparse_fields(self, posts, columns, relationships):
+        schema = LinkedPostSchema(many=True)
+        sparse_fields = {"posts": ["title", "comments"]}
+        result = schema.dump_columns(
+            columns, relationships=relationships, sparse_fields=sparse_fields
+        )
+        assert result == schema.dump(posts, sparse_fields=sparse_fields)
+        assert set(result["data"][0]["relationships"]) == {"comments"}
+
+    def test_null_relationships(self, columns, relationships):
+        relationships["author"][0] = None
+        relationships["comments"][0] = None
+        result = LinkedPostSchema().dump_columns(columns, relationships=relationships)
+        relationships = result["data"][0]["relationships"]
+        assert relationships["author"]["data"] is None
+        assert relationships["comments"]["data"] == []
+
+    def test_missing_columns(self, columns):
+        del columns["title"]
+        result = LinkedPostSchema().dump_columns(columns)
+        item = result["data"][0]
+        assert item["attributes"] == {"views": 0}
+        # Relationships with resource linkage need an id column
+        assert set(item["relationships"]) == {"keywords"}
+        assert item["relationships"]["keywords"]["links"] == {
+            "related": f"/posts/{columns['id'][0]}/keywords/"
+        }
+
+    def test_method_fields_are_left_out(self, columns):
+        class MethodSchema(Schema):
+            id = fields.Str()
+            title = fields.Str()
+            upper = fields.Method("get_upper")
+
+            def get_upper(self, obj):
+                return obj.title.upper()
+
+            class Meta:
+                type_ = "posts"
+
+        result = MethodSchema().dump_columns(columns)
+        assert set(result["data"][0]["attributes"]) == {"title"}
+
+    def test_post_dump_processors(self, columns):
+        class ProcessedSchema(LinkedPostSchema):
+            @ma.post_dump
+            def upper_title(self, data, **kwargs):
+                data["title"] = data["title"].upper()
+                return data
+
+        result = ProcessedSchema().dump_columns(columns)
+        assert result["data"][0]["attributes"]["title"] == columns["title"][0].upper()
+
+    def test_errors(self, columns, relationships):
+        with pytest.raises(ValueError, match="Missing the 'id' column"):
+            LinkedPostSchema().dump_columns({"title": columns["title"]})
+        with pytest.raises(ValueError, match="'title' has a different length"):
+            LinkedPostSchema().dump_columns({**columns, "title": ["Title"]})
+        with pytest.raises(AttributeError, match="'author.id' is not a valid column"):
+            LinkedPostSchema().dump_columns(
+                {"id": columns["id"]}, relationships=relationships
+            )
+        with pytest.raises(ValueError, match="Included data"):
+            PostSchema(include_data=("author",)).dump_columns(columns)
+
+
+class TestDumpIdentifiers:
+    def test_many(self, posts):
+        result = LinkedPostSchema().dump_identifiers(posts, many=True)
+        expected = LinkedPostSchema(many=True).dump(posts)["data"]
+        assert result == {
+            "data": [{"type": item["type"], "id": str(item["id"])} for item in expected]
+        }
+        result = LinkedPostSchema().dump_identifiers([None, posts[0]], many=True)
+        assert result["data"] == [{"type": "posts", "id": str(posts[0].id)}]
+
+    def test_single(self, post):
+        result = AuthorSchema().dump_identifiers(post.author)
+        assert result == {"data": {"type": "people", "id": str(post.author.id)}}
+        assert AuthorSchema().dump_identifiers(None) == {"data": None}
+
+    def test_matches_dump_relationship(self, post):
+        expected = LinkedPostSchema().dump_relationship(post, "comments")
+        result = CommentSchema().dump_identifiers(
+            post.comments, many=True, links=expected["links"]
+        )
+        assert result == expected
+        expected = LinkedPostSchema().dump_relationship(post, "author")
+        result = AuthorSchema().dump_identifiers(post.author, links=expected["links"])
+        assert result == expected
+
+    def test_ids_are_strings(self):
+        result = IntegerIdSchema().dump_identifiers([{"id": 1}, {"id": 2}], many=True)
+        assert [item["id"] for item in result["data"]] == ["1", "2"]
+
+    def test_only_reads_ids(self, post):
+        class StrictSchema(Schema):
+            id = fields.Str()
+            title = fields.Method("get_title")
+
+            def get_title(self, obj):
+                raise AssertionError("Fields other than id are not serialized")
+
+            class Meta:
+                type_ = "posts"
+
+        assert StrictSchema().dump_identifiers(post)["data"]["id"] == str(post.id)
+
+
+class TestDumpRelationship:
+    @pytest.mark.parametrize("name", ["author", "comments"])
+    def test_matches_dump(self, post, name):
+        schema = LinkedPostSchema()
+        expected = schema.dump(post)["data"]["relationships"][name]
+        assert schema.dump_relationship(post, name) == expected
+
+    def test_null_values(self, post):
+        post.author = None
+        post.comments = None
+        assert LinkedPostSchema().dump_relationship(post, "comments")["data"] == []
+        assert PostSchema().dump_relationship(post, "author") == {
+            "data": None,
+            "links": {"related": f"http://test.test/posts/{post.id}/author/"},
+        }
+
+    def test_only_reads_linkage(self, post):
+        class StrictSchema(LinkedPostSchema):
+            title = fields.Method("get_title")
+
+            def get_title(self, obj):
+                raise AssertionError("Fields are not serialized")
+
+        result = StrictSchema().dump_relationship(post, "comments")
+        assert len(result["data"]) == len(post.comments)
+
+    def test_invalid_relationship(self, post):
+        with pytest.raises(ValueError, match='Unknown relationship "title"'):
+            LinkedPostSchema().dump_relationship(post, "title")
+        with pytest.raises(ValueError, match="requires the type_ argument"):
+            LinkedPostSchema().dump_relationship(post, "keywords")
+
+
+class IntegerIdSchema(Schema):
+    id = fields.Integer()
+
+    class Meta:
+        type_ = "comments"
+
+
+class PostLinkageSchema(Schema):
+    id = fields.Str()
+    comments = fields.Relationship(schema=IntegerIdSchema, many=True, type_="comments")
+    author = fields.Relationship(type_="people")
+
+    class Meta:
+        type_ = "posts"
+
+
+class TestLoadRelationship:
+    def get_pointers(self, excinfo):
+        return [
+            (error["source"]["pointer"], error["detail"])
+            for error in excinfo.value.messages["errors"]
+        ]
+
+    def test_to_many(self):
+        data = {"data": [{"type": "comments", "id": str(i)} for i in range(1000)]}
+        result = PostLinkageSchema().load_relationship("comments", data)
+        assert result == list(range(1000))
+        assert PostLinkageSchema().load_relationship("comments", {"data": []}) == []
+
+    def test_to_one(self):
+        schema = PostLinkageSchema()
+        data = {"data": {"type": "people", "id": "1"}}
+        assert schema.load_relationship("author", data) == "1"
+        assert schema.load_relationship("author", {"data": None}) is None
+
+    def test_errors_point_to_identifiers(self):
+        data = {
+            "data": [
+                {"type": "comments", "id": "1"},
+                {"type": "comments"},
+                {"type": "posts", "id": "3"},
+                {"type": "comments", "id": "x"},
+                {"type": "comments", "id": 1},
+                "5",
+                {"type": "comments", "id": "6"},
+            ]
+        }
+        with pytest.raises(ValidationError) as excinfo:
+            PostLinkageSchema().load_relationship("comments", data)
+        assert self.get_pointers(excinfo) == [
+            ("/data/1", "Must have an `id` field"),
+            ("/data/2/type", "Invalid `type` specified"),
+            ("/data/3/id", "Not a valid integer."),
+            ("/data/4", "Duplicate of the resource identifier at index 0"),
+            ("/data/5", "Resource identifier must be an object"),
+        ]
+        assert excinfo.value.valid_data == [1, 6]
+
+    def test_null_id(self):
+        data = {"data": [{"type": "comments", "id": None}]}
+        with pytest.raises(ValidationError) as excinfo:
+            PostLinkageSchema().load_relationship("comments", data)
+        assert self.get_pointers(excinfo) == [("/data/0/id", "Field may not be null.")]
+
+    def test_id_validators(self):
+        class ValidatedIdSchema(Schema):
+            id = fields.Integer(validate=ma.validate.Range(min=1))
+
+            class Meta:
+                type_ = "comments"
+
+        class ValidatedPostSchema(PostLinkageSchema):
+            comments = fields.Relationship(
+                schema=ValidatedIdSchema, many=True, type_="comments"
+            )
+
+        data = {"data": [{"type": "comments", "id": "0"}]}
+        with pytest.raises(ValidationError) as excinfo:
+            ValidatedPostSchema().load_relationship("comments", data)
+        assert [pointer for pointer, _ in self.get_pointers(excinfo)] == ["/data/0/id"]
+
+    @pytest.mark.parametrize(
+        ("name", "data", "expected"),
+        [
+            ("comments", {"data": {"type": "comments", "id": "1"}}, "/data"),
+            ("author", {"data": [{"type": "people", "id": "1"}]}, "/data"),
+            ("author", {"data": {"id": "1"}}, "/data"),
+            ("author", {}, "/"),
+            ("author", [], "/"),
+        ],
+    )
+    def test_invalid_documents(self, name, data, expected):
+        with pytest.raises(ValidationError) as excinfo:
+            PostLinkageSchema().load_relationship(name, data)
+        assert [pointer for pointer, _ in self.get_pointers(excinfo)] == [expected]
+
+    def test_unknown_relationship(self):
+        with pytest.raises(ValueError, match='Unknown relationship "id"'):
+            PostLinkageSchema().load_relationship("id", {"data": []})
+
+
+class TestIterDumpsRows:
+    @pytest.fixture()
+    def connection(self, posts):
+        connection = sqlite3.connect(":memory:")
+        connection.execute("CREATE TABLE posts (id, title, author_id)")
+        connection.executemany(
+            "INSERT INTO posts VALUES (?, ?, ?)",
+            [(post.id, post.title, post.author.id) for post in posts],
+        )
+        yield connection
+        connection.close()
+
+    @pytest.fixture()
+    def cursor(self, connection):
+        return connection.execute(
+            'SELECT id, title, author_id AS "author.id", author_id FROM posts'
+            " ORDER BY rowid"
+        )
+
+    def test_matches_dump(self, posts, cursor):
+        schema = LinkedPostSchema(many=True, exclude=("comments",))
+        chunks = schema.iter_dumps_rows(
+            cursor, relationships={"author": "author_id"}, batch_size=2
+        )
+        assert b"".join(chunks) == schema.dumps_bytes(posts)
+
+    def test_fetches_lazily(self, cursor):
+        fetches = []
+
+        class Cursor:
+            description = cursor.description
+
+            def fetchmany(self, size):
+                rows = cursor.fetchmany(size)
+                fetches.append(len(rows))
+                return rows
+
+        schema = LinkedPostSchema(many=True, exclude=("comments",))
+        chunks = schema.iter_dumps_rows(
+            Cursor(), relationships={"author": "author_id"}, batch_size=2
+        )
+        next(chunks)
+        assert fetches == []
+        next(chunks)
+        assert fetches == [2]
+        list(chunks)
+        assert fetches == [2, 1, 0]
+
+    def test_missing_relationship_column(self, cursor):
+        schema = LinkedPostSchema(many=True)
+        with pytest.raises(ValueError, match="Missing the 'post_id' column"):
+            next(schema.iter_dumps_rows(cursor, relationships={"author": "post_id"}))
+
+
+class TestPickle:
+    def test_roundtrip(self, post):
+        schema = PostSchema(include_data=("author",), context={"key": "value"})
+        expected = schema.dump(post)
+        unpickled = pickle.loads(pickle.dumps(schema))
+        assert unpickled.__class__ is PostSchema
+        assert unpickled.context == {"key": "value"}
+        assert unpickled.include_data == ("author",)
+        assert unpickled.dump(post) == expected
+
+    def test_per_call_state_is_not_sent(self, post):
+        schema = PostSchema(include_data=("post_comments.author",))
+        schema.dump(post)
+        unpickled = pickle.loads(pickle.dumps(schema))
+        assert unpickled.included_data == {}
+        assert len(pickle.dumps(schema)) < 500
+
+    def test_constructor_arguments(self, authors):
+        schema = AuthorSchema(many=True, only=("id", "last_name"))
+        unpickled = pickle.loads(pickle.dumps(schema))
+        assert unpickled.many is True
+        assert unpickled.dump(authors) == schema.dump(authors)
+
+    def test_derived_schema(self, post):
+        schema = PostSchema().derive(include_data=("author",))
+        unpickled = pickle.loads(pickle.dumps(schema))
+        assert unpickled.dump(post) == schema.dump(post)
+
+    def test_options(self):
+        opts = pickle.loads(pickle.dumps(PostSchema.opts))
+        assert opts.__class__ is PostSchema.opts.__class__
+        assert opts.type_ == "posts"
+
+    def test_copy_is_shallow(self):
+        schema = PostSchema()
+        assert copy.copy(schema).fields is schema.fields
+
+
 def get_error_by_field(errors, field):
     for err in errors["errors"]:
         # Relationship error pointers won't match with this.
@@ -0,0 +1,136 @@
+import pytest
+from flask import Flask
+
+from marshmallow_jsonapi import Schema, fields, flask
+from marshmallow_jsonapi.tracing import AccessTrace, eager_load_plan
+from tests.base import AuthorSchema, Post, PostSchema
+
+
+class CommentWithPostSchema(Schema):
+    id = fields.Str()
+    body = fields.Str()
+    author_name = fields.Str(attribute="author.first_name")
+    post = fields.Relationship(
+        "/posts/{post_id}/",
+        related_url_kwargs={"post_id": "<post.id>"},
+    )
+    author = fields.Relationship(
+        schema=AuthorSchema, type_="people", include_resource_linkage=True
+    )
+
+    class Meta:
+        type_ = "comments"
+
+
+class TestTraceAccess:
+    def test_paths(self, posts):
+        schema = PostSchema(many=True, include_data=("author", "post_comments"))
+        with schema.trace_access() as trace:
+            schema.dump(posts)
+        assert isinstance(trace, AccessTrace)
+        paths = trace.paths
+        assert paths["title"] == 3
+        assert paths["author"] == 3
+        # Linkage and link parameters of the included author
+        assert paths["author.id"] >= 3
+        assert paths["author.first_name"] == 3
+        comments = sum(len(post.comments) for post in posts)
+        assert paths["comments.body"] == comments
+        assert "comments.author" not in paths
+        assert "keywords" not in paths
+
+    def test_link_parameters_and_linkage(self, comments):
+        schema = CommentWithPostSchema()
+        comment = comments[0]
+        comment.post = Post(id=1)
+        with schema.trace_access() as trace:
+            schema.dump(comment)
+        assert trace.paths["post.id"] == 1
+        assert trace.paths["author.first_name"] == 1
+        assert trace.paths["author.id"] == 1
+        # Neither linkage nor included data reads the post
+        assert "post" not in trace.paths
+
+    def test_with_instrumentation(self, post):
+        schema = PostSchema(include_data=("author",))
+        with schema.trace_access() as trace, schema.profile_fields() as profiler:
+            schema.dump(post)
+        assert trace.paths["author"] == 1
+        assert profiler.stats[(PostSchema, "author", "serialize")][0] == 1
+        assert "get_value" not in vars(schema.fields["author"])
+
+    def test_restores_methods(self, post):
+        schema = PostSchema(include_data=("author",))
+        expected = schema.dump(post)
+        with schema.trace_access(lambda path: None):
+            assert schema.dump(post) == expected
+        assert "get_value" not in vars(schema.fields["post_title"])
+        assert "_get_id" not in vars(schema.fields["author"])
+        assert "get_value" not in vars(schema.fields["author"].schema.fields["id"])
+
+
+class TestEagerLoadPlan:
+    def test_include_data(self):
+        schema = PostSchema(include_data=("author", "post_comments.author"))
+        assert eager_load_plan(schema) == ["author", "comments", "comments.author"]
+
+    def test_schema_class(self):
+        assert eager_load_plan(PostSchema) == []
+        assert eager_load_plan(PostSchema, ["post_comments"]) == ["comments"]
+
+    def test_include_overrides_include_data(self):
+        schema = PostSchema(include_data=("author",))
+        assert eager_load_plan(schema, ()) == []
+
+    def test_links_linkage_and_dotted_attributes(self):
+        assert eager_load_plan(CommentWithPostSchema) == ["author", "post"]
+
+    def test_nested_links(self):
+        class PostWithCommentsSchema(Schema):
+            id = fields.Str()
+            comments = fields.Relationship(
+                schema=CommentWithPostSchema, many=True, type_="comments"
+            )
+
+            class Meta:
+                type_ = "posts"
+
+        assert eager_load_plan(PostWithCommentsSchema, ["comments"]) == [
+            "comments",
+            "comments.author",
+            "comments.post",
+        ]
+
+
+class FlaskPostSchema(flask.Schema):
+    id = fields.Str()
+    title = fields.Str()
+    author = flask.Relationship(
+        related_view="author_detail", related_view_kwargs={"author_id": "<author.id>"}
+    )
+
+    class Meta:
+        type_ = "posts"
+
+
+class TestFlaskRelationship:
+    @pytest.fixture()
+    def app(self):
+        app = Flask("testapp")
+
+        @app.route("/authors/<int:author_id>")
+        def author_detail(author_id):
+            return ""
+
+        with app.test_request_context():
+            yield app
+
+    def test_eager_load_plan(self):
+        assert eager_load_plan(FlaskPostSchema) == ["author"]
+
+    def test_trace_access(self, app, post):
+        schema = FlaskPostSchema()
+        with schema.trace_access() as trace:
+            data = schema.dump(post)
+        assert data["data"]["relationships"]["author"]["links"]["related"]
+        assert trace.paths["author.id"] == 1
@@ -0,0 +1,103 @@
+from marshmallow_jsonapi import Schema, fields, warm_up
+from tests.base import AuthorSchema, CommentSchema, KeywordSchema, PostSchema
+
+
+def dasherize(text):
+    return text.replace("_", "-")
+
+
+class WarmUpAuthorSchema(Schema):
+    id = fields.Str()
+    first_name = fields.Str()
+
+    class Meta:
+        type_ = "people"
+        inflect = dasherize
+
+
+class WarmUpPostSchema(Schema):
+    id = fields.Str()
+    post_title = fields.Str()
+    author = fields.Relationship(schema="WarmUpAuthorSchema", type_="people")
+    parent = fields.Relationship(schema="self", type_="posts")
+
+    class Meta:
+        type_ = "posts"
+        inflect = dasherize
+
+
+class TestWarmUp:
+    def test_report(self):
+        report = warm_up([PostSchema])
+        assert report.schemas == (
+            PostSchema,
+            AuthorSchema,
+            CommentSchema,
+            KeywordSchema,
+        )
+        assert report.relationships == 4
+        assert report.errors == ()
+        assert report.duration >= 0
+
+    def test_resolves_class_registry_names(self):
+        warm_up([WarmUpPostSchema])
+        field = WarmUpPostSchema._declared_fields["author"]
+        assert field._Relationship__schema is WarmUpAuthorSchema
+        assert WarmUpPostSchema._declared_fields["parent"]._Relationship__schema == (
+            "self"
+        )
+
+    def test_fresh_instances_use_resolved_state(self, monkeypatch):
+        warm_up([WarmUpPostSchema])
+
+        def fail(*args, **kwargs):
+            raise AssertionError("should be cached")
+
+        monkeypatch.setattr("marshmallow.class_registry.get_class", fail)
+        monkeypatch.setattr(WarmUpPostSchema.opts, "inflect", fail)
+        monkeypatch.setattr(WarmUpAuthorSchema.opts, "inflect", fail)
+        schema = WarmUpPostSchema(include_data=("author",))
+        assert schema.fields["author"].schema.__class__ is WarmUpAuthorSchema
+        data = schema.dump({"id": 1, "post_title": "Hi", "author": {"id": 2}})
+        assert data["data"]["attributes"] == {"post-title": "Hi"}
+        assert data["included"][0]["type"] == "people"
+
+    def test_follows_relationships(self):
+        report = warm_up([WarmUpPostSchema])
+        assert report.schemas == (WarmUpPostSchema, WarmUpAuthorSchema)
+
+    def test_fills_inflection_cache(self):
+        warm_up([WarmUpPostSchema])
+        assert WarmUpPostSchema.opts.inflection_cache["post_title"] == "post-title"
+        assert WarmUpAuthorSchema.opts.inflection_cache["first_name"] == "first-name"
+
+    def test_output_is_unchanged(self, post):
+        expected = PostSchema(include_data=("author", "post_comments")).dump(post)
+        warm_up([PostSchema])
+        assert (
+            PostSchema(include_data=("author", "post_comments")).dump(post) == expected
+        )
+
+    def test_collects_errors(self):
+        class InvalidSchema(Schema):
+            name = fields.Str()
+
+            class Meta:
+                type_ = "invalid"
+
+        report = warm_up([InvalidSchema, AuthorSchema])
+        assert report.schemas == (AuthorSchema,)
+        ((schema_class, error),) = report.errors
+        assert schema_class is InvalidSchema
+        assert str(error) == "Must have an `id` field"
+
+    def test_skips_abstract_schemas(self):
+        class BaseSchema(Schema):
+            id = fields.Str()
+
+        assert warm_up([BaseSchema]).schemas == ()
+
+    def test_defaults_to_all_schemas(self):
+        report = warm_up()
+        assert PostSchema in report.schemas
+        assert WarmUpPostSchema in report.schemas